@@ -37,6 +37,7 @@ warnings.filterwarnings("ignore", category=DeprecationWarning)
 warnings.filterwarnings("ignore", category=FutureWarning)
 
 from app import create_app, db
+from flask_migrate import stamp, upgrade
 from sqlalchemy import text
 from app.models import Usuario
 from app.utils.validators import setup_directories, validate_app_config
@@ -104,15 +105,23 @@ def init_database() -> None:
     """
     Inicializa o banco de dados criando todas as tabelas.
     
-    Verifica se as tabelas já existem antes de criar.
+    Um banco já existente recebe antes as migrações pendentes (create_all
+    não altera tabelas existentes); um banco novo já nasce com o esquema
+    atual e é marcado como migrado.
     
     Raises:
         Exception: Se houver erro na criação do banco
     """
     try:
         with app.app_context():
+            existente = bool(db.inspect(db.engine).get_table_names())
+            if existente:
+                upgrade()
+            
             # Criar todas as tabelas
             db.create_all()
+            if not existente:
+                stamp()
             
             # Verificar se tabelas foram criadas
             inspector = db.inspect(db.engine)
@@ -10,8 +10,10 @@ import logging
 from logging.handlers import RotatingFileHandler
 import os
 
-# Extensões
-db = SQLAlchemy()
+from app.utils.data_utils import dumps_json
+
+# Extensões (colunas JSON aceitam datas direto, sem pré-conversão)
+db = SQLAlchemy(engine_options={'json_serializer': dumps_json})
 login_manager = LoginManager()
 migrate = Migrate()
 
@@ -44,7 +46,10 @@ def create_app(config_name='development'):
     def load_user(user_id):
         from app.models import Usuario
         return Usuario.query.get(int(user_id))
-    migrate.init_app(app, db)
+    migrate.init_app(
+        app, db,
+        directory=os.path.join(os.path.dirname(app.root_path), 'migrations')
+    )
     
     # Configurar logging
     setup_logging(app)
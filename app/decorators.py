@@ -327,6 +327,8 @@ def memoize(ttl: int = 300) -> Callable:
     """
     Decorator para memoização de funções (cache em memória).
     
+    A função decorada expõe ``cache_clear()`` para invalidação explícita.
+    
     Args:
         ttl: Time to live em segundos
     
@@ -362,6 +364,8 @@ def memoize(ttl: int = 300) -> Callable:
                 cleanup_expired_cache(cache, ttl)
             
             return result
+        
+        decorated_function.cache_clear = cache.clear
         return decorated_function
     return decorator
 
@@ -9,7 +9,7 @@ import json
 from datetime import datetime, date
 from typing import Optional, Dict, Any, List
 
-from sqlalchemy import func
+from sqlalchemy import DDL, event, func, inspect, select
 from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import validates
 
@@ -201,6 +201,27 @@ class ColaboradorInterno(BaseModel):
     # Dados adicionais
     dados_adicionais = db.Column(db.JSON, nullable=True)
     
+    # Contadores denormalizados (mantidos pelos eventos de Dependente/planos)
+    qtd_dependentes = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+    qtd_planos_saude = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+    qtd_planos_odonto = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+    
+    # Paginação por cursor da listagem (ordem padrão por nome)
+    __table_args__ = (
+        db.Index('idx_ci_nome_id', 'nome', 'id'),
+        # Busca por trecho do nome (ILIKE '%termo%') via trigramas
+        db.Index(
+            'idx_ci_nome_trgm', 'nome',
+            postgresql_using='gin',
+            postgresql_ops={'nome': 'gin_trgm_ops'}
+        ).ddl_if(dialect='postgresql'),
+        # Busca por prefixo do CPF (LIKE 'digitos%') independente da collation
+        db.Index(
+            'idx_ci_cpf_prefixo', 'cpf',
+            postgresql_ops={'cpf': 'varchar_pattern_ops'}
+        ).ddl_if(dialect='postgresql'),
+    )
+    
     # Validações
     @validates('cpf')
     def validate_cpf(self, key: str, cpf: str) -> str:
@@ -218,9 +239,15 @@ class ColaboradorInterno(BaseModel):
         order_by='NumeroCadastro.data_inicio.desc()'
     )
     
+    # Só dependentes não excluídos; o titular continua acessível pelos excluídos
     dependentes = db.relationship(
         'Dependente',
-        backref='titular',
+        primaryjoin='and_(ColaboradorInterno.id == Dependente.colaborador_id, '
+                    'Dependente.is_deleted == False)',
+        backref=db.backref(
+            'titular',
+            primaryjoin='ColaboradorInterno.id == Dependente.colaborador_id'
+        ),
         lazy='dynamic',
         cascade='all, delete-orphan',
         order_by='Dependente.nome'
@@ -253,9 +280,16 @@ class ColaboradorInterno(BaseModel):
     # Propriedades
     @property
     def nc_ativo(self) -> Optional['NumeroCadastro']:
-        """Retorna o NC ativo do colaborador."""
+        """Retorna o NC ativo do colaborador (ou o pré-carregado em lote)."""
+        if '_nc_ativo_carregado' in self.__dict__:
+            return self._nc_ativo_carregado
         return self.numeros_cadastro.filter_by(ativo=True).first()
     
+    @nc_ativo.setter
+    def nc_ativo(self, nc: Optional['NumeroCadastro']) -> None:
+        """Registra o NC ativo carregado em lote (listagens)."""
+        self._nc_ativo_carregado = nc
+    
     @property
     def empresa_atual(self) -> Optional[str]:
         """Retorna a empresa atual do colaborador."""
@@ -276,17 +310,17 @@ class ColaboradorInterno(BaseModel):
     @property
     def total_dependentes(self) -> int:
         """Retorna o total de dependentes."""
-        return self.dependentes.count()
+        return self.qtd_dependentes or 0
     
     @property
     def total_planos_saude(self) -> int:
         """Retorna o total de planos de saúde ativos."""
-        return self.planos_saude.filter_by(ativo=True).count()
+        return self.qtd_planos_saude or 0
     
     @property
     def total_planos_odonto(self) -> int:
         """Retorna o total de planos odontológicos ativos."""
-        return self.planos_odonto.filter_by(ativo=True).count()
+        return self.qtd_planos_odonto or 0
     
     @property
     def idade(self) -> Optional[int]:
@@ -391,6 +425,20 @@ class ColaboradorInterno(BaseModel):
         return f'<ColaboradorInterno {self.id}: {self.nome}>'
 
 
+@event.listens_for(ColaboradorInterno, 'expire')
+def _descartar_nc_ativo_carregado(target, attrs):
+    """Descarta o NC ativo pré-carregado junto com os atributos expirados (ex.: commit)."""
+    target.__dict__.pop('_nc_ativo_carregado', None)
+
+
+# Operadores gin_trgm_ops dos índices de busca textual
+event.listen(
+    ColaboradorInterno.__table__,
+    'before_create',
+    DDL('CREATE EXTENSION IF NOT EXISTS pg_trgm').execute_if(dialect='postgresql')
+)
+
+
 class NumeroCadastro(BaseModel):
     """Modelo de Número de Cadastro (NC)."""
     __tablename__ = 'numeros_cadastro'
@@ -416,6 +464,26 @@ class NumeroCadastro(BaseModel):
         db.UniqueConstraint('nc', 'ativo', 'colaborador_id', name='unique_nc_ativo_per_ci'),
         db.Index('idx_nc_colaborador_ativo', 'colaborador_id', 'ativo'),
         db.Index('idx_nc_empresa_ativo', 'nc', 'cod_empresa', 'ativo'),
+        # Filtro de colaboradores por empresa (cobre o EXISTS da listagem)
+        db.Index('idx_nc_cod_empresa_ativo_colaborador', 'cod_empresa', 'ativo', 'colaborador_id'),
+        # Só os NCs ativos (a minoria das linhas): colaboradores ativos e
+        # distribuição por empresa das estatísticas
+        db.Index(
+            'idx_nc_ativos_colaborador', 'colaborador_id',
+            postgresql_where=db.text('ativo'),
+            sqlite_where=db.text('ativo = 1')
+        ),
+        db.Index(
+            'idx_nc_ativos_empresa', 'cod_empresa',
+            postgresql_where=db.text('ativo'),
+            sqlite_where=db.text('ativo = 1')
+        ),
+        # Pesquisa rápida por trecho do NC (ILIKE '%termo%') via trigramas
+        db.Index(
+            'idx_nc_nc_trgm', 'nc',
+            postgresql_using='gin',
+            postgresql_ops={'nc': 'gin_trgm_ops'}
+        ).ddl_if(dialect='postgresql'),
     )
     
     # Validações
@@ -530,6 +598,17 @@ class Dependente(BaseModel):
     parentesco = db.Column(db.String(50), nullable=True, index=True)
     nc_vinculo = db.Column(db.String(50), nullable=False, index=True)
     
+    # Soft delete
+    is_deleted = db.Column(db.Boolean, default=False, server_default=db.false(), index=True)
+    deleted_at = db.Column(db.DateTime, nullable=True)
+    deleted_by = db.Column(db.Integer, nullable=True)
+    
+    # Coluna gerada pelo banco: dependente sem CPF (NULL ou vazio)
+    cpf_vazio = db.Column(
+        db.Boolean,
+        db.Computed("cpf IS NULL OR cpf = ''", persisted=True)
+    )
+    
     # Foreign Key
     colaborador_id = db.Column(
         db.Integer,
@@ -538,6 +617,22 @@ class Dependente(BaseModel):
         index=True
     )
     
+    # Constraints
+    __table_args__ = (
+        db.Index(
+            'idx_dependente_cpf_vazio', 'id',
+            postgresql_where=db.text('cpf_vazio'),
+            sqlite_where=db.text('cpf_vazio')
+        ),
+        # CPF único por colaborador (dependentes sem CPF ou excluídos ficam de fora)
+        db.Index(
+            'idx_dependente_colaborador_cpf', 'colaborador_id', 'cpf',
+            unique=True,
+            postgresql_where=db.text('cpf IS NOT NULL AND NOT is_deleted'),
+            sqlite_where=db.text('cpf IS NOT NULL AND NOT is_deleted')
+        ),
+    )
+    
     # Validações
     @validates('cpf')
     def validate_cpf(self, key: str, cpf: str) -> Optional[str]:
@@ -561,6 +656,13 @@ class Dependente(BaseModel):
         born = self.data_nascimento
         return today.year - born.year - ((today.month, today.day) < (born.month, born.day))
     
+    # Métodos
+    def excluir_soft(self, usuario_id: int) -> None:
+        """Exclui o dependente logicamente."""
+        self.is_deleted = True
+        self.deleted_at = get_utc_now()
+        self.deleted_by = usuario_id
+    
 
     # ========================================================================
     # MÉTODOS DO FLASK-LOGIN
@@ -640,6 +742,11 @@ class PlanoSaude(BaseModel):
         index=True
     )
     
+    # Planos ativos por colaborador (contadores e listagens)
+    __table_args__ = (
+        db.Index('idx_plano_saude_colaborador_ativo', 'colaborador_id', 'ativo'),
+    )
+    
     # Relacionamentos
     atendimentos = db.relationship(
         'AtendimentoCoparticipacao',
@@ -876,6 +983,11 @@ class PlanoOdontologico(BaseModel):
         index=True
     )
     
+    # Planos ativos por colaborador (contadores e listagens)
+    __table_args__ = (
+        db.Index('idx_plano_odonto_colaborador_ativo', 'colaborador_id', 'ativo'),
+    )
+    
     # Propriedades
     @property
     def empresa_nome(self) -> str:
@@ -959,6 +1071,15 @@ class HistoricoCI(BaseModel):
     cod_empresa = db.Column(db.String(10), nullable=True, index=True)
     dados_alterados = db.Column(db.JSON, nullable=True)
     
+    # Momento do evento: fonte única do timestamp (também preenchido pelo
+    # banco em inserções em massa que não passam pelos defaults do Python)
+    created_at = db.Column(
+        db.DateTime,
+        default=get_utc_now,
+        server_default=db.func.now(),
+        nullable=False
+    )
+    
     # Foreign Key
     colaborador_id = db.Column(
         db.Integer,
@@ -967,6 +1088,11 @@ class HistoricoCI(BaseModel):
         index=True
     )
     
+    # Histórico do colaborador já na ordem de exibição (data_evento DESC)
+    __table_args__ = (
+        db.Index('idx_historico_ci_colaborador_data', 'colaborador_id', 'data_evento'),
+    )
+    
     # Propriedades
     @property
     def empresa_nome(self) -> str:
@@ -1102,6 +1228,32 @@ class ImportacaoLog(BaseModel):
         return f'<ImportacaoLog {self.id}: {self.tipo_importacao} - {self.status}>'
 
 
+def _indice_chave_alerta(tipo: str, chave: str, tipo_sql: str) -> db.Index:
+    """
+    Cria um índice único de expressão (PostgreSQL) sobre a chave de
+    dados_relacionados de um tipo de alerta, restrito a alertas não resolvidos.
+    
+    A expressão reproduz exatamente o SQL gerado por
+    ``dados_relacionados[chave].as_integer()`` / ``.as_string()``, para que o
+    planejador consiga usar o índice nas verificações de duplicidade; a
+    unicidade garante no banco um único alerta aberto por chave.
+    
+    Args:
+        tipo: Tipo de alerta
+        chave: Chave em dados_relacionados
+        tipo_sql: Tipo do CAST (INTEGER ou VARCHAR)
+    
+    Returns:
+        Índice único parcial
+    """
+    return db.Index(
+        f'idx_alerta_aberto_{chave}',
+        db.text(f"CAST((dados_relacionados ->> '{chave}') AS {tipo_sql})"),
+        unique=True,
+        postgresql_where=db.text(f"resolvido = false AND tipo = '{tipo}'")
+    ).ddl_if(dialect='postgresql')
+
+
 class Alerta(BaseModel):
     """Modelo de Alerta do Sistema."""
     __tablename__ = 'alertas'
@@ -1115,6 +1267,63 @@ class Alerta(BaseModel):
     data_resolucao = db.Column(db.DateTime, nullable=True)
     acao_recomendada = db.Column(db.Text, nullable=True)
     dados_relacionados = db.Column(db.JSON, nullable=True)
+    dedup_key = db.Column(db.String(40), nullable=True)
+    
+    # Relacionamentos
+    historico = db.relationship(
+        'AlertaHistorico',
+        backref='alerta',
+        lazy='dynamic',
+        cascade='all, delete-orphan',
+        order_by='AlertaHistorico.data_evento.desc()'
+    )
+    
+    # Índices para as verificações de alerta já existente e estatísticas
+    __table_args__ = (
+        db.Index('idx_alerta_gravidade_resolvido', 'gravidade', 'resolvido'),
+        db.Index('idx_alerta_resolvido_data_resolucao', 'resolvido', 'data_resolucao'),
+        db.Index(
+            'idx_alerta_aberto_dedup', 'tipo', 'dedup_key',
+            postgresql_where=db.text('resolvido = false'),
+            sqlite_where=db.text('resolvido = 0')
+        ),
+        _indice_chave_alerta('CI_SEM_NC', 'colaborador_id', 'INTEGER'),
+        _indice_chave_alerta('PLANO_VENCIDO', 'plano_id', 'INTEGER'),
+        _indice_chave_alerta('DEPENDENTE_SEM_CPF', 'dependente_id', 'INTEGER'),
+        _indice_chave_alerta('IMPORTACAO_ERRO', 'importacao_id', 'INTEGER'),
+        _indice_chave_alerta('NC_DUPLICADO', 'nc', 'VARCHAR'),
+        _indice_chave_alerta('CPF_DUPLICADO', 'cpf', 'VARCHAR'),
+        # Histórico completo por colaborador, já na ordem de exibição
+        # (data_alerta, id) para a paginação por cursor
+        db.Index(
+            'idx_alerta_colaborador_id_data',
+            db.text("CAST((dados_relacionados ->> 'colaborador_id') AS INTEGER)"),
+            'data_alerta',
+            'id'
+        ).ddl_if(dialect='postgresql'),
+        # Tendências: filtro e agrupamento por dia, com resolvido para index-only scan
+        db.Index(
+            'idx_alerta_dia_resolvido',
+            db.text('date(data_alerta)'),
+            'resolvido'
+        ).ddl_if(dialect='postgresql'),
+    )
+    
+    @staticmethod
+    def gerar_dedup_key(tipo: str, descricao: str, dia: date) -> str:
+        """
+        Gera a chave de duplicidade diária de um alerta.
+        
+        Args:
+            tipo: Tipo do alerta
+            descricao: Descrição do alerta
+            dia: Dia de referência (data_alerta)
+        
+        Returns:
+            SHA-1 hexadecimal de ``tipo|descricao|dia``
+        """
+        conteudo = f"{tipo}|{descricao}|{dia.isoformat()}"
+        return hashlib.sha1(conteudo.encode('utf-8')).hexdigest()
     
     # Propriedades
     @property
@@ -1194,4 +1403,130 @@ class Alerta(BaseModel):
     
     def __repr__(self) -> str:
         status = 'RESOLVIDO' if self.resolvido else 'ABERTO'
-        return f'<Alerta {self.id}: {self.tipo} ({self.gravidade}) - {status}>'
\ No newline at end of file
+        return f'<Alerta {self.id}: {self.tipo} ({self.gravidade}) - {status}>'
+
+
+class AlertaHistorico(BaseModel):
+    """Modelo de Histórico de Alerta (observações de resolução/reabertura)."""
+    __tablename__ = 'alerta_historico'
+    
+    # Campos
+    tipo_evento = db.Column(db.String(20), nullable=False)  # RESOLUCAO, REABERTURA
+    texto = db.Column(db.Text, nullable=False)
+    usuario = db.Column(db.String(100), nullable=True)
+    data_evento = db.Column(db.DateTime, default=get_utc_now, nullable=False)
+    
+    # Foreign Key
+    alerta_id = db.Column(
+        db.Integer,
+        db.ForeignKey('alertas.id', ondelete='CASCADE'),
+        nullable=False,
+        index=True
+    )
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Converte histórico para dicionário."""
+        return {
+            'id': self.id,
+            'alerta_id': self.alerta_id,
+            'tipo_evento': self.tipo_evento,
+            'texto': self.texto,
+            'usuario': self.usuario,
+            'data_evento': self.data_evento.isoformat() if self.data_evento else None,
+        }
+    
+    def __repr__(self) -> str:
+        return f'<AlertaHistorico {self.id}: {self.tipo_evento} - alerta {self.alerta_id}>'
+
+
+# ============================================================================
+# CONTADORES DENORMALIZADOS
+# ============================================================================
+
+# coluna -> (modelo filho, campo de situação, valor que conta)
+_CONTADORES = {
+    'qtd_dependentes': (Dependente, 'is_deleted', False),
+    'qtd_planos_saude': (PlanoSaude, 'ativo', True),
+    'qtd_planos_odonto': (PlanoOdontologico, 'ativo', True),
+}
+
+
+def _subconsulta_contador(coluna: str):
+    """Subconsulta correlacionada que recalcula um contador do colaborador."""
+    modelo, campo, valor = _CONTADORES[coluna]
+    return select(func.count(modelo.id)).where(
+        modelo.colaborador_id == ColaboradorInterno.id,
+        getattr(modelo, campo) == valor
+    ).scalar_subquery()
+
+
+def recalcular_contadores(connection=None, colaborador_ids: Optional[List[int]] = None) -> None:
+    """
+    Recalcula os contadores denormalizados a partir das tabelas filhas.
+    
+    Usado pela migração que cria as colunas (colaborador contadores) e
+    pelos eventos de atualização (quando a situação ou ``colaborador_id``
+    mudam).
+    
+    Args:
+        connection: Conexão a usar (padrão: sessão atual)
+        colaborador_ids: Restringe aos colaboradores informados
+    """
+    stmt = db.update(ColaboradorInterno).values({
+        coluna: _subconsulta_contador(coluna) for coluna in _CONTADORES
+    }).execution_options(synchronize_session=False)
+    if colaborador_ids is not None:
+        stmt = stmt.where(ColaboradorInterno.id.in_(colaborador_ids))
+    (connection or db.session).execute(stmt)
+
+
+def _ajustar_contador(connection, coluna: str, colaborador_id: Optional[int], delta: int) -> None:
+    """Incrementa/decrementa um contador no próprio SQL (sem corrida de leitura)."""
+    if colaborador_id is None:
+        return
+    tabela = ColaboradorInterno.__table__
+    connection.execute(
+        tabela.update()
+        .where(tabela.c.id == colaborador_id)
+        .values({coluna: tabela.c[coluna] + delta})
+    )
+
+
+def _registrar_contador(coluna: str) -> None:
+    """Liga os eventos de insert/update/delete do modelo filho ao contador."""
+    modelo, campo, valor = _CONTADORES[coluna]
+    
+    def conta(target) -> bool:
+        return bool(getattr(target, campo)) == valor
+    
+    @event.listens_for(modelo, 'after_insert')
+    def apos_inserir(mapper, connection, target):
+        if conta(target):
+            _ajustar_contador(connection, coluna, target.colaborador_id, 1)
+    
+    @event.listens_for(modelo, 'after_delete')
+    def apos_excluir(mapper, connection, target):
+        if conta(target):
+            _ajustar_contador(connection, coluna, target.colaborador_id, -1)
+    
+    @event.listens_for(modelo.colaborador_id, 'set', active_history=True)
+    def ao_mudar_colaborador(target, value, oldvalue, initiator):
+        """Sem ação: active_history carrega o colaborador anterior no histórico."""
+    
+    @event.listens_for(modelo, 'after_update')
+    def apos_atualizar(mapper, connection, target):
+        estado = inspect(target)
+        historico_colaborador = estado.attrs.colaborador_id.history
+        if not historico_colaborador.has_changes() and not (
+            estado.attrs[campo].history.has_changes()
+        ):
+            return
+        
+        # O valor anterior do campo de situação pode não estar carregado: recalcula em vez de somar
+        ids = {target.colaborador_id, *historico_colaborador.deleted} - {None}
+        if ids:
+            recalcular_contadores(connection, list(ids))
+
+
+for _coluna in _CONTADORES:
+    _registrar_contador(_coluna)
\ No newline at end of file
@@ -4,12 +4,13 @@ Rotas para gerenciamento de alertas do sistema.
 
 from flask import Blueprint, render_template, request, flash, redirect, url_for, jsonify
 from flask_login import login_required, current_user
-from sqlalchemy import desc, asc
+from sqlalchemy import desc, asc, case, func, select
 from datetime import datetime, timedelta
 
 from app import db
-from app.models import Alerta, ImportacaoLog
+from app.models import Alerta, AlertaHistorico, ImportacaoLog
 from app.decorators import admin_required, permission_required
+from app.services.alert_service import alert_service, invalidar_cache_alertas
 from app.utils.pagination import Pagination
 
 alerts_bp = Blueprint('alerts', __name__, url_prefix='/alerts')
@@ -79,10 +80,17 @@ def listar():
     total = query.count()
     alertas = query.paginate(page=page, per_page=per_page, error_out=False)
     
-    # Estatísticas
-    total_alertas = Alerta.query.count()
-    alertas_abertos = Alerta.query.filter_by(resolvido=False).count()
-    alertas_criticos = Alerta.query.filter_by(gravidade='CRITICA', resolvido=False).count()
+    # Estatísticas (uma única consulta Core, sem hidratar objetos)
+    total_alertas, alertas_abertos, alertas_criticos = db.session.execute(
+        select(
+            func.count(),
+            func.coalesce(func.sum(case((Alerta.resolvido == False, 1), else_=0)), 0),
+            func.coalesce(func.sum(case(
+                ((Alerta.gravidade == 'CRITICA') & (Alerta.resolvido == False), 1),
+                else_=0
+            )), 0)
+        ).select_from(Alerta)
+    ).one()
     
     # Tipos de alerta disponíveis
     tipos = db.session.query(Alerta.tipo).distinct().all()
@@ -154,8 +162,15 @@ def resolver(id):
         alerta.resolver()
         
         if observacao:
-            alerta.descricao = f"{alerta.descricao}\n\n--- RESOLUÇÃO ---\n{observacao}\nUsuário: {current_user.nome}"
-            db.session.commit()
+            db.session.add(AlertaHistorico(
+                alerta_id=alerta.id,
+                tipo_evento='RESOLUCAO',
+                texto=observacao,
+                usuario=current_user.nome
+            ))
+        
+        db.session.commit()
+        invalidar_cache_alertas()
         
         flash(f'Alerta #{id} marcado como resolvido!', 'success')
         
@@ -179,14 +194,30 @@ def reabrir(id):
         flash('Este alerta já está aberto', 'warning')
         return redirect(url_for('alerts.detalhes', id=id))
     
+    aberto = alert_service.obter_alerta_aberto_mesma_chave(alerta)
+    if aberto:
+        flash(
+            f'Não é possível reabrir: esta ocorrência já está no alerta '
+            f'aberto #{aberto.id}',
+            'warning'
+        )
+        return redirect(url_for('alerts.detalhes', id=aberto.id))
+    
     try:
         motivo = request.form.get('motivo', '').strip()
         
         alerta.reabrir()
         
         if motivo:
-            alerta.descricao = f"{alerta.descricao}\n\n--- REABERTURA ---\n{motivo}\nUsuário: {current_user.nome}"
-            db.session.commit()
+            db.session.add(AlertaHistorico(
+                alerta_id=alerta.id,
+                tipo_evento='REABERTURA',
+                texto=motivo,
+                usuario=current_user.nome
+            ))
+        
+        db.session.commit()
+        invalidar_cache_alertas()
         
         flash(f'Alerta #{id} reaberto!', 'success')
         
@@ -209,6 +240,7 @@ def excluir(id):
     try:
         db.session.delete(alerta)
         db.session.commit()
+        invalidar_cache_alertas()
         
         flash(f'Alerta #{id} excluído com sucesso!', 'success')
         
@@ -230,9 +262,16 @@ def limpar_resolvidos():
         # Contar antes de excluir
         total_antes = Alerta.query.filter_by(resolvido=True).count()
         
-        # Excluir alertas resolvidos
+        # Excluir alertas resolvidos (o histórico antes: o DELETE em massa
+        # não passa pelo cascade do ORM)
+        AlertaHistorico.query.filter(
+            AlertaHistorico.alerta_id.in_(
+                select(Alerta.id).where(Alerta.resolvido == True)
+            )
+        ).delete(synchronize_session=False)
         Alerta.query.filter_by(resolvido=True).delete()
         db.session.commit()
+        invalidar_cache_alertas()
         
         flash(f'{total_antes} alertas resolvidos removidos do sistema!', 'success')
         
@@ -250,36 +289,18 @@ def api_estatisticas():
     Retorna estatísticas de alertas em formato JSON.
     """
     try:
-        total = Alerta.query.count()
-        abertos = Alerta.query.filter_by(resolvido=False).count()
-        resolvidos = Alerta.query.filter_by(resolvido=True).count()
-        
-        # Por gravidade
-        critica = Alerta.query.filter_by(gravidade='CRITICA', resolvido=False).count()
-        alta = Alerta.query.filter_by(gravidade='ALTA', resolvido=False).count()
-        media = Alerta.query.filter_by(gravidade='MEDIA', resolvido=False).count()
-        baixa = Alerta.query.filter_by(gravidade='BAIXA', resolvido=False).count()
-        
-        # Por tipo
-        tipos = db.session.query(
-            Alerta.tipo,
-            db.func.count(Alerta.id).label('total')
-        ).filter_by(resolvido=False).group_by(Alerta.tipo).all()
+        # Estatísticas em cache no serviço (descartadas a cada escrita)
+        estatisticas = alert_service.obter_estatisticas()
         
         return jsonify({
-            'total': total,
-            'abertos': abertos,
-            'resolvidos': resolvidos,
+            'total': estatisticas['total'],
+            'abertos': estatisticas['abertos'],
+            'resolvidos': estatisticas['resolvidos'],
             'por_gravidade': {
-                'critica': critica,
-                'alta': alta,
-                'media': media,
-                'baixa': baixa
+                gravidade: estatisticas[f'{gravidade}_abertos']
+                for gravidade in ('critica', 'alta', 'media', 'baixa')
             },
-            'por_tipo': [
-                {'tipo': tipo, 'total': total}
-                for tipo, total in tipos
-            ]
+            'por_tipo': estatisticas['por_tipo']
         })
         
     except Exception as e:
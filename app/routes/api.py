@@ -12,7 +12,7 @@ from app.models import (
     PlanoSaude, PlanoOdontologico, Alerta
 )
 from app.decorators import api_key_required
-from app.services.ci_service import CIService
+from app.services.ci_service import ci_service
 
 api_bp = Blueprint('api', __name__, url_prefix='/api/v1')
 
@@ -155,14 +155,13 @@ def estatisticas():
     Retorna estatísticas do sistema.
     """
     try:
-        service = CIService()
-        stats = service.obter_estatisticas()
+        stats = ci_service.obter_estatisticas()
         
         # Adicionar outras estatísticas
         stats['total_alertas_abertos'] = Alerta.query.filter_by(resolvido=False).count()
         stats['total_planos_saude'] = PlanoSaude.query.filter_by(ativo=True).count()
         stats['total_planos_odonto'] = PlanoOdontologico.query.filter_by(ativo=True).count()
-        stats['total_dependentes'] = Dependente.query.count()
+        stats['total_dependentes'] = Dependente.query.filter_by(is_deleted=False).count()
         
         return jsonify(stats)
     except Exception as e:
@@ -24,6 +24,7 @@ import re
 from app import db
 from app.models import Usuario
 from app.decorators import admin_required
+from app.services.ci_service import nome_usuario
 from app.utils.validators import (
     is_valid_email,
     clean_email,
@@ -507,6 +508,7 @@ def editar_usuario(id):
         usuario.ativo = ativo
         
         db.session.commit()
+        nome_usuario.cache_clear()
         
         flash(f'Usuário {nome} atualizado com sucesso!', 'success')
         return redirect(url_for('auth.listar_usuarios'))
@@ -679,6 +681,7 @@ def editar_perfil():
             current_user.telefone = telefone
         
         db.session.commit()
+        nome_usuario.cache_clear()
         
         # Atualizar sessão
         session['usuario_nome'] = current_user.nome
@@ -18,8 +18,9 @@ from app.models import (
     AtendimentoCoparticipacao
 )
 from app.decorators import admin_required
-from app.services.ci_service import CIService
+from app.services.ci_service import CIService, invalidar_cache_colaboradores
 from app.utils.validators import clean_cpf, clean_nc, validate_date
+from app.utils.data_utils import calcular_alteracoes
 from app.utils.pagination import Pagination
 
 ci_bp = Blueprint('ci', __name__, url_prefix='/ci')
@@ -80,6 +81,8 @@ def listar():
                 total=resultado['total'],
                 route='ci.listar'
             ),
+            total=resultado['total'],
+            total_estimado=resultado['total_estimado'],
             filtros={
                 'nome': nome,
                 'cpf': cpf,
@@ -336,6 +339,7 @@ def novo():
         db.session.add(historico)
         
         db.session.commit()
+        invalidar_cache_colaboradores()
         
         flash(f'Colaborador {nome} criado com sucesso!', 'success')
         return redirect(url_for('ci.detalhes', id=ci.id))
@@ -411,11 +415,7 @@ def editar(id):
             'data_nascimento': ci.data_nascimento
         }
         
-        alteracoes = {
-            k: {'antigo': dados_antigos[k], 'novo': dados_novos[k]}
-            for k in dados_antigos
-            if dados_antigos[k] != dados_novos[k]
-        }
+        alteracoes = calcular_alteracoes(dados_antigos, dados_novos)
         
         if alteracoes:
             historico = HistoricoCI(
@@ -430,6 +430,7 @@ def editar(id):
             db.session.add(historico)
         
         db.session.commit()
+        invalidar_cache_colaboradores()
         
         flash('Dados do colaborador atualizados com sucesso!', 'success')
         return redirect(url_for('ci.detalhes', id=ci.id))
@@ -610,6 +611,7 @@ def excluir_definitivo(id):
         # Excluir do banco
         db.session.delete(ci)
         db.session.commit()
+        invalidar_cache_colaboradores()
         
         flash(f'Colaborador {ci.nome} removido definitivamente do sistema!', 'success')
         return redirect(url_for('ci.listar'))
@@ -677,7 +679,8 @@ def novo_dependente(id):
         if cpf:
             existente = Dependente.query.filter_by(
                 cpf=cpf,
-                colaborador_id=ci.id
+                colaborador_id=ci.id,
+                is_deleted=False
             ).first()
             if existente:
                 flash('Já existe um dependente com este CPF', 'error')
@@ -713,6 +716,7 @@ def novo_dependente(id):
         db.session.add(historico)
         
         db.session.commit()
+        invalidar_cache_colaboradores()
         
         flash(f'Dependente {nome} adicionado com sucesso!', 'success')
         return redirect(url_for('ci.detalhes', id=id))
@@ -735,7 +739,7 @@ def editar_dependente(ci_id, dep_id):
     ci = ColaboradorInterno.query.get_or_404(ci_id)
     dependente = Dependente.query.get_or_404(dep_id)
     
-    if dependente.colaborador_id != ci.id:
+    if dependente.colaborador_id != ci.id or dependente.is_deleted:
         abort(404)
     
     if ci.is_deleted:
@@ -768,7 +772,8 @@ def editar_dependente(ci_id, dep_id):
                 existente = Dependente.query.filter(
                     Dependente.cpf == cpf,
                     Dependente.colaborador_id == ci.id,
-                    Dependente.id != dep_id
+                    Dependente.id != dep_id,
+                    Dependente.is_deleted == False
                 ).first()
                 if existente:
                     flash('Já existe um dependente com este CPF', 'error')
@@ -791,11 +796,7 @@ def editar_dependente(ci_id, dep_id):
             'data_nascimento': dependente.data_nascimento
         }
         
-        alteracoes = {
-            k: {'antigo': dados_antigos[k], 'novo': dados_novos[k]}
-            for k in dados_antigos
-            if dados_antigos[k] != dados_novos[k]
-        }
+        alteracoes = calcular_alteracoes(dados_antigos, dados_novos)
         
         if alteracoes:
             historico = HistoricoCI(
@@ -810,6 +811,7 @@ def editar_dependente(ci_id, dep_id):
             db.session.add(historico)
         
         db.session.commit()
+        invalidar_cache_colaboradores()
         
         flash(f'Dependente {dependente.nome} atualizado com sucesso!', 'success')
         return redirect(url_for('ci.detalhes', id=ci_id))
@@ -832,7 +834,7 @@ def excluir_dependente(ci_id, dep_id):
     ci = ColaboradorInterno.query.get_or_404(ci_id)
     dependente = Dependente.query.get_or_404(dep_id)
     
-    if dependente.colaborador_id != ci.id:
+    if dependente.colaborador_id != ci.id or dependente.is_deleted:
         abort(404)
     
     if ci.is_deleted:
@@ -840,7 +842,9 @@ def excluir_dependente(ci_id, dep_id):
         return redirect(url_for('ci.detalhes', id=ci_id))
     
     try:
-        # Registrar histórico antes de excluir
+        # Exclusão lógica: os dados do dependente continuam na própria linha
+        dependente.excluir_soft(current_user.id)
+        
         historico = HistoricoCI(
             colaborador_id=ci.id,
             tipo_evento='EXCLUSAO_DEPENDENTE',
@@ -849,17 +853,13 @@ def excluir_dependente(ci_id, dep_id):
             nc=ci.nc_atual,
             cod_empresa=ci.empresa_atual,
             dados_alterados={
-                'dependente_nome': dependente.nome,
-                'dependente_cpf': dependente.cpf,
-                'parentesco': dependente.parentesco,
+                'dependente_id': dependente.id,
                 'usuario': current_user.nome
             }
         )
         db.session.add(historico)
-        
-        # Excluir dependente
-        db.session.delete(dependente)
         db.session.commit()
+        invalidar_cache_colaboradores()
         
         flash(f'Dependente {dependente.nome} excluído com sucesso!', 'success')
         
@@ -912,17 +912,18 @@ def exportar_todos():
     Exporta todos os colaboradores ativos em formato CSV.
     """
     try:
-        # Gerar CSV usando serviço
-        csv_data = ci_service.exportar_todos_csv()
+        # Gerar CSV usando serviço, enviado em blocos conforme é escrito
+        from flask import Response, stream_with_context
         
-        from flask import send_file
-        import io
+        def gerar():
+            yield '\ufeff'  # BOM (utf-8-sig) para o Excel
+            yield from ci_service.gerar_csv_todos()
         
-        return send_file(
-            io.BytesIO(csv_data.encode('utf-8-sig')),
+        nome_arquivo = f'colaboradores_ativos_{datetime.now().strftime("%Y%m%d")}.csv'
+        return Response(
+            stream_with_context(gerar()),
             mimetype='text/csv',
-            as_attachment=True,
-            download_name=f'colaboradores_ativos_{datetime.now().strftime("%Y%m%d")}.csv'
+            headers={'Content-Disposition': f'attachment; filename={nome_arquivo}'}
         )
         
     except Exception as e:
@@ -1,10 +1,15 @@
 # app/routes/import_routes.py
-from flask import Blueprint, render_template, request, flash, redirect, url_for, jsonify, session, send_file, current_app
+from flask import (
+    Blueprint, Response, render_template, request, flash, redirect, url_for, jsonify, session,
+    current_app, stream_with_context
+)
 from flask_login import login_required, current_user
 from app import db
 from app.models import ImportacaoLog, ColaboradorInterno, NumeroCadastro
+from app.services.ci_service import invalidar_cache_colaboradores
 from app.utils.pagination import paginate_query
 from app.utils.helpers import _to_brasilia
+from app.utils.validators import format_date_brasil, format_datetime_brasil
 from app.utils.import_functions import (
     importar_ativos, importar_desligados, importar_unimed, 
     importar_hapvida_saude, importar_hapvida_odonto, importar_odontoprev,
@@ -15,10 +20,15 @@ import json
 from datetime import datetime
 import io
 import csv
+from itertools import islice
+from sqlalchemy.orm import contains_eager
 from werkzeug.utils import secure_filename
 
 import_bp = Blueprint('import', __name__)
 
+# Atendimentos lidos do banco (e emitidos) por bloco na exportação
+_EXPORTACAO_LOTE = 1000
+
 @import_bp.route('/importar', methods=['GET', 'POST'])
 @login_required
 def importar():
@@ -108,6 +118,9 @@ def importar():
                     except Exception:
                         pass
 
+        # Colaboradores, NCs e planos importados: descartar estatísticas em cache
+        invalidar_cache_colaboradores()
+
         # Flash resumo
         ok = sum(1 for r in resultados if r['sucesso'])
         flash(f'Importação concluída: {ok}/{len(resultados)} arquivos com sucesso.', 'success')
@@ -187,69 +200,85 @@ def limpar_duplicados_coparticipacao_route():
 @login_required
 def exportar_coparticipacao_geral():
     """Exporta todos os atendimentos de coparticipação do sistema."""
-    app = current_app
     from app.models import AtendimentoCoparticipacao, PlanoSaude
     
-    # Buscar todos os atendimentos
-    atendimentos = AtendimentoCoparticipacao.query.join(
+    # Buscar todos os atendimentos (plano e colaborador no mesmo SELECT)
+    query = AtendimentoCoparticipacao.query.join(
         PlanoSaude
+    ).options(
+        contains_eager(AtendimentoCoparticipacao.plano_saude)
+        .joinedload(PlanoSaude.colaborador)
     ).filter(
         PlanoSaude.tipo == 'COPARTICIPACAO'
     ).order_by(
         AtendimentoCoparticipacao.competencia,
         AtendimentoCoparticipacao.contrato,
         AtendimentoCoparticipacao.data_atendimento
-    ).all()
+    )
     
-    if not atendimentos:
+    if not db.session.query(query.exists()).scalar():
         flash('Nenhum atendimento de coparticipação encontrado', 'warning')
         return redirect(url_for('main.index'))
     
-    # Criar CSV
-    output = io.StringIO()
-    writer = csv.writer(output, delimiter=';', quoting=csv.QUOTE_ALL)
-    
-    # Cabeçalho
-    writer.writerow([
-        'ID Plano', 'Contrato', 'Competência', 'CPF', 'Beneficiário', 'NC',
-        'Colaborador', 'Empresa', 'Guia', 'Data Atendimento', 'Descrição', 
-        'Quantidade', 'Valor Base', 'Valor Coparticipação', 'Data Importação'
-    ])
+    empresas = current_app.config['VALID_COMPANY_CODES']
     
-    # Dados
-    for atend in atendimentos:
-        plano = atend.plano_saude
-        ci = plano.colaborador
-        empresa_nome = app.config['VALID_COMPANY_CODES'].get(plano.empresa_cod, plano.empresa_cod)
+    # Enviado em blocos conforme é escrito (lotes lidos com cursor no servidor)
+    def gerar():
+        output = io.StringIO()
+        writer = csv.writer(output, delimiter=';', quoting=csv.QUOTE_ALL)
         
+        def descarregar():
+            bloco = output.getvalue()
+            output.seek(0)
+            output.truncate(0)
+            return bloco
+        
+        yield '\ufeff'  # BOM (utf-8-sig) para o Excel
+        
+        # Cabeçalho
         writer.writerow([
-            plano.id,
-            atend.contrato,
-            atend.competencia,
-            atend.cpf or '',
-            atend.beneficiario,
-            atend.nc,
-            ci.nome,
-            empresa_nome,
-            atend.guia or '',
-            atend.data_atendimento.strftime('%d/%m/%Y') if atend.data_atendimento else '',
-            atend.descricao or '',
-            str(atend.quantidade).replace('.', ','),
-            str(atend.valor_base).replace('.', ',') if atend.valor_base else '0,00',
-            str(atend.valor_coparticipacao).replace('.', ','),
-            atend.created_at.strftime('%d/%m/%Y %H:%M') if atend.created_at else ''
+            'ID Plano', 'Contrato', 'Competência', 'CPF', 'Beneficiário', 'NC',
+            'Colaborador', 'Empresa', 'Guia', 'Data Atendimento', 'Descrição', 
+            'Quantidade', 'Valor Base', 'Valor Coparticipação', 'Data Importação'
         ])
-    
-    output.seek(0)
+        
+        def linha(atend):
+            plano = atend.plano_saude
+            return (
+                plano.id,
+                atend.contrato,
+                atend.competencia,
+                atend.cpf or '',
+                atend.beneficiario,
+                atend.nc,
+                plano.colaborador.nome,
+                empresas.get(plano.empresa_cod, plano.empresa_cod),
+                atend.guia or '',
+                format_date_brasil(atend.data_atendimento),
+                atend.descricao or '',
+                str(atend.quantidade).replace('.', ','),
+                str(atend.valor_base).replace('.', ',') if atend.valor_base else '0,00',
+                str(atend.valor_coparticipacao).replace('.', ','),
+                format_datetime_brasil(atend.created_at)
+            )
+        
+        # Dados: writerows por lote (laço em C do módulo csv), um bloco por lote
+        atendimentos = iter(query.yield_per(_EXPORTACAO_LOTE))
+        while lote := list(islice(atendimentos, _EXPORTACAO_LOTE)):
+            writer.writerows(map(linha, lote))
+            yield descarregar()
+        
+        restante = descarregar()
+        if restante:
+            yield restante
     
     # Nome do arquivo
     filename = f"coparticipacao_geral_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
     
-    return send_file(
-        io.BytesIO(output.getvalue().encode('utf-8-sig')),
+    return Response(
+        stream_with_context(gerar()),
         mimetype='text/csv',
-        as_attachment=True,
-        download_name=filename
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
     )
 
 def allowed_file(filename, allowed_extensions):
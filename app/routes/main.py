@@ -9,7 +9,7 @@ from app.models import (
     PlanoSaude, PlanoOdontologico, NumeroCadastro
 )
 from app import db
-from sqlalchemy import func
+from sqlalchemy import exists, func
 
 main_bp = Blueprint('main', __name__)
 
@@ -37,8 +37,9 @@ def index():
         estatisticas['total_ativos'] = ColaboradorInterno.query.filter_by(
             is_deleted=False
         ).filter(
-            ColaboradorInterno.id.in_(
-                db.session.query(NumeroCadastro.colaborador_id).filter_by(ativo=True)
+            exists().where(
+                NumeroCadastro.colaborador_id == ColaboradorInterno.id,
+                NumeroCadastro.ativo == True
             )
         ).count()
         
@@ -54,7 +55,7 @@ def index():
         ]
         
         # Total de dependentes
-        estatisticas['total_dependentes'] = Dependente.query.count()
+        estatisticas['total_dependentes'] = Dependente.query.filter_by(is_deleted=False).count()
         
         # Planos de saúde ativos
         estatisticas['total_planos_saude'] = PlanoSaude.query.filter_by(
@@ -2,16 +2,18 @@
 Rotas para relatórios.
 """
 
-from flask import Blueprint, render_template, request, flash, redirect, url_for, jsonify, send_file
+from flask import (
+    Blueprint, Response, render_template, request, flash, redirect, url_for, jsonify,
+    stream_with_context
+)
 from flask_login import login_required, current_user
-import io
 from datetime import datetime, date
 import csv
+from sqlalchemy import exists
 
-from app import db
-from app.models import ColaboradorInterno, PlanoSaude, PlanoOdontologico, Dependente
+from app.models import ColaboradorInterno, NumeroCadastro, PlanoSaude, PlanoOdontologico, Dependente
 from app.decorators import admin_required
-from app.services.report_service import ReportService
+from app.services.report_service import report_service
 
 reports_bp = Blueprint('reports', __name__, url_prefix='/reports')
 
@@ -38,32 +40,19 @@ def colaboradores():
     # Construir query
     query = ColaboradorInterno.query.filter_by(is_deleted=False)
     
+    # NC ativo do colaborador (EXISTS correlacionado)
+    nc_ativo = exists().where(
+        NumeroCadastro.colaborador_id == ColaboradorInterno.id,
+        NumeroCadastro.ativo == True
+    )
+    
     if empresa:
-        query = query.filter(
-            ColaboradorInterno.id.in_(
-                db.session.query(NumeroCadastro.colaborador_id).filter(
-                    NumeroCadastro.cod_empresa == empresa,
-                    NumeroCadastro.ativo == True
-                )
-            )
-        )
+        query = query.filter(nc_ativo.where(NumeroCadastro.cod_empresa == empresa))
     
     if status == 'ativo':
-        query = query.filter(
-            ColaboradorInterno.id.in_(
-                db.session.query(NumeroCadastro.colaborador_id).filter(
-                    NumeroCadastro.ativo == True
-                )
-            )
-        )
+        query = query.filter(nc_ativo)
     elif status == 'inativo':
-        query = query.filter(
-            ~ColaboradorInterno.id.in_(
-                db.session.query(NumeroCadastro.colaborador_id).filter(
-                    NumeroCadastro.ativo == True
-                )
-            )
-        )
+        query = query.filter(~nc_ativo)
     
     colaboradores = query.order_by(ColaboradorInterno.nome).all()
     
@@ -100,7 +89,7 @@ def dependentes():
     """
     Relatório de dependentes.
     """
-    dependentes = Dependente.query.order_by(Dependente.nome).all()
+    dependentes = Dependente.query.filter_by(is_deleted=False).order_by(Dependente.nome).all()
     return render_template('reports/dependentes.html', dependentes=dependentes)
 
 
@@ -113,29 +102,26 @@ def exportar_csv():
     tipo = request.args.get('tipo', 'colaboradores')
     
     try:
-        service = ReportService()
-        
-        if tipo == 'colaboradores':
-            data = service.exportar_colaboradores_csv()
-            filename = f'colaboradores_{date.today().strftime("%Y%m%d")}.csv'
-        elif tipo == 'planos_saude':
-            data = service.exportar_planos_saude_csv()
-            filename = f'planos_saude_{date.today().strftime("%Y%m%d")}.csv'
-        elif tipo == 'planos_odonto':
-            data = service.exportar_planos_odonto_csv()
-            filename = f'planos_odonto_{date.today().strftime("%Y%m%d")}.csv'
-        elif tipo == 'dependentes':
-            data = service.exportar_dependentes_csv()
-            filename = f'dependentes_{date.today().strftime("%Y%m%d")}.csv'
-        else:
+        geradores = {
+            'colaboradores': report_service.gerar_colaboradores_csv,
+            'planos_saude': report_service.gerar_planos_saude_csv,
+            'planos_odonto': report_service.gerar_planos_odonto_csv,
+            'dependentes': report_service.gerar_dependentes_csv,
+        }
+        if tipo not in geradores:
             flash('Tipo de exportação inválido', 'error')
             return redirect(url_for('reports.index'))
         
-        return send_file(
-            io.BytesIO(data.encode('utf-8-sig')),
+        # Enviado em blocos conforme é escrito
+        def gerar():
+            yield '\ufeff'  # BOM (utf-8-sig) para o Excel
+            yield from geradores[tipo]()
+        
+        filename = f'{tipo}_{date.today().strftime("%Y%m%d")}.csv'
+        return Response(
+            stream_with_context(gerar()),
             mimetype='text/csv',
-            as_attachment=True,
-            download_name=filename
+            headers={'Content-Disposition': f'attachment; filename={filename}'}
         )
         
     except Exception as e:
@@ -150,8 +136,7 @@ def api_dashboard():
     Retorna dados para dashboard em formato JSON.
     """
     try:
-        service = ReportService()
-        dados = service.obter_dados_dashboard()
+        dados = report_service.obter_dados_dashboard()
         return jsonify(dados)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
\ No newline at end of file
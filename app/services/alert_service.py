@@ -3,69 +3,356 @@ Serviço para gerenciamento de alertas do sistema.
 """
 
 import logging
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
 from datetime import datetime, timedelta
+from types import MappingProxyType
 from typing import Dict, List, Optional, Tuple, Any
-from sqlalchemy import func, desc, asc, and_, or_
-from sqlalchemy.orm import contains_eager
+from sqlalchemy import (
+    func, desc, asc, and_, case, exists, select, delete, bindparam, text, lambda_stmt,
+    tuple_
+)
+from sqlalchemy.orm import contains_eager, load_only
+from flask import current_app
 
 from app import db
 from app.models import (
-    Alerta, ColaboradorInterno, NumeroCadastro,
+    Alerta, AlertaHistorico, ColaboradorInterno, NumeroCadastro,
     PlanoSaude, PlanoOdontologico, Dependente,
     AtendimentoCoparticipacao, ImportacaoLog
 )
 from app.utils.data_utils import to_brasilia
-from app.exceptions import AlertaError, ValidacaoError
+from app.decorators import memoize
+from app.services.report_service import ReportService
+from app.exceptions import AlertaError, ValidacaoError, OperacaoNaoPermitidaError
 
 logger = logging.getLogger(__name__)
 
 
+# Metadados de um tipo de alerta (acesso por atributo, imutável)
+AlertInfo = namedtuple('AlertInfo', ('descricao', 'gravidade', 'acao_recomendada'))
+
+# Tabela de tipos de alerta, construída uma única vez no carregamento do módulo
+_ALERT_TYPES = MappingProxyType({
+    'CI_SEM_NC': AlertInfo(
+        descricao='Colaborador sem NC ativo',
+        gravidade='MEDIA',
+        acao_recomendada='Verificar se o colaborador possui um NC ativo vinculado'
+    ),
+    'NC_DUPLICADO': AlertInfo(
+        descricao='NC duplicado em uso',
+        gravidade='ALTA',
+        acao_recomendada='Verificar qual colaborador está com o NC correto'
+    ),
+    'CPF_DUPLICADO': AlertInfo(
+        descricao='CPF duplicado no sistema',
+        gravidade='ALTA',
+        acao_recomendada='Verificar dados dos colaboradores com CPF duplicado'
+    ),
+    'PLANO_VENCIDO': AlertInfo(
+        descricao='Plano de saúde vencido',
+        gravidade='MEDIA',
+        acao_recomendada='Verificar renovação do plano'
+    ),
+    'ATENDIMENTO_SEM_PLANO': AlertInfo(
+        descricao='Atendimento sem plano vinculado',
+        gravidade='BAIXA',
+        acao_recomendada='Verificar vínculo do atendimento com plano'
+    ),
+    'DEPENDENTE_SEM_CPF': AlertInfo(
+        descricao='Dependente sem CPF cadastrado',
+        gravidade='BAIXA',
+        acao_recomendada='Solicitar CPF do dependente'
+    ),
+    'IMPORTACAO_ERRO': AlertInfo(
+        descricao='Erro em importação recente',
+        gravidade='ALTA',
+        acao_recomendada='Verificar arquivo de importação'
+    ),
+    'SISTEMA': AlertInfo(
+        descricao='Erro no sistema',
+        gravidade='CRITICA',
+        acao_recomendada='Verificar logs do sistema'
+    )
+})
+
+# Valores padrão pré-extraídos para evitar lookups encadeados em criar_alerta
+_DEFAULT_GRAVIDADE = {tipo: info.gravidade for tipo, info in _ALERT_TYPES.items()}
+_DEFAULT_ACAO = {tipo: info.acao_recomendada for tipo, info in _ALERT_TYPES.items()}
+_gravidade_padrao = _DEFAULT_GRAVIDADE.get
+_acao_padrao = _DEFAULT_ACAO.get
+
+# Catálogo de tipos exposto pela API (estático, montado uma única vez)
+_TIPOS_ALERTAS = tuple(
+    {'tipo': tipo, **info._asdict()}
+    for tipo, info in _ALERT_TYPES.items()
+)
+
+# Níveis de gravidade, do mais para o menos grave
+_GRAVIDADES = ('CRITICA', 'ALTA', 'MEDIA', 'BAIXA')
+
+# Modelos de descrição dos alertas gerados pelo sistema
+_TEMPLATES = {
+    'CI_SEM_NC': 'Colaborador {nome} (ID: {id}) não possui NC ativo',
+    'NC_DUPLICADO': (
+        'NC {chave} está em uso por múltiplos colaboradores: '
+        '{nome_atual} (ID: {id_atual}) e {nome_duplicado} (ID: {id_duplicado})'
+    ),
+    'CPF_DUPLICADO': (
+        'CPF {chave} está cadastrado para múltiplos colaboradores: '
+        '{nome_atual} (ID: {id_atual}) e {nome_duplicado} (ID: {id_duplicado})'
+    ),
+    'PLANO_VENCIDO': 'Plano {operadora} - {plano} vencido há {dias} dias para {nome}',
+    'DEPENDENTE_SEM_CPF': 'Dependente {nome} não possui CPF cadastrado',
+    'IMPORTACAO_ERRO': 'Importação {tipo_importacao} falhou: {detalhes}...',
+    'SISTEMA': 'Scan completo detectou {total} alertas pendentes'
+}
+
+# Chave de dados_relacionados que identifica o alerta aberto de cada tipo
+_CHAVE_POR_TIPO = {
+    'CI_SEM_NC': 'colaborador_id',
+    'NC_DUPLICADO': 'nc',
+    'CPF_DUPLICADO': 'cpf',
+    'PLANO_VENCIDO': 'plano_id',
+    'DEPENDENTE_SEM_CPF': 'dependente_id',
+    'IMPORTACAO_ERRO': 'importacao_id'
+}
+
+# Linhas carregadas por lote nos scans (resultados são percorridos em streaming)
+_SCAN_BATCH_SIZE = 1000
+
+# Alertas excluídos por transação na limpeza (evita locks longos)
+_LIMPEZA_BATCH_SIZE = 10000
+
+# Validade, em segundos, das estatísticas em cache (consultadas pelo dashboard)
+_ESTATISTICAS_TTL = 60
+
+
+def invalidar_cache_alertas() -> None:
+    """
+    Descarta as estatísticas memoizadas.
+    
+    Deve ser chamada após qualquer escrita em alertas, inclusive as feitas
+    diretamente pelas rotas.
+    """
+    _estatisticas_alertas.cache_clear()
+    ReportService.obter_dados_dashboard.cache_clear()
+
+
+@lru_cache(maxsize=None)
+def _stmt_planos_vencidos():
+    """
+    Monta, uma única vez por processo, o SELECT do scan de planos vencidos.
+    
+    A construção é adiada até o primeiro uso porque o relacionamento
+    PlanoSaude.colaborador é um backref e só existe após a configuração
+    dos mappers. O limite de data entra como bindparam ``data_limite``.
+    
+    Returns:
+        Select reutilizável
+    """
+    return select(PlanoSaude).join(
+        PlanoSaude.colaborador
+    ).options(
+        contains_eager(PlanoSaude.colaborador)
+    ).where(
+        PlanoSaude.data_fim.isnot(None),
+        PlanoSaude.data_fim < bindparam('data_limite'),
+        PlanoSaude.ativo == True
+    )
+
+
+def _payload(
+    *,
+    ci: Optional[ColaboradorInterno] = None,
+    cis: Optional[List[ColaboradorInterno]] = None,
+    plano: Optional[PlanoSaude] = None,
+    dependente: Optional[Dependente] = None,
+    importacao: Optional[ImportacaoLog] = None,
+    **extras: Any
+) -> Dict[str, Any]:
+    """
+    Monta o dados_relacionados mínimo de um alerta.
+    
+    Guarda apenas os identificadores usados nas verificações de duplicidade
+    e na navegação; nome, CPF, empresa etc. são obtidos pelas entidades
+    referenciadas quando o alerta é exibido.
+    
+    Args:
+        ci: Colaborador do alerta
+        cis: Colaboradores envolvidos (duplicidades)
+        plano: Plano de saúde do alerta
+        dependente: Dependente do alerta
+        importacao: Log de importação do alerta
+        **extras: Campos adicionais (chave de duplicidade, datas etc.)
+    
+    Returns:
+        Dicionário para dados_relacionados
+    """
+    payload = {}
+    
+    if ci is not None:
+        payload['colaborador_id'] = ci.id
+    if cis:
+        payload['colaborador_ids'] = [c.id for c in cis]
+    if plano is not None:
+        payload['plano_id'] = plano.id
+        payload['colaborador_id'] = plano.colaborador_id
+    if dependente is not None:
+        payload['dependente_id'] = dependente.id
+        payload['colaborador_id'] = dependente.colaborador_id
+    if importacao is not None:
+        payload['importacao_id'] = importacao.id
+    
+    payload.update(extras)
+    return payload
+
+
+def _expr_dias_resolucao(dialeto: str):
+    """
+    Expressão SQL com o tempo de resolução de um alerta, em dias.
+    
+    Args:
+        dialeto: Nome do dialeto do banco (postgresql, mysql, sqlite)
+    
+    Returns:
+        Expressão SQLAlchemy
+    """
+    if dialeto == 'postgresql':
+        return func.extract('epoch', Alerta.data_resolucao - Alerta.data_alerta) / 86400.0
+    if dialeto == 'mysql':
+        return func.timestampdiff(
+            text('SECOND'), Alerta.data_alerta, Alerta.data_resolucao
+        ) / 86400.0
+    return func.julianday(Alerta.data_resolucao) - func.julianday(Alerta.data_alerta)
+
+
+@lru_cache(maxsize=None)
+def _stmt_tempo_resolucao(dialeto: str):
+    """
+    Monta, uma vez por dialeto, o SELECT de média/máximo/mínimo do tempo de
+    resolução (em dias) dos alertas resolvidos.
+    
+    Args:
+        dialeto: Nome do dialeto do banco
+    
+    Returns:
+        Select reutilizável
+    """
+    dias_resolucao = _expr_dias_resolucao(dialeto)
+    return select(
+        func.avg(dias_resolucao),
+        func.max(dias_resolucao),
+        func.min(dias_resolucao)
+    ).where(
+        Alerta.resolvido == True,
+        Alerta.data_resolucao.isnot(None)
+    )
+
+
+# Consultas do dashboard: lambda_stmt guarda a construção e a chave de cache
+# do SQL compilado, evitando remontar o SELECT a cada chamada
+_STMT_CONTAGENS = lambda_stmt(
+    lambda: select(Alerta.gravidade, Alerta.resolvido, func.count())
+    .group_by(Alerta.gravidade, Alerta.resolvido)
+)
+_STMT_ABERTOS_POR_TIPO = lambda_stmt(
+    lambda: select(Alerta.tipo, func.count())
+    .where(Alerta.resolvido == False)
+    .group_by(Alerta.tipo)
+)
+
+
+def _alerta_existente(tipo: str, campo: str, valor: Any) -> Optional[Alerta]:
+    """
+    Obtém o alerta não resolvido do tipo cuja chave em dados_relacionados
+    corresponde ao valor informado.
+    
+    A consulta não é memoizada: alertas também são resolvidos, reabertos e
+    excluídos pelas rotas e por outros workers, e um resultado em cache
+    devolveria alertas já resolvidos ou permitiria duplicados.
+    
+    Args:
+        tipo: Tipo de alerta
+        campo: Chave em dados_relacionados
+        valor: Valor esperado da chave
+    
+    Returns:
+        Alerta existente ou None
+    """
+    chave = Alerta.dados_relacionados[campo]
+    chave = chave.as_integer() if isinstance(valor, int) else chave.as_string()
+    
+    return Alerta.query.filter(
+        Alerta.tipo == tipo,
+        Alerta.resolvido == False,
+        chave == valor
+    ).first()
+
+
+@memoize(ttl=_ESTATISTICAS_TTL)
+def _estatisticas_alertas() -> Dict[str, Any]:
+    """
+    Calcula as estatísticas de alertas (ver AlertService.obter_estatisticas).
+    
+    Função de módulo para que o cache não dependa da instância do serviço;
+    fica válido por _ESTATISTICAS_TTL segundos e é descartado por
+    invalidar_cache_alertas().
+    
+    Returns:
+        Dicionário com estatísticas
+    """
+    estatisticas = {'total': 0, 'abertos': 0, 'resolvidos': 0}
+    for gravidade in _GRAVIDADES:
+        estatisticas[f'{gravidade.lower()}_abertos'] = 0
+        estatisticas[f'{gravidade.lower()}_total'] = 0
+    
+    # Totais e contagens por gravidade em uma única consulta
+    contagens = db.session.execute(_STMT_CONTAGENS).all()
+    
+    for gravidade, resolvido, total in contagens:
+        estatisticas['total'] += total
+        if resolvido is True:
+            estatisticas['resolvidos'] += total
+        elif resolvido is False:
+            estatisticas['abertos'] += total
+        
+        if gravidade in _GRAVIDADES:
+            estatisticas[f'{gravidade.lower()}_total'] += total
+            if resolvido is False:
+                estatisticas[f'{gravidade.lower()}_abertos'] += total
+    
+    # Por tipo
+    estatisticas['por_tipo'] = [
+        {'tipo': tipo, 'total': total}
+        for tipo, total in db.session.execute(_STMT_ABERTOS_POR_TIPO)
+    ]
+    
+    # Alertas recentes (últimos 7 dias); data_limite vira bindparam
+    data_limite = datetime.utcnow() - timedelta(days=7)
+    estatisticas['recentes_7_dias'] = db.session.execute(lambda_stmt(
+        lambda: select(func.count()).select_from(Alerta)
+        .where(Alerta.data_alerta >= data_limite)
+    )).scalar()
+    
+    # Tempo de resolução (em dias), agregado no banco
+    media, maximo, minimo = db.session.execute(
+        _stmt_tempo_resolucao(db.engine.dialect.name)
+    ).one()
+    
+    if media is not None:
+        estatisticas['media_resolucao_dias'] = round(float(media), 2)
+        estatisticas['max_resolucao_dias'] = round(float(maximo), 2)
+        estatisticas['min_resolucao_dias'] = round(float(minimo), 2)
+    
+    return estatisticas
+
+
 class AlertService:
     """Serviço para gerenciamento de alertas."""
     
-    def __init__(self):
-        self.alert_types = {
-            'CI_SEM_NC': {
-                'descricao': 'Colaborador sem NC ativo',
-                'gravidade': 'MEDIA',
-                'acao_recomendada': 'Verificar se o colaborador possui um NC ativo vinculado'
-            },
-            'NC_DUPLICADO': {
-                'descricao': 'NC duplicado em uso',
-                'gravidade': 'ALTA',
-                'acao_recomendada': 'Verificar qual colaborador está com o NC correto'
-            },
-            'CPF_DUPLICADO': {
-                'descricao': 'CPF duplicado no sistema',
-                'gravidade': 'ALTA',
-                'acao_recomendada': 'Verificar dados dos colaboradores com CPF duplicado'
-            },
-            'PLANO_VENCIDO': {
-                'descricao': 'Plano de saúde vencido',
-                'gravidade': 'MEDIA',
-                'acao_recomendada': 'Verificar renovação do plano'
-            },
-            'ATENDIMENTO_SEM_PLANO': {
-                'descricao': 'Atendimento sem plano vinculado',
-                'gravidade': 'BAIXA',
-                'acao_recomendada': 'Verificar vínculo do atendimento com plano'
-            },
-            'DEPENDENTE_SEM_CPF': {
-                'descricao': 'Dependente sem CPF cadastrado',
-                'gravidade': 'BAIXA',
-                'acao_recomendada': 'Solicitar CPF do dependente'
-            },
-            'IMPORTACAO_ERRO': {
-                'descricao': 'Erro em importação recente',
-                'gravidade': 'ALTA',
-                'acao_recomendada': 'Verificar arquivo de importação'
-            },
-            'SISTEMA': {
-                'descricao': 'Erro no sistema',
-                'gravidade': 'CRITICA',
-                'acao_recomendada': 'Verificar logs do sistema'
-            }
-        }
+    alert_types = _ALERT_TYPES
     
     # ============================================================================
     # MÉTODOS DE BUSCA E CONSULTA
@@ -146,7 +433,7 @@ class AlertService:
             Alerta ou None
         """
         try:
-            return Alerta.query.get(alerta_id)
+            return db.session.get(Alerta, alerta_id)
         except Exception as e:
             raise AlertaError(f"Erro ao obter alerta: {str(e)}")
     
@@ -182,6 +469,75 @@ class AlertService:
     # MÉTODOS DE CRIAÇÃO
     # ============================================================================
     
+    def _build_alerta(
+        self,
+        tipo: str,
+        descricao: str,
+        gravidade: str = None,
+        acao_recomendada: str = None,
+        dados_relacionados: Dict = None,
+        agora: Optional[datetime] = None,
+        dedup_key: Optional[str] = None
+    ) -> Alerta:
+        """
+        Monta uma instância de alerta sem adicioná-la à sessão.
+        
+        Args:
+            tipo: Tipo de alerta
+            descricao: Descrição do alerta
+            gravidade: Gravidade (CRITICA, ALTA, MEDIA, BAIXA)
+            acao_recomendada: Ação recomendada
+            dados_relacionados: Dados relacionados
+            agora: Momento de referência (UTC) para data_alerta
+            dedup_key: Chave de duplicidade já calculada (opcional)
+        
+        Returns:
+            Alerta não persistido
+        """
+        # Validar tipo
+        if tipo not in _ALERT_TYPES:
+            logger.warning("Tipo de alerta desconhecido: %s", tipo)
+        
+        # Definir gravidade e ação recomendada padrão
+        gravidade = gravidade or _gravidade_padrao(tipo) or 'MEDIA'
+        acao_recomendada = acao_recomendada or _acao_padrao(tipo) or ''
+        
+        if agora is None:
+            agora = datetime.utcnow()
+        
+        if dedup_key is None:
+            dedup_key = Alerta.gerar_dedup_key(tipo, descricao, agora.date())
+        
+        return Alerta(
+            tipo=tipo,
+            descricao=descricao,
+            gravidade=gravidade,
+            acao_recomendada=acao_recomendada,
+            dados_relacionados=dados_relacionados or {},
+            resolvido=False,
+            data_alerta=agora,
+            dedup_key=dedup_key
+        )
+    
+    def _persist(self, alertas: List[Alerta], commit: bool = True) -> List[Alerta]:
+        """
+        Adiciona os alertas à sessão e, opcionalmente, confirma a transação.
+        
+        Os INSERTs pendentes são enviados em lote no próximo flush.
+        
+        Args:
+            alertas: Alertas a persistir
+            commit: Se False, a confirmação fica a cargo de quem chamou
+        
+        Returns:
+            Os próprios alertas
+        """
+        db.session.add_all(alertas)
+        if commit:
+            db.session.commit()
+        invalidar_cache_alertas()
+        return alertas
+    
     def criar_alerta(
         self,
         tipo: str,
@@ -189,7 +545,9 @@ class AlertService:
         gravidade: str = None,
         acao_recomendada: str = None,
         dados_relacionados: Dict = None,
-        evitar_duplicados: bool = True
+        evitar_duplicados: bool = True,
+        commit: bool = True,
+        agora: Optional[datetime] = None
     ) -> Alerta:
         """
         Cria um novo alerta.
@@ -201,68 +559,184 @@ class AlertService:
             acao_recomendada: Ação recomendada
             dados_relacionados: Dados relacionados
             evitar_duplicados: Evitar alertas duplicados no mesmo dia
+            commit: Confirmar a transação ao final (False dentro de scans)
+            agora: Momento de referência (UTC); scans passam um único valor
+                para todos os alertas criados
         
         Returns:
             Alerta criado
         """
         try:
-            # Validar tipo
-            if tipo not in self.alert_types:
-                logger.warning(f"Tipo de alerta desconhecido: {tipo}")
-            
-            # Definir gravidade padrão
-            if not gravidade:
-                gravidade = self.alert_types.get(tipo, {}).get('gravidade', 'MEDIA')
+            if agora is None:
+                agora = datetime.utcnow()
             
-            # Definir ação recomendada padrão
-            if not acao_recomendada:
-                acao_recomendada = self.alert_types.get(tipo, {}).get('acao_recomendada', '')
+            dedup_key = Alerta.gerar_dedup_key(tipo, descricao, agora.date())
             
-            # Evitar alertas duplicados
+            # Evitar alertas duplicados (mesmo tipo e descrição no mesmo dia)
             if evitar_duplicados:
-                hoje = datetime.now().date()
-                inicio_dia = datetime(hoje.year, hoje.month, hoje.day)
-                fim_dia = inicio_dia + timedelta(days=1)
-                
                 similar = Alerta.query.filter(
                     Alerta.tipo == tipo,
-                    Alerta.descricao == descricao,
-                    Alerta.data_alerta >= inicio_dia,
-                    Alerta.data_alerta < fim_dia,
+                    Alerta.dedup_key == dedup_key,
                     Alerta.resolvido == False
                 ).first()
                 
                 if similar:
-                    logger.info(f"Alerta duplicado ignorado: {tipo} - {descricao}")
+                    logger.info("Alerta duplicado ignorado: %s - %s", tipo, descricao)
                     return similar
             
-            # Criar alerta
-            alerta = Alerta(
+            alerta = self._build_alerta(
                 tipo=tipo,
                 descricao=descricao,
                 gravidade=gravidade,
                 acao_recomendada=acao_recomendada,
-                dados_relacionados=dados_relacionados or {},
-                resolvido=False,
-                data_alerta=datetime.utcnow()
+                dados_relacionados=dados_relacionados,
+                agora=agora,
+                dedup_key=dedup_key
             )
+            self._persist([alerta], commit=commit)
             
-            db.session.add(alerta)
-            db.session.commit()
-            
-            logger.info(f"Alerta criado: {tipo} - {descricao}")
+            logger.info("Alerta criado: %s - %s", tipo, descricao)
             return alerta
             
         except Exception as e:
-            db.session.rollback()
+            if commit:
+                db.session.rollback()
             raise AlertaError(f"Erro ao criar alerta: {str(e)}")
     
-    def criar_alerta_ci_sem_nc(self, colaborador: ColaboradorInterno) -> Optional[Alerta]:
+    def _prefetch_open_alert_keys(
+        self,
+        colaborador_ids: Optional[List[int]] = None
+    ) -> Dict[str, Dict[Any, Alerta]]:
+        """
+        Carrega, em uma única consulta, todos os alertas abertos dos tipos
+        verificados pelos scans, indexados pela chave de dados_relacionados.
+        
+        O dicionário também serve de conjunto de deduplicação da sessão:
+        alertas criados com ele são registrados sob sua chave.
+        
+        Args:
+            colaborador_ids: Restringe aos alertas desses colaboradores
+                (tipos cujo dados_relacionados traz colaborador_id)
+        
+        Returns:
+            Dicionário {tipo: {chave: Alerta}}
+        """
+        chaves_abertas = {tipo: {} for tipo in _CHAVE_POR_TIPO}
+        
+        abertos = Alerta.query.options(
+            load_only(Alerta.id, Alerta.tipo, Alerta.dados_relacionados)
+        ).filter(
+            Alerta.resolvido == False,
+            Alerta.tipo.in_(list(_CHAVE_POR_TIPO))
+        )
+        if colaborador_ids is not None:
+            abertos = abertos.filter(
+                Alerta.tipo.in_(('CI_SEM_NC', 'PLANO_VENCIDO', 'DEPENDENTE_SEM_CPF')),
+                Alerta.dados_relacionados['colaborador_id'].as_integer().in_(colaborador_ids)
+            )
+        abertos = abertos.yield_per(_SCAN_BATCH_SIZE)
+        
+        for alerta in abertos:
+            chave = (alerta.dados_relacionados or {}).get(_CHAVE_POR_TIPO[alerta.tipo])
+            if chave is not None:
+                chaves_abertas[alerta.tipo].setdefault(chave, alerta)
+        
+        return chaves_abertas
+    
+    def _buscar_alerta_aberto(
+        self,
+        tipo: str,
+        valor: Any,
+        chaves_abertas: Optional[Dict[str, Dict[Any, Alerta]]] = None
+    ) -> Optional[Alerta]:
+        """
+        Obtém o alerta aberto do tipo para a chave informada.
+        
+        Args:
+            tipo: Tipo de alerta
+            valor: Valor da chave do tipo (ver _CHAVE_POR_TIPO)
+            chaves_abertas: Alertas pré-carregados; se None, consulta o banco
+        
+        Returns:
+            Alerta existente ou None
+        """
+        if chaves_abertas is not None:
+            return chaves_abertas[tipo].get(valor)
+        return _alerta_existente(tipo, _CHAVE_POR_TIPO[tipo], valor)
+    
+    def obter_alerta_aberto_mesma_chave(self, alerta: Alerta) -> Optional[Alerta]:
+        """
+        Obtém outro alerta aberto com a mesma chave do alerta informado.
+        
+        Só pode haver um alerta aberto por chave (índice único parcial em
+        Alerta); reabrir um alerta resolvido cuja chave já tem um alerta
+        aberto, criado por um scan posterior, violaria essa restrição.
+        
+        Args:
+            alerta: Alerta de referência
+        
+        Returns:
+            Alerta aberto com a mesma chave ou None
+        """
+        campo = _CHAVE_POR_TIPO.get(alerta.tipo)
+        if campo is None:
+            return None
+        
+        valor = (alerta.dados_relacionados or {}).get(campo)
+        if valor is None:
+            return None
+        
+        existente = _alerta_existente(alerta.tipo, campo, valor)
+        if existente is None or existente.id == alerta.id:
+            return None
+        return existente
+    
+    def _criar_alerta_chaveado(
+        self,
+        tipo: str,
+        valor: Any,
+        chaves_abertas: Optional[Dict[str, Dict[Any, Alerta]]],
+        **kwargs: Any
+    ) -> Alerta:
+        """
+        Cria um alerta identificado por chave (ver _CHAVE_POR_TIPO).
+        
+        Dentro de um scan, a consulta de alertas abertos pré-carregados já
+        cobre a duplicidade diária; a consulta por dedup_key é dispensada
+        para que os alertas fiquem pendentes e sejam inseridos em lote.
+        
+        Args:
+            tipo: Tipo de alerta
+            valor: Valor da chave do alerta
+            chaves_abertas: Alertas abertos pré-carregados, ou None
+            **kwargs: Demais argumentos de criar_alerta
+        
+        Returns:
+            Alerta criado
+        """
+        if chaves_abertas is None:
+            return self.criar_alerta(tipo=tipo, **kwargs)
+        
+        alerta = self.criar_alerta(tipo=tipo, evitar_duplicados=False, **kwargs)
+        chaves_abertas[tipo][valor] = alerta
+        return alerta
+    
+    def criar_alerta_ci_sem_nc(
+        self,
+        colaborador: ColaboradorInterno,
+        commit: bool = True,
+        agora: Optional[datetime] = None,
+        chaves_abertas: Optional[Dict[str, Dict[Any, Alerta]]] = None
+    ) -> Optional[Alerta]:
         """
         Cria alerta para colaborador sem NC ativo.
         
         Args:
             colaborador: ColaboradorInterno
+            commit: Confirmar a transação ao final
+            agora: Momento de referência (UTC)
+            chaves_abertas: Alertas abertos pré-carregados (ver
+                _prefetch_open_alert_keys); evita consultar o banco
         
         Returns:
             Alerta criado ou None
@@ -276,38 +750,39 @@ class AlertService:
                 return None
             
             # Verificar se já existe alerta não resolvido
-            alerta_existente = Alerta.query.filter_by(
-                tipo='CI_SEM_NC',
-                resolvido=False
-            ).filter(
-                Alerta.dados_relacionados['colaborador_id'].astext == str(colaborador.id)
-            ).first()
+            alerta_existente = self._buscar_alerta_aberto('CI_SEM_NC', colaborador.id, chaves_abertas)
             
             if alerta_existente:
                 return alerta_existente
             
             # Criar alerta
-            return self.criar_alerta(
-                tipo='CI_SEM_NC',
-                descricao=f'Colaborador {colaborador.nome} (ID: {colaborador.id}) não possui NC ativo',
+            return self._criar_alerta_chaveado(
+                'CI_SEM_NC',
+                colaborador.id,
+                chaves_abertas,
+                descricao=_TEMPLATES['CI_SEM_NC'].format_map({
+                    'nome': colaborador.nome,
+                    'id': colaborador.id
+                }),
                 gravidade='MEDIA',
                 acao_recomendada='Verificar e atribuir um NC ativo para o colaborador',
-                dados_relacionados={
-                    'colaborador_id': colaborador.id,
-                    'colaborador_nome': colaborador.nome,
-                    'colaborador_cpf': colaborador.cpf
-                }
+                dados_relacionados=_payload(ci=colaborador),
+                commit=commit,
+                agora=agora
             )
             
         except Exception as e:
-            logger.error(f"Erro ao criar alerta CI_SEM_NC: {str(e)}")
+            logger.error("Erro ao criar alerta CI_SEM_NC: %s", e)
             return None
     
     def criar_alerta_nc_duplicado(
         self,
         nc: str,
         ci_atual: ColaboradorInterno,
-        ci_duplicado: ColaboradorInterno
+        ci_duplicado: ColaboradorInterno,
+        commit: bool = True,
+        agora: Optional[datetime] = None,
+        chaves_abertas: Optional[Dict[str, Dict[Any, Alerta]]] = None
     ) -> Optional[Alerta]:
         """
         Cria alerta para NC duplicado.
@@ -316,56 +791,52 @@ class AlertService:
             nc: Número de cadastro
             ci_atual: Colaborador atual com o NC
             ci_duplicado: Colaborador duplicado com o mesmo NC
+            commit: Confirmar a transação ao final
+            agora: Momento de referência (UTC)
+            chaves_abertas: Alertas abertos pré-carregados (ver
+                _prefetch_open_alert_keys); evita consultar o banco
         
         Returns:
             Alerta criado ou None
         """
         try:
             # Verificar se já existe alerta não resolvido
-            alerta_existente = Alerta.query.filter_by(
-                tipo='NC_DUPLICADO',
-                resolvido=False
-            ).filter(
-                Alerta.dados_relacionados['nc'].astext == nc
-            ).first()
+            alerta_existente = self._buscar_alerta_aberto('NC_DUPLICADO', nc, chaves_abertas)
             
             if alerta_existente:
                 return alerta_existente
             
             # Criar alerta
-            return self.criar_alerta(
-                tipo='NC_DUPLICADO',
-                descricao=f'NC {nc} está em uso por múltiplos colaboradores: {ci_atual.nome} (ID: {ci_atual.id}) e {ci_duplicado.nome} (ID: {ci_duplicado.id})',
+            return self._criar_alerta_chaveado(
+                'NC_DUPLICADO',
+                nc,
+                chaves_abertas,
+                descricao=_TEMPLATES['NC_DUPLICADO'].format_map({
+                    'chave': nc,
+                    'nome_atual': ci_atual.nome,
+                    'id_atual': ci_atual.id,
+                    'nome_duplicado': ci_duplicado.nome,
+                    'id_duplicado': ci_duplicado.id
+                }),
                 gravidade='ALTA',
                 acao_recomendada='Verificar qual colaborador deve manter o NC e corrigir o outro',
-                dados_relacionados={
-                    'nc': nc,
-                    'colaboradores': [
-                        {
-                            'id': ci_atual.id,
-                            'nome': ci_atual.nome,
-                            'cpf': ci_atual.cpf,
-                            'empresa_atual': ci_atual.empresa_atual
-                        },
-                        {
-                            'id': ci_duplicado.id,
-                            'nome': ci_duplicado.nome,
-                            'cpf': ci_duplicado.cpf,
-                            'empresa_atual': ci_duplicado.empresa_atual
-                        }
-                    ]
-                }
+                dados_relacionados=_payload(cis=[ci_atual, ci_duplicado], nc=nc),
+                commit=commit,
+                agora=agora
             )
             
         except Exception as e:
-            logger.error(f"Erro ao criar alerta NC_DUPLICADO: {str(e)}")
+            logger.error("Erro ao criar alerta NC_DUPLICADO: %s", e)
             return None
     
     def criar_alerta_cpf_duplicado(
         self,
         cpf: str,
         ci_atual: ColaboradorInterno,
-        ci_duplicado: ColaboradorInterno
+        ci_duplicado: ColaboradorInterno,
+        commit: bool = True,
+        agora: Optional[datetime] = None,
+        chaves_abertas: Optional[Dict[str, Dict[Any, Alerta]]] = None
     ) -> Optional[Alerta]:
         """
         Cria alerta para CPF duplicado.
@@ -374,57 +845,60 @@ class AlertService:
             cpf: CPF duplicado
             ci_atual: Colaborador atual com o CPF
             ci_duplicado: Colaborador duplicado com o mesmo CPF
+            commit: Confirmar a transação ao final
+            agora: Momento de referência (UTC)
+            chaves_abertas: Alertas abertos pré-carregados (ver
+                _prefetch_open_alert_keys); evita consultar o banco
         
         Returns:
             Alerta criado ou None
         """
         try:
             # Verificar se já existe alerta não resolvido
-            alerta_existente = Alerta.query.filter_by(
-                tipo='CPF_DUPLICADO',
-                resolvido=False
-            ).filter(
-                Alerta.dados_relacionados['cpf'].astext == cpf
-            ).first()
+            alerta_existente = self._buscar_alerta_aberto('CPF_DUPLICADO', cpf, chaves_abertas)
             
             if alerta_existente:
                 return alerta_existente
             
             # Criar alerta
-            return self.criar_alerta(
-                tipo='CPF_DUPLICADO',
-                descricao=f'CPF {cpf} está cadastrado para múltiplos colaboradores: {ci_atual.nome} (ID: {ci_atual.id}) e {ci_duplicado.nome} (ID: {ci_duplicado.id})',
+            return self._criar_alerta_chaveado(
+                'CPF_DUPLICADO',
+                cpf,
+                chaves_abertas,
+                descricao=_TEMPLATES['CPF_DUPLICADO'].format_map({
+                    'chave': cpf,
+                    'nome_atual': ci_atual.nome,
+                    'id_atual': ci_atual.id,
+                    'nome_duplicado': ci_duplicado.nome,
+                    'id_duplicado': ci_duplicado.id
+                }),
                 gravidade='ALTA',
                 acao_recomendada='Verificar dados e corrigir o CPF duplicado',
-                dados_relacionados={
-                    'cpf': cpf,
-                    'colaboradores': [
-                        {
-                            'id': ci_atual.id,
-                            'nome': ci_atual.nome,
-                            'nc_atual': ci_atual.nc_atual,
-                            'empresa_atual': ci_atual.empresa_atual
-                        },
-                        {
-                            'id': ci_duplicado.id,
-                            'nome': ci_duplicado.nome,
-                            'nc_atual': ci_duplicado.nc_atual,
-                            'empresa_atual': ci_duplicado.empresa_atual
-                        }
-                    ]
-                }
+                dados_relacionados=_payload(cis=[ci_atual, ci_duplicado], cpf=cpf),
+                commit=commit,
+                agora=agora
             )
             
         except Exception as e:
-            logger.error(f"Erro ao criar alerta CPF_DUPLICADO: {str(e)}")
+            logger.error("Erro ao criar alerta CPF_DUPLICADO: %s", e)
             return None
     
-    def criar_alerta_plano_vencido(self, plano: PlanoSaude) -> Optional[Alerta]:
+    def criar_alerta_plano_vencido(
+        self,
+        plano: PlanoSaude,
+        commit: bool = True,
+        agora: Optional[datetime] = None,
+        chaves_abertas: Optional[Dict[str, Dict[Any, Alerta]]] = None
+    ) -> Optional[Alerta]:
         """
         Cria alerta para plano de saúde vencido.
         
         Args:
             plano: Plano de saúde vencido
+            commit: Confirmar a transação ao final
+            agora: Momento de referência (UTC)
+            chaves_abertas: Alertas abertos pré-carregados (ver
+                _prefetch_open_alert_keys); evita consultar o banco
         
         Returns:
             Alerta criado ou None
@@ -434,49 +908,60 @@ class AlertService:
                 return None
             
             # Verificar se plano está vencido há mais de 30 dias
-            dias_vencido = (datetime.now().date() - plano.data_fim).days
+            if agora is None:
+                agora = datetime.utcnow()
+            dias_vencido = (agora.date() - plano.data_fim).days
             if dias_vencido <= 0:
                 return None
             
             # Verificar se já existe alerta não resolvido
-            alerta_existente = Alerta.query.filter_by(
-                tipo='PLANO_VENCIDO',
-                resolvido=False
-            ).filter(
-                Alerta.dados_relacionados['plano_id'].astext == str(plano.id)
-            ).first()
+            alerta_existente = self._buscar_alerta_aberto('PLANO_VENCIDO', plano.id, chaves_abertas)
             
             if alerta_existente:
                 return alerta_existente
             
             # Criar alerta
-            return self.criar_alerta(
-                tipo='PLANO_VENCIDO',
-                descricao=f'Plano {plano.operadora} - {plano.plano} vencido há {dias_vencido} dias para {plano.colaborador.nome}',
-                gravidade='MEDIA' if dias_vencido <= 30 else 'ALTA',
-                acao_recomendada=f'{"Atualizar" if plano.ativo else "Renovar"} plano de saúde',
-                dados_relacionados={
-                    'plano_id': plano.id,
-                    'colaborador_id': plano.colaborador_id,
-                    'colaborador_nome': plano.colaborador.nome,
+            return self._criar_alerta_chaveado(
+                'PLANO_VENCIDO',
+                plano.id,
+                chaves_abertas,
+                descricao=_TEMPLATES['PLANO_VENCIDO'].format_map({
                     'operadora': plano.operadora,
                     'plano': plano.plano,
-                    'data_fim': plano.data_fim.isoformat(),
-                    'dias_vencido': dias_vencido,
-                    'esta_ativo': plano.ativo
-                }
+                    'dias': dias_vencido,
+                    'nome': plano.colaborador.nome
+                }),
+                gravidade='MEDIA' if dias_vencido <= 30 else 'ALTA',
+                acao_recomendada=f'{"Atualizar" if plano.ativo else "Renovar"} plano de saúde',
+                dados_relacionados=_payload(
+                    plano=plano,
+                    data_fim=plano.data_fim.isoformat(),
+                    dias_vencido=dias_vencido
+                ),
+                commit=commit,
+                agora=agora
             )
             
         except Exception as e:
-            logger.error(f"Erro ao criar alerta PLANO_VENCIDO: {str(e)}")
+            logger.error("Erro ao criar alerta PLANO_VENCIDO: %s", e)
             return None
     
-    def criar_alerta_dependente_sem_cpf(self, dependente: Dependente) -> Optional[Alerta]:
+    def criar_alerta_dependente_sem_cpf(
+        self,
+        dependente: Dependente,
+        commit: bool = True,
+        agora: Optional[datetime] = None,
+        chaves_abertas: Optional[Dict[str, Dict[Any, Alerta]]] = None
+    ) -> Optional[Alerta]:
         """
         Cria alerta para dependente sem CPF.
         
         Args:
             dependente: Dependente sem CPF
+            commit: Confirmar a transação ao final
+            agora: Momento de referência (UTC)
+            chaves_abertas: Alertas abertos pré-carregados (ver
+                _prefetch_open_alert_keys); evita consultar o banco
         
         Returns:
             Alerta criado ou None
@@ -486,292 +971,502 @@ class AlertService:
                 return None
             
             # Verificar se já existe alerta não resolvido
-            alerta_existente = Alerta.query.filter_by(
-                tipo='DEPENDENTE_SEM_CPF',
-                resolvido=False
-            ).filter(
-                Alerta.dados_relacionados['dependente_id'].astext == str(dependente.id)
-            ).first()
+            alerta_existente = self._buscar_alerta_aberto('DEPENDENTE_SEM_CPF', dependente.id, chaves_abertas)
             
             if alerta_existente:
                 return alerta_existente
             
             # Criar alerta
-            return self.criar_alerta(
-                tipo='DEPENDENTE_SEM_CPF',
-                descricao=f'Dependente {dependente.nome} não possui CPF cadastrado',
+            return self._criar_alerta_chaveado(
+                'DEPENDENTE_SEM_CPF',
+                dependente.id,
+                chaves_abertas,
+                descricao=_TEMPLATES['DEPENDENTE_SEM_CPF'].format_map({
+                    'nome': dependente.nome
+                }),
                 gravidade='BAIXA',
                 acao_recomendada='Solicitar e cadastrar CPF do dependente',
-                dados_relacionados={
-                    'dependente_id': dependente.id,
-                    'dependente_nome': dependente.nome,
-                    'colaborador_id': dependente.colaborador_id,
-                    'colaborador_nome': dependente.titular.nome if dependente.titular else None,
-                    'parentesco': dependente.parentesco
-                }
+                dados_relacionados=_payload(dependente=dependente),
+                commit=commit,
+                agora=agora
             )
             
         except Exception as e:
-            logger.error(f"Erro ao criar alerta DEPENDENTE_SEM_CPF: {str(e)}")
+            logger.error("Erro ao criar alerta DEPENDENTE_SEM_CPF: %s", e)
             return None
     
     # ============================================================================
     # MÉTODOS DE VERIFICAÇÃO E SCAN
     # ============================================================================
     
-    def scan_colaboradores_sem_nc(self) -> Tuple[int, List[Alerta]]:
+    def _carregar_colaboradores(self, duplicados: List[Tuple]) -> Dict[int, ColaboradorInterno]:
+        """
+        Carrega, em uma única consulta, os colaboradores referenciados pelas
+        linhas agrupadas dos scans de duplicidade.
+        
+        Args:
+            duplicados: Linhas (chave, ci_atual_id, ci_duplicado_id)
+        
+        Returns:
+            Dicionário {id: ColaboradorInterno}
+        """
+        ids = set()
+        for _, ci_atual_id, ci_duplicado_id in duplicados:
+            ids.add(ci_atual_id)
+            ids.add(ci_duplicado_id)
+        
+        if not ids:
+            return {}
+        
+        return {
+            ci.id: ci
+            for ci in ColaboradorInterno.query.filter(ColaboradorInterno.id.in_(ids)).all()
+        }
+    
+    def scan_colaboradores_sem_nc(
+        self,
+        commit: bool = True,
+        agora: Optional[datetime] = None,
+        chaves_abertas: Optional[Dict[str, Dict[Any, Alerta]]] = None
+    ) -> Tuple[int, List[Alerta]]:
         """
         Verifica colaboradores sem NC ativo.
         
+        Args:
+            commit: Confirmar a transação ao final do scan
+            agora: Momento de referência (UTC) compartilhado pelos alertas
+            chaves_abertas: Alertas abertos pré-carregados por tipo
+        
         Returns:
             Tuple (total_encontrados, alertas_criados)
         """
         try:
-            # Buscar colaboradores ativos sem NC ativo
+            # Buscar colaboradores ativos sem NC ativo (anti-join: para no
+            # primeiro NC ativo encontrado em idx_nc_colaborador_ativo)
             colaboradores = ColaboradorInterno.query.filter_by(
                 is_deleted=False
             ).filter(
-                ~ColaboradorInterno.id.in_(
-                    db.session.query(NumeroCadastro.colaborador_id).filter_by(
-                        ativo=True
-                    )
+                ~exists().where(
+                    NumeroCadastro.colaborador_id == ColaboradorInterno.id,
+                    NumeroCadastro.ativo == True
                 )
-            ).all()
+            ).yield_per(_SCAN_BATCH_SIZE)
             
+            # Aliases locais para o laço por linha
+            criar = self.criar_alerta_ci_sem_nc
+            total = 0
             alertas = []
+            adicionar = alertas.append
             for ci in colaboradores:
-                alerta = self.criar_alerta_ci_sem_nc(ci)
+                total += 1
+                # O anti-join já garante que não há NC ativo
+                ci.nc_ativo = None
+                alerta = criar(ci, commit=False, agora=agora, chaves_abertas=chaves_abertas)
                 if alerta:
-                    alertas.append(alerta)
+                    adicionar(alerta)
+            
+            if commit:
+                db.session.commit()
             
-            return len(colaboradores), alertas
+            return total, alertas
             
         except Exception as e:
+            if commit:
+                db.session.rollback()
             raise AlertaError(f"Erro no scan de colaboradores sem NC: {str(e)}")
     
-    def scan_ncs_duplicados(self) -> Tuple[int, List[Alerta]]:
+    def scan_ncs_duplicados(
+        self,
+        commit: bool = True,
+        agora: Optional[datetime] = None,
+        chaves_abertas: Optional[Dict[str, Dict[Any, Alerta]]] = None
+    ) -> Tuple[int, List[Alerta]]:
         """
         Verifica NCs duplicados.
         
+        Args:
+            commit: Confirmar a transação ao final do scan
+            agora: Momento de referência (UTC) compartilhado pelos alertas
+            chaves_abertas: Alertas abertos pré-carregados por tipo
+        
         Returns:
             Tuple (total_encontrados, alertas_criados)
         """
         try:
-            # Buscar NCs ativos duplicados
-            from sqlalchemy import distinct
-            
-            subquery = db.session.query(
-                NumeroCadastro.nc,
-                func.count(NumeroCadastro.id).label('count')
-            ).filter_by(
-                ativo=True
-            ).group_by(
-                NumeroCadastro.nc
-            ).having(
-                func.count(NumeroCadastro.id) > 1
-            ).subquery()
-            
-            ncs_duplicados = db.session.query(NumeroCadastro).join(
-                subquery, NumeroCadastro.nc == subquery.c.nc
-            ).filter_by(
-                ativo=True
-            ).order_by(
-                NumeroCadastro.nc
+            # Agrupar no banco: uma linha por NC duplicado, já com dois
+            # colaboradores distintos que o utilizam
+            duplicados = db.session.execute(
+                select(
+                    NumeroCadastro.nc,
+                    func.min(NumeroCadastro.colaborador_id).label('ci_atual_id'),
+                    func.max(NumeroCadastro.colaborador_id).label('ci_duplicado_id')
+                ).where(
+                    NumeroCadastro.ativo == True
+                ).group_by(
+                    NumeroCadastro.nc
+                ).having(
+                    func.count(func.distinct(NumeroCadastro.colaborador_id)) > 1
+                ).order_by(
+                    NumeroCadastro.nc
+                )
             ).all()
             
-            # Agrupar por NC
-            nc_groups = {}
-            for nc_obj in ncs_duplicados:
-                if nc_obj.nc not in nc_groups:
-                    nc_groups[nc_obj.nc] = []
-                nc_groups[nc_obj.nc].append(nc_obj.colaborador)
+            colaboradores = self._carregar_colaboradores(duplicados)
             
             # Criar alertas para cada NC duplicado
             alertas = []
-            for nc, colaboradores in nc_groups.items():
-                if len(colaboradores) >= 2:
-                    alerta = self.criar_alerta_nc_duplicado(
-                        nc=nc,
-                        ci_atual=colaboradores[0],
-                        ci_duplicado=colaboradores[1]
-                    )
-                    if alerta:
-                        alertas.append(alerta)
+            for nc, ci_atual_id, ci_duplicado_id in duplicados:
+                alerta = self.criar_alerta_nc_duplicado(
+                    nc=nc,
+                    ci_atual=colaboradores[ci_atual_id],
+                    ci_duplicado=colaboradores[ci_duplicado_id],
+                    commit=False,
+                    agora=agora,
+                    chaves_abertas=chaves_abertas
+                )
+                if alerta:
+                    alertas.append(alerta)
             
-            return len(nc_groups), alertas
+            if commit:
+                db.session.commit()
+            
+            return len(duplicados), alertas
             
         except Exception as e:
+            if commit:
+                db.session.rollback()
             raise AlertaError(f"Erro no scan de NCs duplicados: {str(e)}")
     
-    def scan_cpfs_duplicados(self) -> Tuple[int, List[Alerta]]:
+    def scan_cpfs_duplicados(
+        self,
+        commit: bool = True,
+        agora: Optional[datetime] = None,
+        chaves_abertas: Optional[Dict[str, Dict[Any, Alerta]]] = None
+    ) -> Tuple[int, List[Alerta]]:
         """
         Verifica CPFs duplicados.
         
+        Args:
+            commit: Confirmar a transação ao final do scan
+            agora: Momento de referência (UTC) compartilhado pelos alertas
+            chaves_abertas: Alertas abertos pré-carregados por tipo
+        
         Returns:
             Tuple (total_encontrados, alertas_criados)
         """
         try:
-            # Buscar CPFs duplicados
-            from sqlalchemy import distinct
-            
-            subquery = db.session.query(
-                ColaboradorInterno.cpf,
-                func.count(ColaboradorInterno.id).label('count')
-            ).filter_by(
-                is_deleted=False
-            ).filter(
-                ColaboradorInterno.cpf.isnot(None)
-            ).group_by(
-                ColaboradorInterno.cpf
-            ).having(
-                func.count(ColaboradorInterno.id) > 1
-            ).subquery()
-            
-            cps_duplicados = db.session.query(ColaboradorInterno).join(
-                subquery, ColaboradorInterno.cpf == subquery.c.cpf
-            ).filter_by(
-                is_deleted=False
-            ).order_by(
-                ColaboradorInterno.cpf
+            # Agrupar no banco: uma linha por CPF duplicado, já com dois
+            # colaboradores distintos que o compartilham
+            duplicados = db.session.execute(
+                select(
+                    ColaboradorInterno.cpf,
+                    func.min(ColaboradorInterno.id).label('ci_atual_id'),
+                    func.max(ColaboradorInterno.id).label('ci_duplicado_id')
+                ).where(
+                    ColaboradorInterno.is_deleted == False,
+                    ColaboradorInterno.cpf.isnot(None)
+                ).group_by(
+                    ColaboradorInterno.cpf
+                ).having(
+                    func.count(ColaboradorInterno.id) > 1
+                ).order_by(
+                    ColaboradorInterno.cpf
+                )
             ).all()
             
-            # Agrupar por CPF
-            cpf_groups = {}
-            for ci in cps_duplicados:
-                if ci.cpf not in cpf_groups:
-                    cpf_groups[ci.cpf] = []
-                cpf_groups[ci.cpf].append(ci)
+            colaboradores = self._carregar_colaboradores(duplicados)
             
             # Criar alertas para cada CPF duplicado
             alertas = []
-            for cpf, colaboradores in cpf_groups.items():
-                if len(colaboradores) >= 2:
-                    alerta = self.criar_alerta_cpf_duplicado(
-                        cpf=cpf,
-                        ci_atual=colaboradores[0],
-                        ci_duplicado=colaboradores[1]
-                    )
-                    if alerta:
-                        alertas.append(alerta)
+            for cpf, ci_atual_id, ci_duplicado_id in duplicados:
+                alerta = self.criar_alerta_cpf_duplicado(
+                    cpf=cpf,
+                    ci_atual=colaboradores[ci_atual_id],
+                    ci_duplicado=colaboradores[ci_duplicado_id],
+                    commit=False,
+                    agora=agora,
+                    chaves_abertas=chaves_abertas
+                )
+                if alerta:
+                    alertas.append(alerta)
+            
+            if commit:
+                db.session.commit()
             
-            return len(cpf_groups), alertas
+            return len(duplicados), alertas
             
         except Exception as e:
+            if commit:
+                db.session.rollback()
             raise AlertaError(f"Erro no scan de CPFs duplicados: {str(e)}")
     
-    def scan_planos_vencidos(self, dias_tolerancia: int = 30) -> Tuple[int, List[Alerta]]:
+    def scan_planos_vencidos(
+        self,
+        dias_tolerancia: int = 30,
+        commit: bool = True,
+        agora: Optional[datetime] = None,
+        chaves_abertas: Optional[Dict[str, Dict[Any, Alerta]]] = None
+    ) -> Tuple[int, List[Alerta]]:
         """
         Verifica planos de saúde vencidos.
         
         Args:
             dias_tolerancia: Dias de tolerância após o vencimento
+            commit: Confirmar a transação ao final do scan
+            agora: Momento de referência (UTC) compartilhado pelos alertas
+            chaves_abertas: Alertas abertos pré-carregados por tipo
         
         Returns:
             Tuple (total_encontrados, alertas_criados)
         """
         try:
-            data_limite = datetime.now().date() - timedelta(days=dias_tolerancia)
+            if agora is None:
+                agora = datetime.utcnow()
+            data_limite = agora.date() - timedelta(days=dias_tolerancia)
             
             # Buscar planos vencidos
-            planos_vencidos = PlanoSaude.query.filter(
-                PlanoSaude.data_fim.isnot(None),
-                PlanoSaude.data_fim < data_limite,
-                PlanoSaude.ativo == True
-            ).all()
-            
+            planos_vencidos = db.session.execute(
+                _stmt_planos_vencidos().execution_options(yield_per=_SCAN_BATCH_SIZE),
+                {'data_limite': data_limite}
+            ).scalars()
+            
+            # Aliases locais para o laço por linha
+            criar = self.criar_alerta_plano_vencido
+            total = 0
             alertas = []
+            adicionar = alertas.append
             for plano in planos_vencidos:
-                alerta = self.criar_alerta_plano_vencido(plano)
+                total += 1
+                alerta = criar(plano, commit=False, agora=agora, chaves_abertas=chaves_abertas)
                 if alerta:
-                    alertas.append(alerta)
+                    adicionar(alerta)
             
-            return len(planos_vencidos), alertas
+            if commit:
+                db.session.commit()
+            
+            return total, alertas
             
         except Exception as e:
+            if commit:
+                db.session.rollback()
             raise AlertaError(f"Erro no scan de planos vencidos: {str(e)}")
     
-    def scan_dependentes_sem_cpf(self) -> Tuple[int, List[Alerta]]:
+    def scan_dependentes_sem_cpf(
+        self,
+        commit: bool = True,
+        agora: Optional[datetime] = None,
+        chaves_abertas: Optional[Dict[str, Dict[Any, Alerta]]] = None
+    ) -> Tuple[int, List[Alerta]]:
         """
         Verifica dependentes sem CPF.
         
+        Args:
+            commit: Confirmar a transação ao final do scan
+            agora: Momento de referência (UTC) compartilhado pelos alertas
+            chaves_abertas: Alertas abertos pré-carregados por tipo
+        
         Returns:
             Tuple (total_encontrados, alertas_criados)
         """
         try:
             # Buscar dependentes sem CPF
             dependentes_sem_cpf = Dependente.query.filter(
-                or_(
-                    Dependente.cpf.is_(None),
-                    Dependente.cpf == ''
-                )
-            ).all()
+                Dependente.cpf_vazio == True,
+                Dependente.is_deleted == False
+            ).yield_per(_SCAN_BATCH_SIZE)
             
+            # Aliases locais para o laço por linha
+            criar = self.criar_alerta_dependente_sem_cpf
+            total = 0
             alertas = []
+            adicionar = alertas.append
             for dependente in dependentes_sem_cpf:
-                alerta = self.criar_alerta_dependente_sem_cpf(dependente)
+                total += 1
+                alerta = criar(dependente, commit=False, agora=agora, chaves_abertas=chaves_abertas)
                 if alerta:
-                    alertas.append(alerta)
+                    adicionar(alerta)
+            
+            if commit:
+                db.session.commit()
             
-            return len(dependentes_sem_cpf), alertas
+            return total, alertas
             
         except Exception as e:
+            if commit:
+                db.session.rollback()
             raise AlertaError(f"Erro no scan de dependentes sem CPF: {str(e)}")
     
-    def scan_importacoes_com_erro(self, dias: int = 7) -> Tuple[int, List[Alerta]]:
+    def scan_importacoes_com_erro(
+        self,
+        dias: int = 7,
+        commit: bool = True,
+        agora: Optional[datetime] = None,
+        chaves_abertas: Optional[Dict[str, Dict[Any, Alerta]]] = None
+    ) -> Tuple[int, List[Alerta]]:
         """
         Verifica importações com erro nos últimos dias.
         
         Args:
             dias: Número de dias para verificar
+            commit: Confirmar a transação ao final do scan
+            agora: Momento de referência (UTC) compartilhado pelos alertas
+            chaves_abertas: Alertas abertos pré-carregados por tipo
         
         Returns:
             Tuple (total_encontrados, alertas_criados)
         """
         try:
-            data_limite = datetime.utcnow() - timedelta(days=dias)
+            if agora is None:
+                agora = datetime.utcnow()
+            data_limite = agora - timedelta(days=dias)
             
             # Buscar importações com erro
             importacoes_erro = ImportacaoLog.query.filter(
                 ImportacaoLog.status.in_(['ERRO', 'FALHA']),
                 ImportacaoLog.data_importacao >= data_limite
-            ).all()
+            ).yield_per(_SCAN_BATCH_SIZE)
             
+            total = 0
             alertas = []
             for imp in importacoes_erro:
+                total += 1
+                
                 # Verificar se já existe alerta não resolvido
-                alerta_existente = Alerta.query.filter_by(
-                    tipo='IMPORTACAO_ERRO',
-                    resolvido=False
-                ).filter(
-                    Alerta.dados_relacionados['importacao_id'].astext == str(imp.id)
-                ).first()
+                alerta_existente = self._buscar_alerta_aberto('IMPORTACAO_ERRO', imp.id, chaves_abertas)
                 
                 if alerta_existente:
                     alertas.append(alerta_existente)
                     continue
                 
                 # Criar alerta
-                alerta = self.criar_alerta(
-                    tipo='IMPORTACAO_ERRO',
-                    descricao=f'Importação {imp.tipo_importacao} falhou: {imp.detalhes[:100]}...',
+                alerta = self._criar_alerta_chaveado(
+                    'IMPORTACAO_ERRO',
+                    imp.id,
+                    chaves_abertas,
+                    descricao=_TEMPLATES['IMPORTACAO_ERRO'].format_map({
+                        'tipo_importacao': imp.tipo_importacao,
+                        'detalhes': imp.detalhes[:100]
+                    }),
                     gravidade='ALTA',
                     acao_recomendada='Verificar arquivo de importação e tentar novamente',
-                    dados_relacionados={
-                        'importacao_id': imp.id,
-                        'tipo_importacao': imp.tipo_importacao,
-                        'arquivo': imp.arquivo,
-                        'erro': imp.detalhes,
-                        'data_importacao': imp.data_importacao.isoformat()
-                    }
+                    dados_relacionados=_payload(
+                        importacao=imp,
+                        tipo_importacao=imp.tipo_importacao
+                    ),
+                    commit=False,
+                    agora=agora
                 )
                 if alerta:
                     alertas.append(alerta)
             
-            return len(importacoes_erro), alertas
+            if commit:
+                db.session.commit()
+            
+            return total, alertas
             
         except Exception as e:
+            if commit:
+                db.session.rollback()
             raise AlertaError(f"Erro no scan de importações com erro: {str(e)}")
     
+    def _executar_scans_sequencial(
+        self,
+        scans: List[Tuple[str, Any]]
+    ) -> List[Tuple[str, int, int, Optional[str]]]:
+        """
+        Executa os scans um após o outro na sessão atual.
+        
+        Cada scan roda em um savepoint: uma falha descarta apenas o trabalho
+        daquele scan, e a confirmação fica a cargo de quem chamou. Com o
+        autoflush desligado, os alertas do scan são inseridos em lote quando
+        o savepoint é liberado.
+        
+        Args:
+            scans: Lista de (nome, método de scan já parametrizado)
+        
+        Returns:
+            Lista de (nome, total_encontrados, alertas_criados, erro)
+        """
+        execucoes = []
+        for nome, scan_func in scans:
+            try:
+                with db.session.begin_nested(), db.session.no_autoflush:
+                    total, alertas = scan_func(commit=False)
+                execucoes.append((nome, total, len(alertas), None))
+            except Exception as e:
+                invalidar_cache_alertas()
+                execucoes.append((nome, 0, 0, str(e)))
+        return execucoes
+    
+    def _executar_scans_paralelo(
+        self,
+        scans: List[Tuple[str, Any]],
+        workers: int
+    ) -> List[Tuple[str, int, int, Optional[str]]]:
+        """
+        Executa os scans em paralelo, cada um com sua própria sessão.
+        
+        Os alertas novos produzidos em cada thread são desanexados da sessão
+        da thread e adicionados à sessão atual, que confirma tudo de uma vez.
+        
+        Args:
+            scans: Lista de (nome, método de scan já parametrizado)
+            workers: Número máximo de threads
+        
+        Returns:
+            Lista de (nome, total_encontrados, alertas_criados, erro)
+        """
+        app = current_app._get_current_object()
+        
+        with ThreadPoolExecutor(max_workers=min(workers, len(scans))) as executor:
+            futuros = [
+                (nome, executor.submit(self._executar_scan_em_thread, app, scan_func))
+                for nome, scan_func in scans
+            ]
+        
+        execucoes = []
+        for nome, futuro in futuros:
+            try:
+                total, qtd_alertas, novos = futuro.result()
+            except Exception as e:
+                invalidar_cache_alertas()
+                execucoes.append((nome, 0, 0, str(e)))
+                continue
+            
+            db.session.add_all(novos)
+            execucoes.append((nome, total, qtd_alertas, None))
+        return execucoes
+    
+    def _executar_scan_em_thread(
+        self,
+        app,
+        scan_func
+    ) -> Tuple[int, int, List[Alerta]]:
+        """
+        Executa um scan em um contexto de aplicação próprio.
+        
+        O Flask-SQLAlchemy associa a sessão ao contexto de aplicação, então a
+        thread trabalha em uma sessão (e conexão) separada. O autoflush fica
+        desligado para que nada seja gravado pela thread.
+        
+        Args:
+            app: Aplicação Flask
+            scan_func: Método de scan já parametrizado
+        
+        Returns:
+            Tuple (total_encontrados, alertas_criados, alertas_novos)
+        """
+        with app.app_context():
+            try:
+                with db.session.no_autoflush:
+                    total, alertas = scan_func(commit=False)
+                
+                novos = [obj for obj in db.session.new if isinstance(obj, Alerta)]
+                db.session.expunge_all()
+                return total, len(alertas), novos
+            finally:
+                db.session.rollback()
+    
     def executar_scan_completo(self) -> Dict[str, Any]:
         """
         Executa todos os scans de verificação.
@@ -780,69 +1475,107 @@ class AlertService:
             Dicionário com resultados de todos os scans
         """
         try:
+            # Alertas podem ter sido alterados por outros processos desde o
+            # último scan; começar com o cache de existência limpo
+            invalidar_cache_alertas()
+            
+            # Momento único de referência para todos os scans e alertas
+            agora = datetime.utcnow()
+            
             resultados = {
-                'timestamp': datetime.utcnow().isoformat(),
+                'timestamp': agora.isoformat(),
                 'scans': {}
             }
             
+            # Uma única consulta alimenta as verificações de duplicidade de
+            # todos os scans
+            chaves_abertas = self._prefetch_open_alert_keys()
+            
             # Executar cada scan
             scans = [
-                ('colaboradores_sem_nc', self.scan_colaboradores_sem_nc),
-                ('ncs_duplicados', self.scan_ncs_duplicados),
-                ('cpfs_duplicados', self.scan_cpfs_duplicados),
-                ('planos_vencidos', self.scan_planos_vencidos),
-                ('dependentes_sem_cpf', self.scan_dependentes_sem_cpf),
-                ('importacoes_erro', self.scan_importacoes_com_erro)
+                (nome, partial(scan_func, agora=agora, chaves_abertas=chaves_abertas))
+                for nome, scan_func in (
+                    ('colaboradores_sem_nc', self.scan_colaboradores_sem_nc),
+                    ('ncs_duplicados', self.scan_ncs_duplicados),
+                    ('cpfs_duplicados', self.scan_cpfs_duplicados),
+                    ('planos_vencidos', self.scan_planos_vencidos),
+                    ('dependentes_sem_cpf', self.scan_dependentes_sem_cpf),
+                    ('importacoes_erro', self.scan_importacoes_com_erro)
+                )
             ]
             
+            workers = current_app.config.get('ALERT_SCAN_WORKERS', 1)
+            if workers > 1:
+                execucoes = self._executar_scans_paralelo(scans, workers)
+            else:
+                execucoes = self._executar_scans_sequencial(scans)
+            
             total_alertas = 0
             
-            for nome, scan_func in scans:
-                try:
-                    total, alertas = scan_func()
+            for nome, total, qtd_alertas, erro in execucoes:
+                if erro is None:
                     resultados['scans'][nome] = {
                         'total_encontrados': total,
-                        'alertas_criados': len(alertas),
+                        'alertas_criados': qtd_alertas,
                         'status': 'SUCESSO'
                     }
-                    total_alertas += len(alertas)
-                except Exception as e:
-                    logger.error(f"Erro no scan {nome}: {str(e)}")
+                    total_alertas += qtd_alertas
+                else:
+                    logger.error("Erro no scan %s: %s", nome, erro)
                     resultados['scans'][nome] = {
                         'total_encontrados': 0,
                         'alertas_criados': 0,
                         'status': 'ERRO',
-                        'erro': str(e)
+                        'erro': erro
                     }
             
             resultados['total_alertas_criados'] = total_alertas
             resultados['status_geral'] = 'SUCESSO' if total_alertas > 0 else 'SEM_ALERTAS'
             
-            # Criar alerta do scan se houver muitos alertas
+            # Criar alerta do scan se houver muitos alertas. Ele entra no mesmo
+            # lote dos alertas dos scans: sem autoflush na verificação de
+            # duplicidade, tudo o que está pendente é gravado em um único
+            # flush, no único commit do scan
             if total_alertas >= 10:
-                self.criar_alerta(
-                    tipo='SISTEMA',
-                    descricao=f'Scan completo detectou {total_alertas} alertas pendentes',
-                    gravidade='MEDIA',
-                    acao_recomendada='Revisar alertas do sistema'
-                )
+                with db.session.no_autoflush:
+                    self.criar_alerta(
+                        tipo='SISTEMA',
+                        descricao=_TEMPLATES['SISTEMA'].format_map({'total': total_alertas}),
+                        gravidade='MEDIA',
+                        acao_recomendada='Revisar alertas do sistema',
+                        commit=False,
+                        agora=agora
+                    )
+            
+            db.session.commit()
             
             return resultados
             
         except Exception as e:
+            db.session.rollback()
+            invalidar_cache_alertas()
             raise AlertaError(f"Erro no scan completo: {str(e)}")
     
     # ============================================================================
     # MÉTODOS DE RESOLUÇÃO E MANUTENÇÃO
     # ============================================================================
     
-    def resolver_alerta(self, alerta_id: int, observacao: str = None) -> Optional[Alerta]:
+    def resolver_alerta(
+        self,
+        alerta_id: int,
+        observacao: str = None,
+        usuario: str = None
+    ) -> Optional[Alerta]:
         """
         Marca um alerta como resolvido.
         
+        A observação é gravada em AlertaHistorico; a descrição do alerta não
+        é alterada.
+        
         Args:
             alerta_id: ID do alerta
             observacao: Observação adicional
+            usuario: Nome de quem resolveu
         
         Returns:
             Alerta resolvido ou None
@@ -855,27 +1588,41 @@ class AlertService:
             if alerta.resolvido:
                 return alerta
             
-            # Adicionar observação se fornecida
+            # Registrar observação se fornecida
             if observacao:
-                alerta.descricao = f"{alerta.descricao}\n\n--- RESOLUÇÃO ---\n{observacao}"
+                db.session.add(AlertaHistorico(
+                    alerta_id=alerta.id,
+                    tipo_evento='RESOLUCAO',
+                    texto=observacao,
+                    usuario=usuario
+                ))
             
             alerta.resolver()
             db.session.commit()
+            invalidar_cache_alertas()
             
-            logger.info(f"Alerta {alerta_id} resolvido")
+            logger.info("Alerta %s resolvido", alerta_id)
             return alerta
             
         except Exception as e:
             db.session.rollback()
             raise AlertaError(f"Erro ao resolver alerta: {str(e)}")
     
-    def reabrir_alerta(self, alerta_id: int, motivo: str = None) -> Optional[Alerta]:
+    def reabrir_alerta(
+        self,
+        alerta_id: int,
+        motivo: str = None,
+        usuario: str = None
+    ) -> Optional[Alerta]:
         """
         Reabre um alerta resolvido.
         
+        O motivo é gravado em AlertaHistorico (ver resolver_alerta).
+        
         Args:
             alerta_id: ID do alerta
             motivo: Motivo da reabertura
+            usuario: Nome de quem reabriu
         
         Returns:
             Alerta reaberto ou None
@@ -888,16 +1635,33 @@ class AlertService:
             if not alerta.resolvido:
                 return alerta
             
-            # Adicionar motivo se fornecido
+            # Não reabrir se a mesma ocorrência já tem outro alerta aberto
+            aberto = self.obter_alerta_aberto_mesma_chave(alerta)
+            if aberto:
+                raise OperacaoNaoPermitidaError(
+                    f"Alerta {alerta_id} não pode ser reaberto: a mesma "
+                    f"ocorrência já está no alerta aberto #{aberto.id}"
+                )
+            
+            # Registrar motivo se fornecido
             if motivo:
-                alerta.descricao = f"{alerta.descricao}\n\n--- REABERTURA ---\n{motivo}"
+                db.session.add(AlertaHistorico(
+                    alerta_id=alerta.id,
+                    tipo_evento='REABERTURA',
+                    texto=motivo,
+                    usuario=usuario
+                ))
             
             alerta.reabrir()
             db.session.commit()
+            invalidar_cache_alertas()
             
-            logger.info(f"Alerta {alerta_id} reaberto")
+            logger.info("Alerta %s reaberto", alerta_id)
             return alerta
             
+        except OperacaoNaoPermitidaError:
+            db.session.rollback()
+            raise
         except Exception as e:
             db.session.rollback()
             raise AlertaError(f"Erro ao reabrir alerta: {str(e)}")
@@ -919,8 +1683,9 @@ class AlertService:
             
             db.session.delete(alerta)
             db.session.commit()
+            invalidar_cache_alertas()
             
-            logger.info(f"Alerta {alerta_id} excluído")
+            logger.info("Alerta %s excluído", alerta_id)
             return True
             
         except Exception as e:
@@ -931,6 +1696,13 @@ class AlertService:
         """
         Remove alertas resolvidos antigos.
         
+        A exclusão é feita em lotes de _LIMPEZA_BATCH_SIZE, cada um em sua
+        própria transação. Os IDs de cada lote são buscados antes do DELETE:
+        o MySQL não aceita LIMIT, nem a própria tabela, numa subconsulta IN
+        do DELETE. O histórico do lote é removido antes, pois o DELETE em
+        massa não passa pelo cascade do ORM e o SQLite não aplica o
+        ON DELETE CASCADE sem PRAGMA foreign_keys.
+        
         Args:
             dias: Remover alertas resolvidos há mais de X dias
         
@@ -940,19 +1712,36 @@ class AlertService:
         try:
             data_limite = datetime.utcnow() - timedelta(days=dias)
             
-            # Contar antes de excluir
-            total = Alerta.query.filter_by(resolvido=True)\
-                .filter(Alerta.data_resolucao < data_limite)\
-                .count()
+            lote = select(Alerta.id).where(
+                Alerta.resolvido == True,
+                Alerta.data_resolucao < data_limite
+            ).limit(_LIMPEZA_BATCH_SIZE)
             
-            # Excluir
-            Alerta.query.filter_by(resolvido=True)\
-                .filter(Alerta.data_resolucao < data_limite)\
-                .delete(synchronize_session=False)
+            total = 0
+            while True:
+                ids = db.session.execute(lote).scalars().all()
+                if not ids:
+                    break
+                
+                db.session.execute(
+                    delete(AlertaHistorico).where(
+                        AlertaHistorico.alerta_id.in_(ids)
+                    ).execution_options(synchronize_session=False)
+                )
+                db.session.execute(
+                    delete(Alerta).where(Alerta.id.in_(ids)).execution_options(
+                        synchronize_session=False
+                    )
+                )
+                db.session.commit()
+                total += len(ids)
+                if len(ids) < _LIMPEZA_BATCH_SIZE:
+                    break
             
-            db.session.commit()
+            if total:
+                invalidar_cache_alertas()
             
-            logger.info(f"{total} alertas resolvidos removidos (mais de {dias} dias)")
+            logger.info("%d alertas resolvidos removidos (mais de %d dias)", total, dias)
             return total
             
         except Exception as e:
@@ -965,64 +1754,13 @@ class AlertService:
     
     def obter_estatisticas(self) -> Dict[str, Any]:
         """
-        Obtém estatísticas de alertas.
+        Obtém estatísticas de alertas (em cache, ver _estatisticas_alertas).
         
         Returns:
             Dicionário com estatísticas
         """
         try:
-            estatisticas = {}
-            
-            # Totais
-            estatisticas['total'] = Alerta.query.count()
-            estatisticas['abertos'] = Alerta.query.filter_by(resolvido=False).count()
-            estatisticas['resolvidos'] = Alerta.query.filter_by(resolvido=True).count()
-            
-            # Por gravidade
-            for gravidade in ['CRITICA', 'ALTA', 'MEDIA', 'BAIXA']:
-                estatisticas[f'{gravidade.lower()}_abertos'] = Alerta.query.filter_by(
-                    gravidade=gravidade,
-                    resolvido=False
-                ).count()
-                estatisticas[f'{gravidade.lower()}_total'] = Alerta.query.filter_by(
-                    gravidade=gravidade
-                ).count()
-            
-            # Por tipo
-            tipos = db.session.query(
-                Alerta.tipo,
-                func.count(Alerta.id).label('total')
-            ).filter_by(resolvido=False).group_by(Alerta.tipo).all()
-            
-            estatisticas['por_tipo'] = [
-                {'tipo': tipo, 'total': total}
-                for tipo, total in tipos
-            ]
-            
-            # Alertas recentes (últimos 7 dias)
-            data_limite = datetime.utcnow() - timedelta(days=7)
-            estatisticas['recentes_7_dias'] = Alerta.query.filter(
-                Alerta.data_alerta >= data_limite
-            ).count()
-            
-            # Média de resolução
-            alertas_resolvidos = Alerta.query.filter_by(resolvido=True)\
-                .filter(Alerta.data_resolucao.isnot(None))\
-                .all()
-            
-            if alertas_resolvidos:
-                tempos = []
-                for a in alertas_resolvidos:
-                    if a.data_resolucao and a.data_alerta:
-                        tempo = (a.data_resolucao - a.data_alerta).total_seconds() / 86400  # em dias
-                        tempos.append(tempo)
-                
-                if tempos:
-                    estatisticas['media_resolucao_dias'] = round(sum(tempos) / len(tempos), 2)
-                    estatisticas['max_resolucao_dias'] = round(max(tempos), 2)
-                    estatisticas['min_resolucao_dias'] = round(min(tempos), 2)
-            
-            return estatisticas
+            return _estatisticas_alertas()
             
         except Exception as e:
             raise AlertaError(f"Erro ao obter estatísticas: {str(e)}")
@@ -1038,37 +1776,56 @@ class AlertService:
             Dicionário com tendências
         """
         try:
-            data_inicio = datetime.utcnow() - timedelta(days=dias)
-            
-            # Query para alertas por dia
-            alertas_por_dia = db.session.query(
-                func.date(Alerta.data_alerta).label('data'),
-                func.count(Alerta.id).label('total'),
-                func.sum(func.case((Alerta.resolvido == True, 1), else_=0)).label('resolvidos')
-            ).filter(
-                Alerta.data_alerta >= data_inicio
-            ).group_by(
-                func.date(Alerta.data_alerta)
-            ).order_by(
-                'data'
+            data_inicio = (datetime.utcnow() - timedelta(days=dias)).date()
+            dia = func.date(Alerta.data_alerta)
+            
+            total_dia = func.count()
+            resolvidos_dia = func.sum(case((Alerta.resolvido == True, 1), else_=0))
+            
+            # Alertas por dia; os totais do período vêm da mesma consulta,
+            # via funções de janela sobre os agregados
+            alertas_por_dia = db.session.execute(
+                select(
+                    dia.label('data'),
+                    total_dia.label('total'),
+                    resolvidos_dia.label('resolvidos'),
+                    func.sum(total_dia).over().label('total_periodo'),
+                    func.sum(resolvidos_dia).over().label('resolvidos_periodo')
+                ).where(
+                    # Mesma expressão de idx_alerta_dia_resolvido; o primeiro
+                    # dia do período entra inteiro
+                    dia >= data_inicio
+                ).group_by(
+                    dia
+                ).order_by(
+                    dia
+                )
             ).all()
             
+            primeiro = alertas_por_dia[0] if alertas_por_dia else None
+            
+            # date() vem como date (PostgreSQL) ou str (SQLite): decidir uma vez
+            formatar_data = (
+                type(primeiro.data).isoformat
+                if primeiro and hasattr(primeiro.data, 'isoformat') else str
+            )
+            
             tendencias = {
                 'periodo_dias': dias,
-                'total_alertas': sum(a.total for a in alertas_por_dia),
-                'total_resolvidos': sum(a.resolvidos for a in alertas_por_dia),
+                'total_alertas': int(primeiro.total_periodo) if primeiro else 0,
+                'total_resolvidos': int(primeiro.resolvidos_periodo) if primeiro else 0,
                 'taxa_resolucao': 0,
-                'por_dia': []
+                'por_dia': [
+                    {
+                        'data': formatar_data(data),
+                        'total': total,
+                        'resolvidos': resolvidos,
+                        'abertos': total - resolvidos
+                    }
+                    for data, total, resolvidos, _, _ in alertas_por_dia
+                ]
             }
             
-            for a in alertas_por_dia:
-                tendencias['por_dia'].append({
-                    'data': a.data.isoformat() if hasattr(a.data, 'isoformat') else str(a.data),
-                    'total': a.total,
-                    'resolvidos': a.resolvidos,
-                    'abertos': a.total - a.resolvidos
-                })
-            
             if tendencias['total_alertas'] > 0:
                 tendencias['taxa_resolucao'] = round(
                     (tendencias['total_resolvidos'] / tendencias['total_alertas']) * 100, 2
@@ -1090,36 +1847,48 @@ class AlertService:
         Returns:
             Lista de tipos de alerta
         """
-        return [
-            {
-                'tipo': tipo,
-                'descricao': info['descricao'],
-                'gravidade': info['gravidade'],
-                'acao_recomendada': info['acao_recomendada']
-            }
-            for tipo, info in self.alert_types.items()
-        ]
+        return list(_TIPOS_ALERTAS)
     
-    def obter_alertas_por_colaborador(self, ci_id: int, apenas_abertos: bool = True) -> List[Alerta]:
+    def obter_alertas_por_colaborador(
+        self,
+        ci_id: int,
+        apenas_abertos: bool = True,
+        limite: int = 100,
+        cursor: Optional[Tuple[datetime, int]] = None
+    ) -> List[Alerta]:
         """
-        Obtém alertas relacionados a um colaborador.
+        Obtém alertas relacionados a um colaborador, do mais recente ao mais
+        antigo, paginados por cursor (keyset).
         
         Args:
             ci_id: ID do colaborador
             apenas_abertos: Apenas alertas não resolvidos
+            limite: Limite de resultados (0 = sem limite)
+            cursor: (data_alerta, id) do último alerta da página anterior;
+                None para a primeira página
         
         Returns:
             Lista de alertas
         """
         try:
+            # Mesma expressão dos índices idx_alerta_*colaborador_id*
             query = Alerta.query.filter(
-                Alerta.dados_relacionados['colaborador_id'].astext == str(ci_id)
+                Alerta.dados_relacionados['colaborador_id'].as_integer() == ci_id
             )
             
             if apenas_abertos:
                 query = query.filter_by(resolvido=False)
             
-            return query.order_by(desc(Alerta.data_alerta)).all()
+            if cursor is not None:
+                query = query.filter(tuple_(Alerta.data_alerta, Alerta.id) < tuple_(*cursor))
+            
+            query = query.order_by(desc(Alerta.data_alerta), desc(Alerta.id))
+            
+            # Limite
+            if limite > 0:
+                query = query.limit(limite)
+            
+            return query.all()
             
         except Exception as e:
             raise AlertaError(f"Erro ao obter alertas do colaborador: {str(e)}")
@@ -1134,29 +1903,212 @@ class AlertService:
         Returns:
             Lista de alertas criados
         """
-        alertas = []
+        return self.verificar_e_criar_alertas_colaboradores_bulk([ci.id]).get(ci.id, [])
+    
+    def verificar_e_criar_alertas_colaboradores_bulk(
+        self,
+        ci_ids: List[int]
+    ) -> Dict[int, List[Alerta]]:
+        """
+        Verifica e cria os alertas possíveis para vários colaboradores.
+        
+        Listas maiores que _SCAN_BATCH_SIZE são divididas em lotes; com
+        ALERT_SCAN_WORKERS > 1 os lotes são verificados em paralelo, cada um
+        em sua própria sessão. Os lotes não compartilham chaves de alerta
+        (todas pertencem a um único colaborador), então não há disputa por
+        duplicidade entre threads. Os alertas são confirmados em um único
+        commit.
+        
+        Args:
+            ci_ids: IDs dos colaboradores
+        
+        Returns:
+            Dicionário {colaborador_id: alertas criados}
+        """
+        ids = list(set(ci_ids))
+        if not ids:
+            return {}
+        
+        try:
+            agora = datetime.utcnow()
+            lotes = [
+                ids[i:i + _SCAN_BATCH_SIZE]
+                for i in range(0, len(ids), _SCAN_BATCH_SIZE)
+            ]
+            workers = current_app.config.get('ALERT_SCAN_WORKERS', 1)
+            
+            if workers > 1 and len(lotes) > 1:
+                resultado = self._verificar_lotes_paralelo(lotes, agora, workers)
+            else:
+                resultado = {}
+                for lote in lotes:
+                    resultado.update(self._verificar_lote_colaboradores(lote, agora))
+            
+            db.session.commit()
+            return resultado
+            
+        except Exception as e:
+            db.session.rollback()
+            invalidar_cache_alertas()
+            raise AlertaError(f"Erro ao verificar alertas dos colaboradores: {str(e)}")
+    
+    def _verificar_lotes_paralelo(
+        self,
+        lotes: List[List[int]],
+        agora: datetime,
+        workers: int
+    ) -> Dict[int, List[Alerta]]:
+        """
+        Verifica lotes de colaboradores em paralelo, uma sessão por thread.
+        
+        Os alertas novos são adicionados à sessão atual; os já existentes são
+        reanexados com merge, sem nova consulta.
+        
+        Args:
+            lotes: Lotes de IDs de colaboradores
+            agora: Momento de referência (UTC) compartilhado pelos alertas
+            workers: Número máximo de threads
+        
+        Returns:
+            Dicionário {colaborador_id: alertas criados}
+        """
+        app = current_app._get_current_object()
+        
+        with ThreadPoolExecutor(max_workers=min(workers, len(lotes))) as executor:
+            futuros = [
+                executor.submit(self._verificar_lote_em_thread, app, lote, agora)
+                for lote in lotes
+            ]
+            execucoes = [futuro.result() for futuro in futuros]
+        
+        resultado = {}
+        for parcial, novos in execucoes:
+            db.session.add_all(novos)
+            novos = set(novos)
+            for ci_id, alertas in parcial.items():
+                resultado[ci_id] = [
+                    alerta if alerta in novos else db.session.merge(alerta, load=False)
+                    for alerta in alertas
+                ]
+        return resultado
+    
+    def _verificar_lote_em_thread(
+        self,
+        app,
+        ci_ids: List[int],
+        agora: datetime
+    ) -> Tuple[Dict[int, List[Alerta]], List[Alerta]]:
+        """
+        Verifica um lote de colaboradores em um contexto de aplicação próprio
+        (ver _executar_scan_em_thread).
+        
+        Args:
+            app: Aplicação Flask
+            ci_ids: IDs dos colaboradores do lote
+            agora: Momento de referência (UTC)
+        
+        Returns:
+            Tuple (alertas por colaborador, alertas novos)
+        """
+        with app.app_context():
+            try:
+                with db.session.no_autoflush:
+                    resultado = self._verificar_lote_colaboradores(ci_ids, agora)
+                
+                novos = [obj for obj in db.session.new if isinstance(obj, Alerta)]
+                db.session.expunge_all()
+                return resultado, novos
+            finally:
+                db.session.rollback()
+    
+    def _verificar_lote_colaboradores(
+        self,
+        ids: List[int],
+        agora: datetime
+    ) -> Dict[int, List[Alerta]]:
+        """
+        Verifica um lote de colaboradores, sem confirmar a transação.
+        
+        Os relacionamentos de ColaboradorInterno são dinâmicos (não aceitam
+        eager loading), então NCs ativos, dependentes sem CPF e planos
+        vencidos são carregados em uma consulta cada para todo o lote e
+        agrupados em memória. Os alertas abertos do lote também são
+        pré-carregados, dispensando a verificação de duplicidade por alerta.
+        
+        Args:
+            ids: IDs dos colaboradores
+            agora: Momento de referência (UTC)
+        
+        Returns:
+            Dicionário {colaborador_id: alertas criados}
+        """
+        hoje = agora.date()
+        
+        colaboradores = ColaboradorInterno.query.filter(
+            ColaboradorInterno.id.in_(ids)
+        ).all()
         
-        # Verificar se tem NC ativo
-        if not ci.nc_ativo:
-            alerta = self.criar_alerta_ci_sem_nc(ci)
-            if alerta:
-                alertas.append(alerta)
+        com_nc_ativo = {
+            colaborador_id
+            for colaborador_id, in db.session.query(
+                NumeroCadastro.colaborador_id
+            ).filter(
+                NumeroCadastro.colaborador_id.in_(ids),
+                NumeroCadastro.ativo == True
+            ).distinct()
+        }
+        
+        dependentes_por_ci = {}
+        for dependente in Dependente.query.filter(
+            Dependente.colaborador_id.in_(ids),
+            Dependente.cpf_vazio == True,
+            Dependente.is_deleted == False
+        ):
+            dependentes_por_ci.setdefault(dependente.colaborador_id, []).append(dependente)
         
-        # Verificar dependentes sem CPF
-        for dependente in ci.dependentes:
-            if not dependente.cpf:
-                alerta = self.criar_alerta_dependente_sem_cpf(dependente)
+        planos_por_ci = {}
+        for plano in PlanoSaude.query.filter(
+            PlanoSaude.colaborador_id.in_(ids),
+            PlanoSaude.data_fim.isnot(None),
+            PlanoSaude.data_fim < hoje,
+            PlanoSaude.ativo == True
+        ):
+            planos_por_ci.setdefault(plano.colaborador_id, []).append(plano)
+        
+        chaves_abertas = self._prefetch_open_alert_keys(colaborador_ids=ids)
+        
+        resultado = {}
+        for ci in colaboradores:
+            alertas = []
+            
+            # Verificar se tem NC ativo (já resolvido em lote)
+            if ci.id not in com_nc_ativo:
+                ci.nc_ativo = None
+                alerta = self.criar_alerta_ci_sem_nc(
+                    ci, commit=False, agora=agora, chaves_abertas=chaves_abertas
+                )
                 if alerta:
                     alertas.append(alerta)
-        
-        # Verificar planos vencidos
-        for plano in ci.planos_saude:
-            if plano.data_fim and plano.data_fim < datetime.now().date() and plano.ativo:
-                alerta = self.criar_alerta_plano_vencido(plano)
+            
+            # Verificar dependentes sem CPF
+            for dependente in dependentes_por_ci.get(ci.id, []):
+                alerta = self.criar_alerta_dependente_sem_cpf(
+                    dependente, commit=False, agora=agora, chaves_abertas=chaves_abertas
+                )
                 if alerta:
                     alertas.append(alerta)
+            
+            # Verificar planos vencidos
+            for plano in planos_por_ci.get(ci.id, []):
+                alerta = self.criar_alerta_plano_vencido(
+                    plano, commit=False, agora=agora, chaves_abertas=chaves_abertas
+                )
+                if alerta:
+                    alertas.append(alerta)
+            
+            resultado[ci.id] = alertas
         
-        return alertas
+        return resultado
 
 
 # Singleton instance
@@ -2,12 +2,25 @@
 Serviço para operações de negócio relacionadas a Colaboradores Internos.
 """
 
+import base64
 import csv
 import io
+import json
+import logging
+import math
+import queue
+import threading
+from collections import namedtuple
+from itertools import starmap
 from datetime import datetime, date
-from typing import Dict, List, Optional, Tuple, Any
-from sqlalchemy import or_, and_, func, desc, asc
-from sqlalchemy.orm import joinedload, contains_eager
+from types import MappingProxyType
+from typing import Dict, Iterator, List, Optional, Tuple, Any
+from flask import current_app, g
+from sqlalchemy import (
+    String, or_, and_, case, event, func, desc, asc, exists, insert, literal, select, tuple_,
+    text, union_all, update
+)
+from sqlalchemy.orm import Session, joinedload, contains_eager, load_only
 
 from app import db
 from app.models import (
@@ -18,25 +31,340 @@ from app.models import (
     PlanoOdontologico,
     HistoricoCI,
     AtendimentoCoparticipacao,
-    Usuario
+    Usuario,
+    get_utc_now
+)
+from app.utils.validators import (
+    clean_cpf, clean_nc, clean_empresa, format_date_brasil, format_datetime_brasil, validate_date
 )
-from app.utils.validators import clean_cpf, clean_nc, clean_empresa
-from app.utils.data_utils import serialize_for_json
+from app.utils.data_utils import calcular_alteracoes
+from app.decorators import memoize
+from app.services.report_service import ReportService, _expr_idade
 from app.exceptions import (
     CINaoEncontradoError,
     NCEmUsoError,
     CPFJaCadastradoError,
     ColaboradorExcluidoError,
+    SistemaCIError,
     ValidacaoError
 )
 
+logger = logging.getLogger(__name__)
+
+
+# Resultado da pesquisa rápida, desacoplado da sessão para poder ser cacheado
+ResultadoPesquisa = namedtuple(
+    'ResultadoPesquisa',
+    ('id', 'nome', 'cpf', 'nc_atual', 'empresa_atual', 'esta_ativo')
+)
+
+# Validade (segundos) do cache da pesquisa rápida
+_PESQUISA_TTL = 30
+
+# Validade (segundos) das estatísticas do dashboard em cache
+_ESTATISTICAS_TTL = 30
+
+# Colunas de ordenação da listagem, com as direções já aplicadas
+_ORDER_MAP = MappingProxyType({
+    'nome': ColaboradorInterno.nome,
+    'cpf': ColaboradorInterno.cpf,
+    'data_admissao': ColaboradorInterno.data_admissao,
+    'created_at': ColaboradorInterno.created_at,
+    'id': ColaboradorInterno.id
+})
+_ORDER_MAP_ASC = MappingProxyType({campo: asc(coluna) for campo, coluna in _ORDER_MAP.items()})
+_ORDER_MAP_DESC = MappingProxyType({campo: desc(coluna) for campo, coluna in _ORDER_MAP.items()})
+
+# Colunas únicas: dispensam o desempate por id na ordenação
+_ORDEM_UNICA = frozenset(('id', 'cpf'))
+
+# Páginas além da atual cobertas pela contagem limitada da listagem
+_PAGINAS_CONTADAS = 10
+
+# Colunas de ordenação aceitas na paginação por cursor (não nulas)
+_CURSOR_COLUNAS = ('nome', 'cpf', 'created_at', 'id')
+
+# Validade (segundos) do cache de nomes de usuário usados na auditoria
+_NOME_USUARIO_TTL = 300
+
+# Linhas por lote do cursor da exportação e por bloco de CSV enviado
+_EXPORTACAO_LOTE = 1000
+
+# Colaboradores por transação na exclusão em lote
+_EXCLUSAO_LOTE = 1000
+
+# Históricos aguardando gravação em segundo plano (AUDITORIA_ASSINCRONA):
+# itens (app, campos do HistoricoCI), gravados em lotes de até _AUDITORIA_LOTE
+_FILA_AUDITORIA = queue.SimpleQueue()
+_AUDITORIA_LOTE = 500
+_auditoria_thread = None
+_auditoria_lock = threading.Lock()
+
+
+def _codificar_cursor(valor: Any, ci_id: int) -> str:
+    """
+    Codifica a posição (valor da ordenação, id) em um cursor opaco.
+    
+    Args:
+        valor: Valor da coluna de ordenação do último item
+        ci_id: ID do último item
+    
+    Returns:
+        Cursor em base64 (URL-safe)
+    """
+    if isinstance(valor, datetime):
+        valor = valor.isoformat()
+    conteudo = json.dumps([valor, ci_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(conteudo.encode('utf-8')).decode('ascii')
+
+
+def _decodificar_cursor(cursor: str, ordenar_por: str) -> Tuple[Any, int]:
+    """
+    Decodifica um cursor gerado por _codificar_cursor.
+    
+    Args:
+        cursor: Cursor opaco
+        ordenar_por: Coluna de ordenação da listagem
+    
+    Returns:
+        Tuple (valor da ordenação, id)
+    
+    Raises:
+        ValidacaoError: Se o cursor for inválido
+    """
+    try:
+        valor, ci_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        if ordenar_por == 'created_at':
+            valor = datetime.fromisoformat(valor)
+        return valor, int(ci_id)
+    except (ValueError, TypeError) as e:
+        raise ValidacaoError(f"Cursor inválido: {str(e)}")
+
+
+@memoize(ttl=_NOME_USUARIO_TTL)
+def nome_usuario(usuario_id: Optional[int]) -> str:
+    """
+    Nome do usuário para os registros de histórico (cache em memória).
+    
+    Após renomear um usuário, chame ``nome_usuario.cache_clear()``.
+    
+    Args:
+        usuario_id: ID do usuário
+    
+    Returns:
+        Nome do usuário ou 'Sistema' se não existir
+    """
+    if usuario_id is None:
+        return 'Sistema'
+    return db.session.execute(
+        select(Usuario.nome).where(Usuario.id == usuario_id)
+    ).scalar() or 'Sistema'
+
+
+def _gravar_auditoria() -> None:
+    """Consome a fila de históricos e grava cada lote com um INSERT em lote."""
+    while True:
+        itens = [_FILA_AUDITORIA.get()]
+        while len(itens) < _AUDITORIA_LOTE:
+            try:
+                itens.append(_FILA_AUDITORIA.get_nowait())
+            except queue.Empty:
+                break
+        
+        por_app = {}
+        for app, campos in itens:
+            por_app.setdefault(app, []).append(campos)
+        
+        for app, linhas in por_app.items():
+            with app.app_context():
+                try:
+                    db.session.execute(insert(HistoricoCI.__table__), linhas)
+                    db.session.commit()
+                except Exception:
+                    db.session.rollback()
+                    logger.exception("Falha ao gravar %d registros de histórico", len(linhas))
+
+
+def _iniciar_auditoria() -> None:
+    """Inicia (uma vez por processo) a thread de gravação do histórico."""
+    global _auditoria_thread
+    with _auditoria_lock:
+        if _auditoria_thread is None or not _auditoria_thread.is_alive():
+            _auditoria_thread = threading.Thread(
+                target=_gravar_auditoria, name='auditoria-ci', daemon=True
+            )
+            _auditoria_thread.start()
+
+
+@event.listens_for(Session, 'after_commit')
+def _publicar_auditoria(session) -> None:
+    """Envia à fila os históricos da transação que acabou de ser confirmada."""
+    pendentes = session.info.pop('_auditoria_pendente', None)
+    if pendentes:
+        _iniciar_auditoria()
+        for item in pendentes:
+            _FILA_AUDITORIA.put(item)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _descartar_auditoria(session, previous_transaction) -> None:
+    """Descarta os históricos de uma transação desfeita."""
+    session.info.pop('_auditoria_pendente', None)
+
+
+@memoize(ttl=_PESQUISA_TTL)
+def _pesquisa_rapida(termo: str, limite: int) -> Tuple[ResultadoPesquisa, ...]:
+    """
+    Executa a pesquisa rápida (ver CIService.pesquisa_rapida).
+    
+    Função de módulo para que o cache valha para qualquer instância do
+    serviço; é descartado por invalidar_cache_colaboradores().
+    
+    Args:
+        termo: Termo de busca já normalizado (sem espaços nas pontas, minúsculo)
+        limite: Número máximo de resultados
+    
+    Returns:
+        Tupla de ResultadoPesquisa
+    """
+    # Buscar por nome, CPF ou NC. CPF e NC só têm dígitos: com termo
+    # não numérico não há o que comparar; CPF é buscado por prefixo
+    condicoes = [ColaboradorInterno.nome.ilike(f'%{termo}%')]
+    digitos = termo.replace('.', '').replace('-', '').replace(' ', '')
+    if digitos.isdigit():
+        condicoes.append(ColaboradorInterno.cpf.like(f'{digitos}%'))
+        condicoes.append(
+            ColaboradorInterno.id.in_(
+                db.session.query(NumeroCadastro.colaborador_id).filter(
+                    NumeroCadastro.nc.ilike(f'%{digitos}%'),
+                    NumeroCadastro.ativo == True
+                )
+            )
+        )
+    
+    cis = ColaboradorInterno.query.filter(
+        ColaboradorInterno.is_deleted == False
+    ).filter(
+        or_(*condicoes)
+    ).order_by(ColaboradorInterno.nome).limit(limite).all()
+    
+    # NC ativo de todos os resultados em uma única consulta
+    CIService._carregar_nc_ativo(cis)
+    
+    return tuple(
+        ResultadoPesquisa(
+            ci.id, ci.nome, ci.cpf, ci.nc_atual, ci.empresa_atual, ci.esta_ativo
+        )
+        for ci in cis
+    )
+
+
+@memoize(ttl=_ESTATISTICAS_TTL)
+def _estatisticas_colaboradores(mostrar_excluidos: bool) -> Dict[str, Any]:
+    """
+    Calcula as estatísticas dos colaboradores (ver CIService.obter_estatisticas).
+    
+    Função de módulo para que o cache valha para qualquer instância do
+    serviço; é descartado por invalidar_cache_colaboradores().
+    
+    Args:
+        mostrar_excluidos: Incluir estatísticas de excluídos
+    
+    Returns:
+        Dicionário com estatísticas
+    """
+    # Todas as contagens em uma única ida ao banco: cada parte do
+    # UNION ALL devolve (chave, grupo, total)
+    def contagem(chave: str, modelo, *criterios):
+        return select(
+            literal(chave).label('chave'),
+            literal(None, String).label('grupo'),
+            func.count().label('total')
+        ).select_from(modelo).where(*criterios)
+    
+    # Colaboradores por status em uma única varredura (GROUP BY)
+    if not mostrar_excluidos:
+        # EXISTS correlacionado: semi-join pelo índice de NCs ativos
+        status = case(
+            (
+                exists().where(
+                    NumeroCadastro.colaborador_id == ColaboradorInterno.id,
+                    NumeroCadastro.ativo == True
+                ),
+                'ativos'
+            ),
+            else_='inativos'
+        )
+        filtro_ci = [ColaboradorInterno.is_deleted == False]
+    else:
+        status = case((ColaboradorInterno.is_deleted == True, 'excluidos'), else_='ativos')
+        filtro_ci = []
+    
+    partes = [
+        select(
+            literal('status').label('chave'),
+            status.label('grupo'),
+            func.count().label('total')
+        ).where(*filtro_ci).group_by(status)
+    ]
+    
+    # Planos e dependentes
+    partes.append(contagem('planos_saude', PlanoSaude, PlanoSaude.ativo == True))
+    partes.append(contagem('planos_odonto', PlanoOdontologico, PlanoOdontologico.ativo == True))
+    partes.append(contagem('dependentes', Dependente, Dependente.is_deleted == False))
+    
+    # Distribuição por empresa
+    partes.append(
+        select(
+            literal('empresa').label('chave'),
+            NumeroCadastro.cod_empresa.label('grupo'),
+            func.count(NumeroCadastro.id).label('total')
+        ).where(
+            NumeroCadastro.ativo == True
+        ).group_by(
+            NumeroCadastro.cod_empresa
+        )
+    )
+    
+    estatisticas = {
+        'total': 0, 'ativos': 0, 'inativos': 0, 'excluidos': 0,
+        'distribuicao_empresa': []
+    }
+    for chave, grupo, total in db.session.execute(union_all(*partes)):
+        if chave == 'status':
+            estatisticas[grupo] = total
+            estatisticas['total'] += total
+        elif chave == 'empresa':
+            estatisticas['distribuicao_empresa'].append({'empresa': grupo, 'total': total})
+        else:
+            estatisticas[chave] = total
+    
+    # Médias
+    if estatisticas['ativos'] > 0:
+        estatisticas['media_dependentes'] = round(
+            estatisticas['dependentes'] / estatisticas['ativos'], 2
+        )
+    else:
+        estatisticas['media_dependentes'] = 0
+    
+    return estatisticas
+
+
+def invalidar_cache_colaboradores() -> None:
+    """
+    Descarta a pesquisa rápida, as estatísticas e o dashboard em cache.
+    
+    Deve ser chamada após qualquer escrita em colaboradores, NCs, planos ou
+    dependentes, inclusive as feitas diretamente pelas rotas.
+    """
+    _pesquisa_rapida.cache_clear()
+    _estatisticas_colaboradores.cache_clear()
+    ReportService.obter_dados_dashboard.cache_clear()
+
 
 class CIService:
     """Serviço para gerenciamento de Colaboradores Internos."""
     
-    def __init__(self):
-        self._cache = {}
-    
     # ============================================================================
     # MÉTODOS DE BUSCA E CONSULTA
     # ============================================================================
@@ -51,11 +379,17 @@ class CIService:
         page: int = 1,
         per_page: int = 50,
         ordenar_por: str = 'nome',
-        ordem: str = 'asc'
+        ordem: str = 'asc',
+        cursor: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Busca colaboradores com filtros e paginação.
         
+        Sem cursor, a paginação é por página (LIMIT/OFFSET). Com cursor
+        (use '' para a primeira página), a paginação é por keyset sobre
+        (coluna de ordenação, id): o custo não cresce com a profundidade e
+        não há contagem total.
+        
         Args:
             nome: Termo para busca por nome (LIKE)
             cpf: CPF para filtro
@@ -66,9 +400,12 @@ class CIService:
             per_page: Itens por página
             ordenar_por: Campo para ordenação
             ordem: 'asc' ou 'desc'
+            cursor: 'proximo_cursor' da página anterior (modo cursor);
+                disponível para ordenação por nome, cpf, created_at ou id
         
         Returns:
-            Dict com 'cis' (lista) e 'total' (int)
+            Dict com 'cis' (lista) e 'total' (int); no modo cursor, 'cis',
+            'proximo_cursor' (None na última página) e 'por_pagina'
         """
         try:
             # Construir query base
@@ -85,155 +422,245 @@ class CIService:
             if cpf:
                 cpf_limpo = clean_cpf(cpf)
                 if cpf_limpo:
-                    query = query.filter(ColaboradorInterno.cpf.ilike(f'%{cpf_limpo}%'))
+                    # clean_cpf só aceita o CPF completo: igualdade (índice único)
+                    query = query.filter(ColaboradorInterno.cpf == cpf_limpo)
+            
+            # NC ativo do colaborador (EXISTS correlacionado: busca indexada
+            # por colaborador em vez de materializar a lista de IDs)
+            nc_ativo = exists().where(
+                NumeroCadastro.colaborador_id == ColaboradorInterno.id,
+                NumeroCadastro.ativo == True
+            )
             
             # Filtro por empresa (via NC ativo)
             if empresa:
-                subquery = db.session.query(NumeroCadastro.colaborador_id).filter(
-                    NumeroCadastro.cod_empresa == empresa,
-                    NumeroCadastro.ativo == True
-                ).subquery()
-                query = query.filter(ColaboradorInterno.id.in_(subquery))
+                query = query.filter(
+                    nc_ativo.where(NumeroCadastro.cod_empresa == empresa)
+                )
             
             # Filtro por status
             if status == 'ativo' and not mostrar_excluidos:
-                subquery = db.session.query(NumeroCadastro.colaborador_id).filter(
-                    NumeroCadastro.ativo == True
-                ).subquery()
-                query = query.filter(ColaboradorInterno.id.in_(subquery))
+                query = query.filter(nc_ativo)
             
             elif status == 'inativo' and not mostrar_excluidos:
-                subquery = db.session.query(NumeroCadastro.colaborador_id).filter(
-                    NumeroCadastro.ativo == True
-                ).subquery()
-                query = query.filter(~ColaboradorInterno.id.in_(subquery))
+                query = query.filter(~nc_ativo)
             
             elif status == 'excluido':
                 query = query.filter_by(is_deleted=True)
             
             # Aplicar ordenação
-            order_map = {
-                'nome': ColaboradorInterno.nome,
-                'cpf': ColaboradorInterno.cpf,
-                'data_admissao': ColaboradorInterno.data_admissao,
-                'created_at': ColaboradorInterno.created_at,
-                'id': ColaboradorInterno.id
-            }
+            if ordenar_por not in _ORDER_MAP:
+                ordenar_por = 'nome'
             
-            order_column = order_map.get(ordenar_por, ColaboradorInterno.nome)
+            if cursor is not None:
+                return self._buscar_por_cursor(
+                    query, _ORDER_MAP[ordenar_por], ordenar_por, ordem, cursor, per_page
+                )
             
-            if ordem.lower() == 'desc':
-                query = query.order_by(desc(order_column))
-            else:
-                query = query.order_by(asc(order_column))
+            order_map = _ORDER_MAP_DESC if ordem.lower() == 'desc' else _ORDER_MAP_ASC
+            query = query.order_by(order_map[ordenar_por])
             
             # Ordenação adicional para consistência
-            if ordenar_por != 'id':
-                query = query.order_by(asc(ColaboradorInterno.id))
-            
-            # Paginação
-            total = query.count()
-            cis = query.paginate(page=page, per_page=per_page, error_out=False)
-            
-            # Carregar relacionamentos necessários
-            cis_loaded = []
-            for ci in cis.items:
-                # Carregar NC ativo
-                ci.nc_ativo = NumeroCadastro.query.filter_by(
-                    colaborador_id=ci.id,
-                    ativo=True
-                ).first()
-                
-                # Contar dependentes
-                ci.total_dependentes_cache = Dependente.query.filter_by(
-                    colaborador_id=ci.id
-                ).count()
-                
-                # Contar planos ativos
-                ci.total_planos_saude_cache = PlanoSaude.query.filter_by(
-                    colaborador_id=ci.id,
-                    ativo=True
-                ).count()
-                
-                ci.total_planos_odonto_cache = PlanoOdontologico.query.filter_by(
-                    colaborador_id=ci.id,
-                    ativo=True
-                ).count()
-                
-                cis_loaded.append(ci)
+            if ordenar_por not in _ORDEM_UNICA:
+                query = query.order_by(_ORDER_MAP_ASC['id'])
+            
+            # Paginação (a contagem é feita à parte, limitada ou estimada)
+            sem_filtros = mostrar_excluidos and not (nome or cpf or empresa or status)
+            total, total_estimado = self._contar_listagem(query, sem_filtros, page, per_page)
+            cis = query.paginate(page=page, per_page=per_page, error_out=False, count=False)
+            
+            # Carregar relacionamentos necessários da página inteira
+            cis_loaded = list(cis.items)
+            self._carregar_nc_ativo(cis_loaded)
             
             return {
                 'cis': cis_loaded,
                 'total': total,
+                'total_estimado': total_estimado,
                 'pagina_atual': page,
-                'total_paginas': cis.pages,
+                'total_paginas': math.ceil(total / per_page) if per_page > 0 else 0,
                 'por_pagina': per_page
             }
             
+        except SistemaCIError:
+            raise
         except Exception as e:
-            raise ValidacaoError(f"Erro na busca de colaboradores: {str(e)}")
+            logger.exception("Erro na busca de colaboradores")
+            raise ValidacaoError(f"Erro na busca de colaboradores: {str(e)}") from e
+    
+    def _contar_listagem(
+        self,
+        query,
+        sem_filtros: bool,
+        page: int,
+        per_page: int
+    ) -> Tuple[int, bool]:
+        """
+        Conta os resultados da listagem sem percorrer a tabela inteira.
+        
+        Sem nenhum filtro, no PostgreSQL, usa a estimativa do catálogo
+        (pg_class.reltuples). Nos demais casos conta no máximo até
+        _PAGINAS_CONTADAS páginas além da atual: "há mais de N" basta para
+        a navegação.
+        
+        Args:
+            query: Query já filtrada
+            sem_filtros: Listagem da tabela inteira (inclui excluídos)
+            page: Página atual
+            per_page: Itens por página
+        
+        Returns:
+            Tuple (total, total_estimado)
+        """
+        if sem_filtros and db.engine.dialect.name == 'postgresql':
+            estimativa = db.session.execute(text(
+                "SELECT reltuples::bigint FROM pg_class WHERE relname = :tabela"
+            ), {'tabela': ColaboradorInterno.__tablename__}).scalar()
+            # -1/0: tabela ainda não analisada
+            if estimativa and estimativa > 0:
+                return int(estimativa), True
+        
+        limite = (max(page, 1) + _PAGINAS_CONTADAS) * per_page
+        total = query.with_entities(ColaboradorInterno.id).order_by(None).limit(
+            limite + 1
+        ).count()
+        
+        if total > limite:
+            return limite, True
+        return total, False
+    
+    def _buscar_por_cursor(
+        self,
+        query,
+        order_column,
+        ordenar_por: str,
+        ordem: str,
+        cursor: str,
+        per_page: int
+    ) -> Dict[str, Any]:
+        """
+        Pagina a busca por keyset: WHERE (coluna, id) > (:valor, :id).
+        
+        Busca per_page + 1 linhas para saber se há próxima página.
+        
+        Args:
+            query: Query já filtrada
+            order_column: Coluna de ordenação
+            ordenar_por: Nome da coluna de ordenação
+            ordem: 'asc' ou 'desc' (vale também para o desempate por id)
+            cursor: Cursor da página anterior ('' para a primeira)
+            per_page: Itens por página
+        
+        Returns:
+            Dict com 'cis', 'proximo_cursor' e 'por_pagina'
+        """
+        if ordenar_por not in _CURSOR_COLUNAS:
+            raise ValidacaoError(
+                f"Paginação por cursor não suporta ordenação por '{ordenar_por}'"
+            )
+        
+        chave = tuple_(order_column, ColaboradorInterno.id)
+        decrescente = ordem.lower() == 'desc'
+        
+        if cursor:
+            posicao = tuple_(*_decodificar_cursor(cursor, ordenar_por))
+            query = query.filter(chave < posicao if decrescente else chave > posicao)
+        
+        direcao = desc if decrescente else asc
+        colunas = [order_column] if ordenar_por in _ORDEM_UNICA else [order_column, ColaboradorInterno.id]
+        query = query.order_by(*(direcao(coluna) for coluna in colunas))
+        
+        cis = query.limit(per_page + 1).all()
+        
+        proximo_cursor = None
+        if len(cis) > per_page:
+            cis = cis[:per_page]
+            ultimo = cis[-1]
+            proximo_cursor = _codificar_cursor(getattr(ultimo, ordenar_por), ultimo.id)
+        
+        self._carregar_nc_ativo(cis)
+        
+        return {
+            'cis': cis,
+            'proximo_cursor': proximo_cursor,
+            'por_pagina': per_page
+        }
     
-    def pesquisa_rapida(self, termo: str, limite: int = 20) -> List[ColaboradorInterno]:
+    @staticmethod
+    def _carregar_nc_ativo(cis: List[ColaboradorInterno]) -> None:
+        """
+        Atribui o NC ativo de cada colaborador com uma única consulta IN.
+        
+        Args:
+            cis: Colaboradores a carregar
+        """
+        if not cis:
+            return
+        
+        ncs_ativos = {}
+        for nc in NumeroCadastro.query.filter(
+            NumeroCadastro.colaborador_id.in_([ci.id for ci in cis]),
+            NumeroCadastro.ativo == True
+        ):
+            ncs_ativos.setdefault(nc.colaborador_id, nc)
+        
+        for ci in cis:
+            ci.nc_ativo = ncs_ativos.get(ci.id)
+    
+    def pesquisa_rapida(self, termo: str, limite: int = 20) -> List[ResultadoPesquisa]:
         """
         Pesquisa rápida de colaboradores para autocomplete.
         
+        Os resultados ficam em cache (ver _pesquisa_rapida), chaveados pelo
+        termo normalizado e pelo limite.
+        
         Args:
             termo: Termo de busca
             limite: Número máximo de resultados
         
         Returns:
-            Lista de colaboradores
+            Lista de ResultadoPesquisa (tuplas, sem vínculo com a sessão)
         """
         try:
             termo_limpo = termo.strip()
             if len(termo_limpo) < 2:
                 return []
             
-            # Buscar por nome, CPF ou NC
-            query = ColaboradorInterno.query.filter(
-                ColaboradorInterno.is_deleted == False
-            ).filter(
-                or_(
-                    ColaboradorInterno.nome.ilike(f'%{termo_limpo}%'),
-                    ColaboradorInterno.cpf.ilike(f'%{termo_limpo}%'),
-                    ColaboradorInterno.id.in_(
-                        db.session.query(NumeroCadastro.colaborador_id).filter(
-                            NumeroCadastro.nc.ilike(f'%{termo_limpo}%'),
-                            NumeroCadastro.ativo == True
-                        )
-                    )
-                )
-            ).order_by(ColaboradorInterno.nome).limit(limite)
-            
-            # Carregar NC ativo para cada resultado
-            resultados = []
-            for ci in query.all():
-                ci.nc_ativo = NumeroCadastro.query.filter_by(
-                    colaborador_id=ci.id,
-                    ativo=True
-                ).first()
-                resultados.append(ci)
-            
-            return resultados
+            return list(_pesquisa_rapida(termo_limpo.lower(), limite))
             
+        except SistemaCIError:
+            raise
         except Exception as e:
-            raise ValidacaoError(f"Erro na pesquisa rápida: {str(e)}")
+            logger.exception("Erro na pesquisa rápida")
+            raise ValidacaoError(f"Erro na pesquisa rápida: {str(e)}") from e
     
-    def obter_por_id(self, ci_id: int) -> Optional[ColaboradorInterno]:
+    def obter_por_id(
+        self,
+        ci_id: int,
+        carregar_relacionamentos: bool = True
+    ) -> Optional[ColaboradorInterno]:
         """
         Obtém um colaborador por ID com todos os relacionamentos.
         
         Args:
             ci_id: ID do colaborador
+            carregar_relacionamentos: Se False, devolve apenas o colaborador
+                (mapa de identidade da sessão), sem as cargas de dependentes,
+                planos e histórico - suficiente para os métodos de escrita
         
         Returns:
             ColaboradorInterno ou None
         """
         try:
-            ci = ColaboradorInterno.query.get(ci_id)
+            if carregar_relacionamentos:
+                carregados = self._carregados_na_requisicao()
+                if ci_id in carregados:
+                    return carregados[ci_id]
             
-            if not ci:
-                return None
+            ci = db.session.get(ColaboradorInterno, ci_id)
+            
+            if not ci or not carregar_relacionamentos:
+                return ci
             
             # Carregar relacionamentos
             ci.nc_ativo = NumeroCadastro.query.filter_by(
@@ -242,7 +669,8 @@ class CIService:
             ).first()
             
             ci.dependentes_cache = Dependente.query.filter_by(
-                colaborador_id=ci.id
+                colaborador_id=ci.id,
+                is_deleted=False
             ).all()
             
             ci.planos_saude_cache = PlanoSaude.query.filter_by(
@@ -257,10 +685,14 @@ class CIService:
                 colaborador_id=ci.id
             ).order_by(HistoricoCI.data_evento.desc()).limit(100).all()
             
+            carregados[ci_id] = ci
             return ci
             
+        except SistemaCIError:
+            raise
         except Exception as e:
-            raise ValidacaoError(f"Erro ao obter colaborador: {str(e)}")
+            logger.exception("Erro ao obter colaborador")
+            raise ValidacaoError(f"Erro ao obter colaborador: {str(e)}") from e
     
     def obter_por_cpf(self, cpf: str) -> Optional[ColaboradorInterno]:
         """
@@ -279,8 +711,11 @@ class CIService:
             
             return ColaboradorInterno.query.filter_by(cpf=cpf_limpo).first()
             
+        except SistemaCIError:
+            raise
         except Exception as e:
-            raise ValidacaoError(f"Erro ao buscar por CPF: {str(e)}")
+            logger.exception("Erro ao buscar por CPF")
+            raise ValidacaoError(f"Erro ao buscar por CPF: {str(e)}") from e
     
     def obter_por_nc(self, nc: str, ativo: bool = True) -> Optional[ColaboradorInterno]:
         """
@@ -305,8 +740,11 @@ class CIService:
             
             return nc_obj.colaborador if nc_obj else None
             
+        except SistemaCIError:
+            raise
         except Exception as e:
-            raise ValidacaoError(f"Erro ao buscar por NC: {str(e)}")
+            logger.exception("Erro ao buscar por NC")
+            raise ValidacaoError(f"Erro ao buscar por NC: {str(e)}") from e
     
     # ============================================================================
     # MÉTODOS DE CRIAÇÃO E ATUALIZAÇÃO
@@ -352,7 +790,6 @@ class CIService:
             telefone = dados.get('telefone', '').strip() or None
             
             # Processar datas
-            from app.utils.validators import validate_date
             data_admissao = validate_date(dados.get('data_admissao'))
             data_nascimento = validate_date(dados.get('data_nascimento'))
             
@@ -387,11 +824,11 @@ class CIService:
                     )
             
             # Registrar histórico
-            usuario = Usuario.query.get(usuario_id)
-            historico = HistoricoCI(
+            usuario = nome_usuario(usuario_id)
+            self._registrar_historico(
                 colaborador_id=ci.id,
                 tipo_evento='CRIAÇÃO_MANUAL',
-                descricao=f'CI criado manualmente por {usuario.nome if usuario else "Sistema"}',
+                descricao=f'CI criado manualmente por {usuario}',
                 data_evento=date.today(),
                 nc=nc if nc_raw else None,
                 cod_empresa=empresa_limpa if empresa else None,
@@ -400,22 +837,166 @@ class CIService:
                     'cpf': cpf,
                     'email': email,
                     'telefone': telefone,
-                    'data_admissao': data_admissao.isoformat() if data_admissao else None,
-                    'data_nascimento': data_nascimento.isoformat() if data_nascimento else None,
-                    'usuario': usuario.nome if usuario else 'Sistema'
+                    'data_admissao': data_admissao,
+                    'data_nascimento': data_nascimento,
+                    'usuario': usuario
                 }
             )
-            db.session.add(historico)
             
             db.session.commit()
+            invalidar_cache_colaboradores()
             
             return ci
             
-        except (CPFJaCadastradoError, ValidacaoError):
+        except SistemaCIError:
+            db.session.rollback()
             raise
         except Exception as e:
             db.session.rollback()
-            raise ValidacaoError(f"Erro ao criar colaborador: {str(e)}")
+            logger.exception("Erro ao criar colaborador")
+            raise ValidacaoError(f"Erro ao criar colaborador: {str(e)}") from e
+    
+    def criar_colaboradores_bulk(
+        self,
+        dados_list: List[Dict[str, Any]],
+        usuario_id: int
+    ) -> List[int]:
+        """
+        Cria vários colaboradores em uma única transação (importações).
+        
+        Usa os mesmos campos e validações de ``criar_colaborador``, mas grava
+        colaboradores, NCs e históricos com um INSERT em lote (executemany)
+        por tabela, em vez de um flush por colaborador. Se qualquer item for
+        inválido, nada é gravado.
+        
+        Args:
+            dados_list: Lista de dicionários com dados dos colaboradores
+            usuario_id: ID do usuário que está criando
+        
+        Returns:
+            IDs dos colaboradores criados, na ordem de ``dados_list``
+        
+        Raises:
+            CPFJaCadastradoError: Se algum CPF já estiver cadastrado ou repetido
+            NCEmUsoError: Se algum NC já estiver em uso ou repetido
+            ValidacaoError: Se dados forem inválidos
+        """
+        if not dados_list:
+            return []
+        
+        try:
+            linhas_ci = []
+            ncs = []
+            for dados in dados_list:
+                nome = (dados.get('nome') or '').strip()
+                cpf = clean_cpf((dados.get('cpf') or '').strip())
+                
+                if not nome:
+                    raise ValidacaoError("Nome é obrigatório")
+                if not cpf:
+                    raise ValidacaoError("CPF inválido")
+                
+                linhas_ci.append({
+                    'nome': nome,
+                    'cpf': cpf,
+                    'email': (dados.get('email') or '').strip() or None,
+                    'telefone': (dados.get('telefone') or '').strip() or None,
+                    'data_admissao': validate_date(dados.get('data_admissao')),
+                    'data_nascimento': validate_date(dados.get('data_nascimento')),
+                    'dados_adicionais': dados.get('dados_adicionais')
+                })
+                
+                nc = clean_nc((dados.get('nc') or '').strip())
+                empresa = clean_empresa((dados.get('empresa') or '').strip())
+                ncs.append((nc, empresa) if nc and empresa else (None, None))
+            
+            # CPFs repetidos no lote ou já cadastrados (uma consulta)
+            cpfs = [linha['cpf'] for linha in linhas_ci]
+            vistos = set()
+            for cpf in cpfs:
+                if cpf in vistos:
+                    raise CPFJaCadastradoError(cpf)
+                vistos.add(cpf)
+            existente = db.session.execute(
+                select(ColaboradorInterno.cpf).where(ColaboradorInterno.cpf.in_(cpfs)).limit(1)
+            ).scalar()
+            if existente:
+                raise CPFJaCadastradoError(existente)
+            
+            # NCs repetidos no lote ou já ativos (uma consulta)
+            ncs_lote = [nc for nc, _ in ncs if nc]
+            vistos = set()
+            for nc in ncs_lote:
+                if nc in vistos:
+                    raise NCEmUsoError(nc)
+                vistos.add(nc)
+            if ncs_lote:
+                em_uso = db.session.execute(
+                    select(NumeroCadastro.nc).where(
+                        NumeroCadastro.nc.in_(ncs_lote),
+                        NumeroCadastro.ativo == True
+                    ).limit(1)
+                ).scalar()
+                if em_uso:
+                    raise NCEmUsoError(em_uso)
+            
+            with db.session.no_autoflush:
+                ids = db.session.scalars(
+                    insert(ColaboradorInterno).returning(
+                        ColaboradorInterno.id, sort_by_parameter_order=True
+                    ),
+                    linhas_ci
+                ).all()
+                
+                hoje = date.today()
+                usuario = nome_usuario(usuario_id)
+                linhas_nc = []
+                linhas_historico = []
+                for ci_id, linha, (nc, empresa) in zip(ids, linhas_ci, ncs):
+                    if nc:
+                        linhas_nc.append({
+                            'nc': nc,
+                            'cod_empresa': empresa,
+                            'data_inicio': hoje,
+                            'ativo': True,
+                            'motivo_mudanca': 'CRIAÇÃO MANUAL',
+                            'colaborador_id': ci_id
+                        })
+                    linhas_historico.append({
+                        'colaborador_id': ci_id,
+                        'tipo_evento': 'CRIAÇÃO_MANUAL',
+                        'descricao': f'CI criado manualmente por {usuario}',
+                        'data_evento': hoje,
+                        'nc': nc,
+                        'cod_empresa': empresa,
+                        'dados_alterados': {
+                            'nome': linha['nome'],
+                            'cpf': linha['cpf'],
+                            'email': linha['email'],
+                            'telefone': linha['telefone'],
+                            'data_admissao': linha['data_admissao'].isoformat() if linha['data_admissao'] else None,
+                            'data_nascimento': linha['data_nascimento'].isoformat() if linha['data_nascimento'] else None,
+                            'usuario': usuario
+                        }
+                    })
+                
+                # Core (tabela): chaves nulas não quebram o executemany em grupos
+                if linhas_nc:
+                    db.session.execute(insert(NumeroCadastro.__table__), linhas_nc)
+                db.session.execute(insert(HistoricoCI.__table__), linhas_historico)
+            
+            db.session.commit()
+            invalidar_cache_colaboradores()
+            
+            return list(ids)
+            
+        except SistemaCIError:
+            db.session.rollback()
+            raise
+        except Exception as e:
+            db.session.rollback()
+            logger.exception("Erro ao criar colaboradores em lote")
+            raise ValidacaoError(f"Erro ao criar colaboradores em lote: {str(e)}") from e
     
     def atualizar_colaborador(
         self,
@@ -440,7 +1021,7 @@ class CIService:
             ValidacaoError: Se dados forem inválidos
         """
         try:
-            ci = self.obter_por_id(ci_id)
+            ci = self.obter_por_id(ci_id, carregar_relacionamentos=False)
             if not ci:
                 raise CINaoEncontradoError(ci_id)
             
@@ -467,13 +1048,11 @@ class CIService:
                 ci.telefone = dados['telefone'].strip() if dados['telefone'] else None
             
             if 'data_admissao' in dados:
-                from app.utils.validators import validate_date
                 data = validate_date(dados['data_admissao'])
                 if data:
                     ci.data_admissao = data
             
             if 'data_nascimento' in dados:
-                from app.utils.validators import validate_date
                 data = validate_date(dados['data_nascimento'])
                 if data:
                     ci.data_nascimento = data
@@ -490,34 +1069,37 @@ class CIService:
                 'data_nascimento': ci.data_nascimento
             }
             
-            alteracoes = {
-                k: {'antigo': dados_antigos[k], 'novo': dados_novos[k]}
-                for k in dados_antigos
-                if dados_antigos[k] != dados_novos[k]
-            }
+            alteracoes = calcular_alteracoes(dados_antigos, dados_novos)
+            
+            # Nada mudou: não há histórico a gravar nem transação a confirmar
+            if not alteracoes and not db.session.is_modified(ci):
+                return ci
             
             if alteracoes:
-                usuario = Usuario.query.get(usuario_id)
-                historico = HistoricoCI(
+                nc_ativo = ci.nc_ativo
+                self._registrar_historico(
                     colaborador_id=ci.id,
                     tipo_evento='ALTERACAO_DADOS',
                     descricao='Alteração de dados cadastrais',
                     data_evento=date.today(),
-                    nc=ci.nc_atual.nc if ci.nc_ativo else None,
-                    cod_empresa=ci.nc_ativo.cod_empresa if ci.nc_ativo else None,
+                    nc=nc_ativo.nc if nc_ativo else None,
+                    cod_empresa=nc_ativo.cod_empresa if nc_ativo else None,
                     dados_alterados=alteracoes
                 )
-                db.session.add(historico)
             
             db.session.commit()
+            self._esquecer_colaborador(ci_id)
+            invalidar_cache_colaboradores()
             
             return ci
             
-        except (CINaoEncontradoError, ColaboradorExcluidoError):
+        except SistemaCIError:
+            db.session.rollback()
             raise
         except Exception as e:
             db.session.rollback()
-            raise ValidacaoError(f"Erro ao atualizar colaborador: {str(e)}")
+            logger.exception("Erro ao atualizar colaborador")
+            raise ValidacaoError(f"Erro ao atualizar colaborador: {str(e)}") from e
     
     # ============================================================================
     # MÉTODOS DE NC (NÚMERO DE CADASTRO)
@@ -539,25 +1121,30 @@ class CIService:
             if not nc_limpo:
                 return False
             
-            query = NumeroCadastro.query.filter_by(
-                nc=nc_limpo,
-                ativo=True
+            criterio = exists().where(
+                NumeroCadastro.nc == nc_limpo,
+                NumeroCadastro.ativo == True
             )
             
             if excluir_ci_id:
-                query = query.filter(NumeroCadastro.colaborador_id != excluir_ci_id)
+                criterio = criterio.where(NumeroCadastro.colaborador_id != excluir_ci_id)
             
-            return query.first() is not None
+            # SELECT EXISTS(...): um booleano, sem carregar a linha
+            return bool(db.session.execute(select(criterio)).scalar())
             
+        except SistemaCIError:
+            raise
         except Exception as e:
-            raise ValidacaoError(f"Erro ao verificar NC: {str(e)}")
+            logger.exception("Erro ao verificar NC")
+            raise ValidacaoError(f"Erro ao verificar NC: {str(e)}") from e
     
     def adicionar_nc(
         self,
         ci_id: int,
         nc: str,
         empresa: str,
-        motivo: str = None
+        motivo: str = None,
+        commit: bool = True
     ) -> NumeroCadastro:
         """
         Adiciona um novo NC para um colaborador.
@@ -567,6 +1154,7 @@ class CIService:
             nc: Número de Cadastro
             empresa: Código da empresa
             motivo: Motivo da adição
+            commit: Se False, apenas faz flush (o chamador confirma a transação)
         
         Returns:
             NumeroCadastro criado
@@ -577,7 +1165,7 @@ class CIService:
             ValidacaoError: Se dados forem inválidos
         """
         try:
-            ci = self.obter_por_id(ci_id)
+            ci = self.obter_por_id(ci_id, carregar_relacionamentos=False)
             if not ci:
                 raise CINaoEncontradoError(ci_id)
             
@@ -593,29 +1181,41 @@ class CIService:
             if not empresa_limpa:
                 raise ValidacaoError("Empresa inválida")
             
+            # Registros do NC pretendido (de qualquer colaborador), com as linhas
+            # bloqueadas até o fim da transação
+            registros = NumeroCadastro.query.filter(
+                NumeroCadastro.nc == nc_limpo
+            ).order_by(NumeroCadastro.data_inicio.desc()).with_for_update().all()
+            
             # Verificar se NC já está em uso
-            if self.nc_em_uso(nc_limpo, ci_id):
+            if any(
+                r.nc == nc_limpo and r.ativo and r.colaborador_id != ci_id
+                for r in registros
+            ):
                 raise NCEmUsoError(nc_limpo)
             
-            # Desativar NCs ativos anteriores
-            ncs_ativos = NumeroCadastro.query.filter_by(
-                colaborador_id=ci_id,
-                ativo=True
-            ).all()
-            
-            for nc_ativo in ncs_ativos:
-                if nc_ativo.nc != nc_limpo:
-                    nc_ativo.desativar(
-                        data_fim=date.today(),
-                        motivo=f'MUDANÇA PARA NC {nc_limpo}'
-                    )
+            # Desativar NCs ativos anteriores (um único UPDATE; os objetos já
+            # carregados na sessão são sincronizados em memória)
+            db.session.execute(
+                update(NumeroCadastro).where(
+                    NumeroCadastro.colaborador_id == ci_id,
+                    NumeroCadastro.ativo == True,
+                    NumeroCadastro.nc != nc_limpo
+                ).values(
+                    ativo=False,
+                    data_fim=date.today(),
+                    motivo_mudanca=f'MUDANÇA PARA NC {nc_limpo}'
+                ).execution_options(synchronize_session='evaluate')
+            )
             
-            # Verificar se já existe registro inativo para reativar
-            nc_existente = NumeroCadastro.query.filter_by(
-                colaborador_id=ci_id,
-                nc=nc_limpo,
-                ativo=False
-            ).order_by(NumeroCadastro.data_inicio.desc()).first()
+            # Verificar se já existe registro inativo para reativar (o mais recente)
+            nc_existente = next(
+                (
+                    r for r in registros
+                    if r.colaborador_id == ci_id and not r.ativo
+                ),
+                None
+            )
             
             if nc_existente:
                 # Reativar NC existente
@@ -637,15 +1237,22 @@ class CIService:
                 )
                 db.session.add(nc_obj)
             
-            db.session.commit()
+            if commit:
+                db.session.commit()
+                invalidar_cache_colaboradores()
+            else:
+                db.session.flush()
+            self._esquecer_colaborador(ci_id)
             
             return nc_obj
             
-        except (CINaoEncontradoError, ColaboradorExcluidoError, NCEmUsoError):
+        except SistemaCIError:
+            db.session.rollback()
             raise
         except Exception as e:
             db.session.rollback()
-            raise ValidacaoError(f"Erro ao adicionar NC: {str(e)}")
+            logger.exception("Erro ao adicionar NC")
+            raise ValidacaoError(f"Erro ao adicionar NC: {str(e)}") from e
     
     def mudar_nc(
         self,
@@ -671,17 +1278,25 @@ class CIService:
             ValidacaoError: Se dados forem inválidos
         """
         try:
-            # Adicionar novo NC (já valida e desativa anteriores)
+            # NC/empresa atuais, lidos antes da troca
+            anterior = db.session.execute(
+                select(NumeroCadastro.nc, NumeroCadastro.cod_empresa).where(
+                    NumeroCadastro.colaborador_id == ci_id,
+                    NumeroCadastro.ativo == True
+                ).limit(1)
+            ).first()
+            
+            # Adicionar novo NC (já valida e desativa anteriores), na mesma transação
             self.adicionar_nc(
                 ci_id=ci_id,
                 nc=novo_nc,
                 empresa=nova_empresa,
-                motivo=motivo
+                motivo=motivo,
+                commit=False
             )
             
             # Registrar histórico específico
-            ci = self.obter_por_id(ci_id)
-            usuario = Usuario.query.get(usuario_id)
+            usuario = nome_usuario(usuario_id)
             
             historico = HistoricoCI(
                 colaborador_id=ci_id,
@@ -691,21 +1306,25 @@ class CIService:
                 nc=novo_nc,
                 cod_empresa=nova_empresa,
                 dados_alterados={
-                    'nc_antigo': ci.nc_atual if ci.nc_ativo else None,
-                    'empresa_antiga': ci.empresa_atual,
+                    'nc_antigo': anterior.nc if anterior else None,
+                    'empresa_antiga': anterior.cod_empresa if anterior else None,
                     'motivo': motivo,
-                    'usuario': usuario.nome if usuario else 'Sistema'
+                    'usuario': usuario
                 }
             )
             db.session.add(historico)
             
             db.session.commit()
+            self._esquecer_colaborador(ci_id)
+            invalidar_cache_colaboradores()
             
-        except (CINaoEncontradoError, NCEmUsoError):
+        except SistemaCIError:
+            db.session.rollback()
             raise
         except Exception as e:
             db.session.rollback()
-            raise ValidacaoError(f"Erro ao mudar NC: {str(e)}")
+            logger.exception("Erro ao mudar NC")
+            raise ValidacaoError(f"Erro ao mudar NC: {str(e)}") from e
     
     def obter_historico_nc(self, ci_id: int) -> List[NumeroCadastro]:
         """
@@ -724,8 +1343,11 @@ class CIService:
                 NumeroCadastro.data_inicio.desc()
             ).all()
             
+        except SistemaCIError:
+            raise
         except Exception as e:
-            raise ValidacaoError(f"Erro ao obter histórico de NCs: {str(e)}")
+            logger.exception("Erro ao obter histórico de NCs")
+            raise ValidacaoError(f"Erro ao obter histórico de NCs: {str(e)}") from e
     
     # ============================================================================
     # MÉTODOS DE DEPENDENTES
@@ -754,7 +1376,7 @@ class CIService:
             ValidacaoError: Se dados forem inválidos
         """
         try:
-            ci = self.obter_por_id(ci_id)
+            ci = self.obter_por_id(ci_id, carregar_relacionamentos=False)
             if not ci:
                 raise CINaoEncontradoError(ci_id)
             
@@ -773,14 +1395,14 @@ class CIService:
             if cpf:
                 existente = Dependente.query.filter_by(
                     cpf=cpf,
-                    colaborador_id=ci_id
+                    colaborador_id=ci_id,
+                    is_deleted=False
                 ).first()
                 if existente:
                     raise ValidacaoError("Já existe um dependente com este CPF")
             
             parentesco = dados.get('parentesco', '').strip() or 'DEPENDENTE'
             
-            from app.utils.validators import validate_date
             data_nascimento = validate_date(dados.get('data_nascimento'))
             
             # Criar dependente
@@ -797,7 +1419,7 @@ class CIService:
             db.session.flush()
             
             # Registrar histórico
-            usuario = Usuario.query.get(usuario_id)
+            usuario = nome_usuario(usuario_id)
             historico = HistoricoCI(
                 colaborador_id=ci_id,
                 tipo_evento='ADICAO_DEPENDENTE',
@@ -809,20 +1431,24 @@ class CIService:
                     'dependente_nome': nome,
                     'dependente_cpf': cpf,
                     'parentesco': parentesco,
-                    'usuario': usuario.nome if usuario else 'Sistema'
+                    'usuario': usuario
                 }
             )
             db.session.add(historico)
             
             db.session.commit()
+            self._esquecer_colaborador(ci_id)
+            invalidar_cache_colaboradores()
             
             return dependente
             
-        except (CINaoEncontradoError, ColaboradorExcluidoError):
+        except SistemaCIError:
+            db.session.rollback()
             raise
         except Exception as e:
             db.session.rollback()
-            raise ValidacaoError(f"Erro ao adicionar dependente: {str(e)}")
+            logger.exception("Erro ao adicionar dependente")
+            raise ValidacaoError(f"Erro ao adicionar dependente: {str(e)}") from e
     
     def atualizar_dependente(
         self,
@@ -846,89 +1472,187 @@ class CIService:
         """
         try:
             dependente = Dependente.query.get(dep_id)
-            if not dependente:
+            if not dependente or dependente.is_deleted:
                 raise ValidacaoError("Dependente não encontrado")
             
-            ci = self.obter_por_id(dependente.colaborador_id)
+            ci = self.obter_por_id(dependente.colaborador_id, carregar_relacionamentos=False)
             if ci and ci.is_deleted:
                 raise ColaboradorExcluidoError(ci.id)
             
-            # Registrar dados antigos
-            dados_antigos = {
-                'nome': dependente.nome,
-                'cpf': dependente.cpf,
-                'parentesco': dependente.parentesco,
-                'data_nascimento': dependente.data_nascimento
-            }
+            # Nada mudou: não há histórico a gravar nem transação a confirmar
+            if not self._aplicar_dados_dependente(dependente, dados, ci):
+                return dependente
             
-            # Atualizar dados
-            if 'nome' in dados and dados['nome']:
-                dependente.nome = dados['nome'].strip()
-            
-            if 'cpf' in dados:
-                cpf_raw = dados['cpf'].strip() if dados['cpf'] else ''
-                if cpf_raw:
-                    cpf = clean_cpf(cpf_raw)
-                    if cpf and cpf != dependente.cpf:
-                        # Verificar se CPF já existe em outro dependente
-                        existente = Dependente.query.filter(
-                            Dependente.cpf == cpf,
-                            Dependente.colaborador_id == dependente.colaborador_id,
-                            Dependente.id != dep_id
-                        ).first()
-                        if existente:
-                            raise ValidacaoError("Já existe um dependente com este CPF")
-                        dependente.cpf = cpf
-                else:
-                    dependente.cpf = None
-            
-            if 'parentesco' in dados and dados['parentesco']:
-                dependente.parentesco = dados['parentesco'].strip()
-            
-            if 'data_nascimento' in dados:
-                from app.utils.validators import validate_date
-                data = validate_date(dados['data_nascimento'])
-                if data:
-                    dependente.data_nascimento = data
+            db.session.commit()
+            self._esquecer_colaborador(dependente.colaborador_id)
             
-            # Registrar histórico
-            dados_novos = {
-                'nome': dependente.nome,
-                'cpf': dependente.cpf,
-                'parentesco': dependente.parentesco,
-                'data_nascimento': dependente.data_nascimento
-            }
+            return dependente
             
-            alteracoes = {
-                k: {'antigo': dados_antigos[k], 'novo': dados_novos[k]}
-                for k in dados_antigos
-                if dados_antigos[k] != dados_novos[k]
+        except SistemaCIError:
+            db.session.rollback()
+            raise
+        except Exception as e:
+            db.session.rollback()
+            logger.exception("Erro ao atualizar dependente")
+            raise ValidacaoError(f"Erro ao atualizar dependente: {str(e)}") from e
+    
+    def atualizar_dependentes_bulk(
+        self,
+        atualizacoes: List[Dict[str, Any]],
+        usuario_id: int
+    ) -> List[Dependente]:
+        """
+        Atualiza vários dependentes em uma única transação.
+        
+        Dependentes e NCs ativos dos colaboradores são carregados com uma
+        consulta IN cada; os históricos vão juntos no mesmo flush e há um
+        único commit (nenhum, se nada mudou).
+        
+        Args:
+            atualizacoes: Lista de dicionários com ``id`` do dependente e os
+                campos a atualizar (mesmos de ``atualizar_dependente``)
+            usuario_id: ID do usuário que está atualizando
+        
+        Returns:
+            Dependentes na ordem de ``atualizacoes``
+        
+        Raises:
+            ValidacaoError: Se algum dependente não existir ou dados forem
+                inválidos; nesse caso nenhuma alteração é gravada
+        """
+        if not atualizacoes:
+            return []
+        
+        try:
+            ids = [item.get('id') for item in atualizacoes]
+            dependentes = {
+                dep.id: dep
+                for dep in Dependente.query.filter(
+                    Dependente.id.in_(ids),
+                    Dependente.is_deleted == False
+                )
             }
-            
-            if alteracoes:
-                usuario = Usuario.query.get(usuario_id)
-                historico = HistoricoCI(
-                    colaborador_id=dependente.colaborador_id,
-                    tipo_evento='ALTERACAO_DEPENDENTE',
-                    descricao=f'Dados do dependente {dependente.nome} alterados',
-                    data_evento=date.today(),
-                    nc=ci.nc_atual if ci else None,
-                    cod_empresa=ci.empresa_atual if ci else None,
-                    dados_alterados=alteracoes
+            faltando = [dep_id for dep_id in ids if dep_id not in dependentes]
+            if faltando:
+                raise ValidacaoError(f"Dependentes não encontrados: {faltando}")
+            
+            colaboradores = {
+                ci.id: ci
+                for ci in ColaboradorInterno.query.filter(
+                    ColaboradorInterno.id.in_({dep.colaborador_id for dep in dependentes.values()})
                 )
-                db.session.add(historico)
-            
-            db.session.commit()
+            }
+            excluidos = [ci.id for ci in colaboradores.values() if ci.is_deleted]
+            if excluidos:
+                raise ColaboradorExcluidoError(excluidos[0])
+            self._carregar_nc_ativo(list(colaboradores.values()))
+            
+            alterados = set()
+            for item in atualizacoes:
+                dependente = dependentes[item['id']]
+                ci = colaboradores.get(dependente.colaborador_id)
+                if self._aplicar_dados_dependente(dependente, item, ci):
+                    alterados.add(dependente.colaborador_id)
+            
+            if alterados:
+                db.session.commit()
+                for ci_id in alterados:
+                    self._esquecer_colaborador(ci_id)
             
-            return dependente
+            return [dependentes[dep_id] for dep_id in ids]
             
+        except SistemaCIError:
+            db.session.rollback()
+            raise
         except Exception as e:
             db.session.rollback()
-            raise ValidacaoError(f"Erro ao atualizar dependente: {str(e)}")
+            logger.exception("Erro ao atualizar dependentes")
+            raise ValidacaoError(f"Erro ao atualizar dependentes: {str(e)}") from e
+    
+    def _aplicar_dados_dependente(
+        self,
+        dependente: Dependente,
+        dados: Dict[str, Any],
+        ci: Optional[ColaboradorInterno]
+    ) -> bool:
+        """
+        Aplica os dados ao dependente e registra o histórico, sem commit.
+        
+        Args:
+            dependente: Dependente a atualizar
+            dados: Dicionário com dados para atualizar
+            ci: Colaborador do dependente (para NC/empresa do histórico)
+        
+        Returns:
+            True se algum campo mudou
+        
+        Raises:
+            ValidacaoError: Se os dados forem inválidos
+        """
+        # Verificar CPF repetido antes de alterar qualquer campo
+        if dados.get('cpf') and dados['cpf'].strip():
+            cpf = clean_cpf(dados['cpf'].strip())
+            if cpf and cpf != dependente.cpf:
+                existente = Dependente.query.filter(
+                    Dependente.cpf == cpf,
+                    Dependente.colaborador_id == dependente.colaborador_id,
+                    Dependente.is_deleted == False,
+                    Dependente.id != dependente.id
+                ).first()
+                if existente:
+                    raise ValidacaoError("Já existe um dependente com este CPF")
+        
+        # Registrar dados antigos
+        dados_antigos = {
+            'nome': dependente.nome,
+            'cpf': dependente.cpf,
+            'parentesco': dependente.parentesco,
+            'data_nascimento': dependente.data_nascimento
+        }
+        
+        # Atualizar dados
+        if 'nome' in dados and dados['nome']:
+            dependente.nome = dados['nome'].strip()
+        
+        if 'cpf' in dados:
+            cpf_raw = dados['cpf'].strip() if dados['cpf'] else ''
+            if cpf_raw:
+                cpf = clean_cpf(cpf_raw)
+                if cpf:
+                    dependente.cpf = cpf
+            else:
+                dependente.cpf = None
+        
+        if 'parentesco' in dados and dados['parentesco']:
+            dependente.parentesco = dados['parentesco'].strip()
+        
+        if 'data_nascimento' in dados:
+            data = validate_date(dados['data_nascimento'])
+            if data:
+                dependente.data_nascimento = data
+        
+        alteracoes = calcular_alteracoes(
+            dados_antigos, {campo: getattr(dependente, campo) for campo in dados_antigos}
+        )
+        
+        if not alteracoes:
+            return False
+        
+        # Registrar histórico
+        self._registrar_historico(
+            colaborador_id=dependente.colaborador_id,
+            tipo_evento='ALTERACAO_DEPENDENTE',
+            descricao=f'Dados do dependente {dependente.nome} alterados',
+            data_evento=date.today(),
+            nc=ci.nc_atual if ci else None,
+            cod_empresa=ci.empresa_atual if ci else None,
+            dados_alterados=alteracoes
+        )
+        return True
     
     def excluir_dependente(self, dep_id: int, usuario_id: int) -> None:
         """
-        Exclui um dependente.
+        Exclui um dependente (exclusão lógica).
         
         Args:
             dep_id: ID do dependente
@@ -939,16 +1663,17 @@ class CIService:
         """
         try:
             dependente = Dependente.query.get(dep_id)
-            if not dependente:
+            if not dependente or dependente.is_deleted:
                 raise ValidacaoError("Dependente não encontrado")
             
-            ci = self.obter_por_id(dependente.colaborador_id)
+            ci = self.obter_por_id(dependente.colaborador_id, carregar_relacionamentos=False)
             if ci and ci.is_deleted:
                 raise ColaboradorExcluidoError(ci.id)
             
-            # Registrar histórico antes de excluir
-            usuario = Usuario.query.get(usuario_id)
-            historico = HistoricoCI(
+            # Exclusão lógica: os dados do dependente continuam na própria linha,
+            # o histórico só registra o evento
+            dependente.excluir_soft(usuario_id)
+            self._registrar_historico(
                 colaborador_id=dependente.colaborador_id,
                 tipo_evento='EXCLUSAO_DEPENDENTE',
                 descricao=f'Dependente {dependente.nome} excluído',
@@ -956,21 +1681,22 @@ class CIService:
                 nc=ci.nc_atual if ci else None,
                 cod_empresa=ci.empresa_atual if ci else None,
                 dados_alterados={
-                    'dependente_nome': dependente.nome,
-                    'dependente_cpf': dependente.cpf,
-                    'parentesco': dependente.parentesco,
-                    'usuario': usuario.nome if usuario else 'Sistema'
+                    'dependente_id': dependente.id,
+                    'usuario': nome_usuario(usuario_id)
                 }
             )
-            db.session.add(historico)
             
-            # Excluir dependente
-            db.session.delete(dependente)
             db.session.commit()
+            self._esquecer_colaborador(dependente.colaborador_id)
+            invalidar_cache_colaboradores()
             
+        except SistemaCIError:
+            db.session.rollback()
+            raise
         except Exception as e:
             db.session.rollback()
-            raise ValidacaoError(f"Erro ao excluir dependente: {str(e)}")
+            logger.exception("Erro ao excluir dependente")
+            raise ValidacaoError(f"Erro ao excluir dependente: {str(e)}") from e
     
     # ============================================================================
     # MÉTODOS DE EXCLUSÃO E RESTAURAÇÃO
@@ -995,7 +1721,7 @@ class CIService:
             ValidacaoError: Se colaborador já estiver excluído
         """
         try:
-            ci = self.obter_por_id(ci_id)
+            ci = self.obter_por_id(ci_id, carregar_relacionamentos=False)
             if not ci:
                 raise CINaoEncontradoError(ci_id)
             
@@ -1009,11 +1735,11 @@ class CIService:
             )
             
             # Registrar histórico
-            usuario = Usuario.query.get(usuario_id)
+            usuario = nome_usuario(usuario_id)
             historico = HistoricoCI(
                 colaborador_id=ci_id,
                 tipo_evento='EXCLUSAO',
-                descricao=f'CI excluído logicamente por {usuario.nome if usuario else "Sistema"}',
+                descricao=f'CI excluído logicamente por {usuario}',
                 data_evento=date.today(),
                 nc=ci.nc_atual,
                 cod_empresa=ci.empresa_atual,
@@ -1021,19 +1747,152 @@ class CIService:
                     'nome': ci.nome,
                     'cpf': ci.cpf,
                     'motivo': motivo,
-                    'usuario': usuario.nome if usuario else 'Sistema',
-                    'data_exclusao': datetime.now().isoformat()
+                    'usuario': usuario
                 }
             )
             db.session.add(historico)
             
             db.session.commit()
+            self._esquecer_colaborador(ci_id)
+            invalidar_cache_colaboradores()
             
-        except (CINaoEncontradoError, ValidacaoError):
+        except SistemaCIError:
+            db.session.rollback()
             raise
         except Exception as e:
             db.session.rollback()
-            raise ValidacaoError(f"Erro ao excluir colaborador: {str(e)}")
+            logger.exception("Erro ao excluir colaborador")
+            raise ValidacaoError(f"Erro ao excluir colaborador: {str(e)}") from e
+    
+    def excluir_colaboradores_bulk(
+        self,
+        ci_ids: List[int],
+        usuario_id: int,
+        motivo: str = None
+    ) -> int:
+        """
+        Exclui vários colaboradores logicamente, em transações de até
+        ``_EXCLUSAO_LOTE`` colaboradores.
+        
+        Cada lote é um UPDATE dos colaboradores, um UPDATE dos NCs ativos e
+        um INSERT em lote dos históricos, com um único commit. IDs
+        inexistentes ou já excluídos são ignorados.
+        
+        Args:
+            ci_ids: IDs dos colaboradores
+            usuario_id: ID do usuário que está excluindo
+            motivo: Motivo da exclusão
+        
+        Returns:
+            Quantidade de colaboradores excluídos
+        
+        Raises:
+            ValidacaoError: Se ocorrer erro em um lote (os lotes anteriores
+                já foram confirmados)
+        """
+        ids = list(dict.fromkeys(ci_ids))
+        motivo = motivo or 'Exclusão manual'
+        usuario = nome_usuario(usuario_id)
+        hoje = date.today()
+        total = 0
+        
+        try:
+            for inicio in range(0, len(ids), _EXCLUSAO_LOTE):
+                lote = ids[inicio:inicio + _EXCLUSAO_LOTE]
+                
+                # Colaboradores ainda não excluídos, com o NC ativo para o histórico
+                colaboradores = {}
+                for linha in db.session.execute(
+                    select(
+                        ColaboradorInterno.id,
+                        ColaboradorInterno.nome,
+                        ColaboradorInterno.cpf,
+                        NumeroCadastro.nc,
+                        NumeroCadastro.cod_empresa
+                    ).outerjoin(
+                        NumeroCadastro,
+                        and_(
+                            NumeroCadastro.colaborador_id == ColaboradorInterno.id,
+                            NumeroCadastro.ativo == True
+                        )
+                    ).where(
+                        ColaboradorInterno.id.in_(lote),
+                        ColaboradorInterno.is_deleted == False
+                    )
+                ):
+                    colaboradores.setdefault(linha.id, linha)
+                
+                if not colaboradores:
+                    continue
+                
+                agora = get_utc_now()
+                excluidos = list(colaboradores)
+                
+                # Mesmo efeito de ColaboradorInterno.excluir_soft, em SQL
+                db.session.execute(
+                    update(ColaboradorInterno)
+                    .where(ColaboradorInterno.id.in_(excluidos))
+                    .values(
+                        is_deleted=True,
+                        deleted_at=agora,
+                        deleted_by=usuario_id,
+                        deleted_reason=motivo
+                    )
+                    .execution_options(synchronize_session=False)
+                )
+                db.session.execute(
+                    update(NumeroCadastro)
+                    .where(
+                        NumeroCadastro.colaborador_id.in_(excluidos),
+                        NumeroCadastro.ativo == True
+                    )
+                    .values(
+                        ativo=False,
+                        data_fim=hoje,
+                        motivo_mudanca='EXCLUSÃO DO CI',
+                        updated_at=agora
+                    )
+                    .execution_options(synchronize_session=False)
+                )
+                db.session.execute(insert(HistoricoCI.__table__), [
+                    {
+                        'colaborador_id': ci.id,
+                        'tipo_evento': 'EXCLUSAO',
+                        'descricao': f'CI excluído logicamente por {usuario}',
+                        'data_evento': hoje,
+                        'nc': ci.nc,
+                        'cod_empresa': ci.cod_empresa,
+                        'dados_alterados': {
+                            'nome': ci.nome,
+                            'cpf': ci.cpf,
+                            'motivo': motivo,
+                            'usuario': usuario
+                        }
+                    }
+                    for ci in colaboradores.values()
+                ])
+                
+                db.session.commit()
+                
+                for ci_id in excluidos:
+                    self._esquecer_colaborador(ci_id)
+                invalidar_cache_colaboradores()
+                total += len(excluidos)
+                
+                logger.info(
+                    "Exclusão em lote: %d colaboradores excluídos (%d de %d IDs processados)",
+                    len(excluidos), inicio + len(lote), len(ids)
+                )
+            
+            return total
+            
+        except SistemaCIError:
+            db.session.rollback()
+            raise
+        except Exception as e:
+            db.session.rollback()
+            logger.exception("Erro ao excluir colaboradores em lote")
+            raise ValidacaoError(f"Erro ao excluir colaboradores em lote: {str(e)}") from e
     
     def restaurar_colaborador(
         self,
@@ -1054,7 +1913,7 @@ class CIService:
             CINaoEncontradoError: Se colaborador não existir
         """
         try:
-            ci = self.obter_por_id(ci_id)
+            ci = self.obter_por_id(ci_id, carregar_relacionamentos=False)
             if not ci:
                 raise CINaoEncontradoError(ci_id)
             
@@ -1066,32 +1925,35 @@ class CIService:
             
             if sucesso:
                 # Registrar histórico
-                usuario = Usuario.query.get(usuario_id)
+                usuario = nome_usuario(usuario_id)
                 historico = HistoricoCI(
                     colaborador_id=ci_id,
                     tipo_evento='RESTAURACAO',
-                    descricao=f'CI restaurado por {usuario.nome if usuario else "Sistema"}',
+                    descricao=f'CI restaurado por {usuario}',
                     data_evento=date.today(),
                     nc=ci.nc_atual,
                     cod_empresa=ci.empresa_atual,
                     dados_alterados={
                         'nome': ci.nome,
                         'cpf': ci.cpf,
-                        'usuario': usuario.nome if usuario else 'Sistema',
-                        'data_restauracao': datetime.now().isoformat()
+                        'usuario': usuario
                     }
                 )
                 db.session.add(historico)
                 
                 db.session.commit()
+                self._esquecer_colaborador(ci_id)
+                invalidar_cache_colaboradores()
             
             return sucesso
             
-        except (CINaoEncontradoError):
+        except SistemaCIError:
+            db.session.rollback()
             raise
         except Exception as e:
             db.session.rollback()
-            raise ValidacaoError(f"Erro ao restaurar colaborador: {str(e)}")
+            logger.exception("Erro ao restaurar colaborador")
+            raise ValidacaoError(f"Erro ao restaurar colaborador: {str(e)}") from e
     
     # ============================================================================
     # MÉTODOS DE ESTATÍSTICAS
@@ -1099,77 +1961,23 @@ class CIService:
     
     def obter_estatisticas(self, mostrar_excluidos: bool = False) -> Dict[str, Any]:
         """
-        Obtém estatísticas dos colaboradores.
+        Obtém estatísticas dos colaboradores (em cache, ver
+        _estatisticas_colaboradores).
         
         Args:
             mostrar_excluidos: Incluir estatísticas de excluídos
         
         Returns:
-            Dicionário com estatísticas
+            Dicionário com estatísticas (cópia rasa do valor em cache)
         """
         try:
-            estatisticas = {}
-            
-            # Query base
-            query = ColaboradorInterno.query
-            if not mostrar_excluidos:
-                query = query.filter_by(is_deleted=False)
-            
-            # Totais
-            estatisticas['total'] = query.count()
-            
-            # Contagem por status
-            if not mostrar_excluidos:
-                subquery = db.session.query(NumeroCadastro.colaborador_id).filter(
-                    NumeroCadastro.ativo == True
-                ).subquery()
-                
-                ativos_count = query.filter(
-                    ColaboradorInterno.id.in_(subquery)
-                ).count()
-                
-                estatisticas['ativos'] = ativos_count
-                estatisticas['inativos'] = estatisticas['total'] - ativos_count
-                estatisticas['excluidos'] = 0
-            else:
-                estatisticas['excluidos'] = query.filter_by(is_deleted=True).count()
-                estatisticas['ativos'] = query.filter_by(is_deleted=False).count()
-                estatisticas['inativos'] = 0
-            
-            # Distribuição por empresa
-            distrib_empresa = db.session.query(
-                NumeroCadastro.cod_empresa,
-                func.count(NumeroCadastro.id).label('total')
-            ).filter(
-                NumeroCadastro.ativo == True
-            ).group_by(
-                NumeroCadastro.cod_empresa
-            ).all()
-            
-            estatisticas['distribuicao_empresa'] = [
-                {'empresa': emp, 'total': total}
-                for emp, total in distrib_empresa
-            ]
-            
-            # Planos
-            estatisticas['planos_saude'] = PlanoSaude.query.filter_by(ativo=True).count()
-            estatisticas['planos_odonto'] = PlanoOdontologico.query.filter_by(ativo=True).count()
-            
-            # Dependentes
-            estatisticas['dependentes'] = Dependente.query.count()
-            
-            # Médias
-            if estatisticas['ativos'] > 0:
-                estatisticas['media_dependentes'] = round(
-                    estatisticas['dependentes'] / estatisticas['ativos'], 2
-                )
-            else:
-                estatisticas['media_dependentes'] = 0
-            
-            return estatisticas
+            return dict(_estatisticas_colaboradores(mostrar_excluidos))
             
+        except SistemaCIError:
+            raise
         except Exception as e:
-            raise ValidacaoError(f"Erro ao obter estatísticas: {str(e)}")
+            logger.exception("Erro ao obter estatísticas")
+            raise ValidacaoError(f"Erro ao obter estatísticas: {str(e)}") from e
     
     # ============================================================================
     # MÉTODOS DE EXPORTAÇÃO
@@ -1179,6 +1987,10 @@ class CIService:
         """
         Exporta dados de um colaborador para CSV.
         
+        Reaproveita as listas carregadas por ``obter_por_id`` quando presentes;
+        caso contrário, busca dependentes e planos pelos relacionamentos. O NC
+        atual sai do próprio histórico de NCs (uma consulta só).
+        
         Args:
             ci: ColaboradorInterno
         
@@ -1205,8 +2017,11 @@ class CIService:
             writer.writerow(['DADOS BÁSICOS', 'Idade', ci.idade or ''])
             writer.writerow(['DADOS BÁSICOS', 'Tempo Empresa (meses)', ci.tempo_empresa or ''])
             
+            # Histórico de NCs (mais recente primeiro); o NC atual é o ativo dele
+            ncs = self.obter_historico_nc(ci.id)
+            nc_ativo = next((nc for nc in ncs if nc.ativo), None)
+            
             # NC atual
-            nc_ativo = ci.nc_ativo
             if nc_ativo:
                 writer.writerow(['NC ATUAL', 'NC', nc_ativo.nc])
                 writer.writerow(['NC ATUAL', 'Empresa', nc_ativo.cod_empresa])
@@ -1215,7 +2030,6 @@ class CIService:
                 writer.writerow(['NC ATUAL', 'Status', 'ATIVO' if nc_ativo.ativo else 'INATIVO'])
             
             # Histórico de NCs
-            ncs = self.obter_historico_nc(ci.id)
             for i, nc in enumerate(ncs, 1):
                 writer.writerow([f'NC HISTÓRICO #{i}', 'NC', nc.nc])
                 writer.writerow([f'NC HISTÓRICO #{i}', 'Empresa', nc.cod_empresa])
@@ -1227,7 +2041,9 @@ class CIService:
                 writer.writerow([f'NC HISTÓRICO #{i}', 'Motivo', nc.motivo_mudanca or ''])
             
             # Dependentes
-            dependentes = ci.dependentes_cache if hasattr(ci, 'dependentes_cache') else []
+            dependentes = getattr(ci, 'dependentes_cache', None)
+            if dependentes is None:
+                dependentes = ci.dependentes.all()
             for i, dep in enumerate(dependentes, 1):
                 writer.writerow([f'DEPENDENTE #{i}', 'Nome', dep.nome])
                 writer.writerow([f'DEPENDENTE #{i}', 'CPF', dep.cpf or ''])
@@ -1238,7 +2054,9 @@ class CIService:
                 writer.writerow([f'DEPENDENTE #{i}', 'NC Vínculo', dep.nc_vinculo])
             
             # Planos de Saúde
-            planos_saude = ci.planos_saude_cache if hasattr(ci, 'planos_saude_cache') else []
+            planos_saude = getattr(ci, 'planos_saude_cache', None)
+            if planos_saude is None:
+                planos_saude = ci.planos_saude.all()
             for i, plano in enumerate(planos_saude, 1):
                 writer.writerow([f'PLANO SAÚDE #{i}', 'Operadora', plano.operadora])
                 writer.writerow([f'PLANO SAÚDE #{i}', 'Plano', plano.plano])
@@ -1253,7 +2071,9 @@ class CIService:
                 writer.writerow([f'PLANO SAÚDE #{i}', 'Status', 'ATIVO' if plano.ativo else 'INATIVO'])
             
             # Planos Odontológicos
-            planos_odonto = ci.planos_odonto_cache if hasattr(ci, 'planos_odonto_cache') else []
+            planos_odonto = getattr(ci, 'planos_odonto_cache', None)
+            if planos_odonto is None:
+                planos_odonto = ci.planos_odonto.all()
             for i, plano in enumerate(planos_odonto, 1):
                 writer.writerow([f'PLANO ODONTO #{i}', 'Operadora', plano.operadora])
                 writer.writerow([f'PLANO ODONTO #{i}', 'Plano', plano.plano])
@@ -1268,8 +2088,11 @@ class CIService:
             
             return output.getvalue()
             
+        except SistemaCIError:
+            raise
         except Exception as e:
-            raise ValidacaoError(f"Erro ao exportar colaborador: {str(e)}")
+            logger.exception("Erro ao exportar colaborador")
+            raise ValidacaoError(f"Erro ao exportar colaborador: {str(e)}") from e
     
     def exportar_todos_csv(self, apenas_ativos: bool = True) -> str:
         """
@@ -1281,10 +2104,32 @@ class CIService:
         Returns:
             String com conteúdo CSV
         """
+        return ''.join(self.gerar_csv_todos(apenas_ativos))
+    
+    def gerar_csv_todos(self, apenas_ativos: bool = True) -> Iterator[str]:
+        """
+        Gera o CSV de todos os colaboradores em blocos.
+        
+        Os colaboradores são lidos com cursor no servidor em lotes de
+        ``_EXPORTACAO_LOTE`` e cada bloco de linhas é emitido assim que
+        escrito, então a memória não cresce com o tamanho da tabela.
+        
+        Args:
+            apenas_ativos: Exportar apenas colaboradores ativos
+        
+        Yields:
+            Trechos do conteúdo CSV (o primeiro contém o cabeçalho)
+        """
         try:
             output = io.StringIO()
             writer = csv.writer(output, delimiter=';', quoting=csv.QUOTE_ALL)
             
+            def descarregar() -> str:
+                bloco = output.getvalue()
+                output.seek(0)
+                output.truncate(0)
+                return bloco
+            
             # Cabeçalho
             writer.writerow([
                 'ID', 'Nome', 'CPF', 'Email', 'Telefone',
@@ -1294,77 +2139,117 @@ class CIService:
                 'Esta Ativo', 'Excluído', 'Data Criação'
             ])
             
-            # Buscar colaboradores
-            query = ColaboradorInterno.query
+            # Buscar colaboradores (só as colunas exportadas: deixa de fora
+            # texto/JSON como deleted_reason e dados_adicionais). A idade vem
+            # calculada pelo banco junto com a linha
+            stmt = (
+                select(ColaboradorInterno, _expr_idade(db.engine.dialect.name))
+                .options(load_only(
+                    ColaboradorInterno.nome, ColaboradorInterno.cpf,
+                    ColaboradorInterno.email, ColaboradorInterno.telefone,
+                    ColaboradorInterno.data_admissao, ColaboradorInterno.data_nascimento,
+                    ColaboradorInterno.qtd_dependentes, ColaboradorInterno.qtd_planos_saude,
+                    ColaboradorInterno.qtd_planos_odonto, ColaboradorInterno.is_deleted,
+                    ColaboradorInterno.created_at
+                ))
+                .order_by(ColaboradorInterno.nome)
+            )
             if apenas_ativos:
-                query = query.filter_by(is_deleted=False)
+                stmt = stmt.where(ColaboradorInterno.is_deleted == False)
             
-            cis = query.order_by(ColaboradorInterno.nome).all()
+            lotes = db.session.execute(
+                stmt, execution_options={'yield_per': _EXPORTACAO_LOTE}
+            ).partitions()
             
-            # Dados
-            for ci in cis:
+            # Funções usadas por linha ligadas a nomes locais
+            data_br = format_date_brasil
+            data_hora_br = format_datetime_brasil
+            
+            def linha(ci: ColaboradorInterno, idade: Optional[int]) -> tuple:
                 nc_ativo = ci.nc_ativo
-                
-                writer.writerow([
+                return (
                     ci.id,
                     ci.nome,
                     ci.cpf,
                     ci.email or '',
                     ci.telefone or '',
-                    ci.data_admissao.strftime('%d/%m/%Y') if ci.data_admissao else '',
-                    ci.data_nascimento.strftime('%d/%m/%Y') if ci.data_nascimento else '',
-                    ci.idade or '',
+                    data_br(ci.data_admissao),
+                    data_br(ci.data_nascimento),
+                    idade or '',
                     nc_ativo.nc if nc_ativo else '',
                     nc_ativo.cod_empresa if nc_ativo else '',
                     'ATIVO' if nc_ativo and nc_ativo.ativo else 'INATIVO',
-                    ci.total_dependentes,
-                    ci.total_planos_saude,
-                    ci.total_planos_odonto,
-                    'SIM' if ci.esta_ativo else 'NÃO',
+                    ci.qtd_dependentes,
+                    ci.qtd_planos_saude,
+                    ci.qtd_planos_odonto,
+                    'SIM' if nc_ativo and not ci.is_deleted else 'NÃO',
                     'SIM' if ci.is_deleted else 'NÃO',
-                    ci.created_at.strftime('%d/%m/%Y %H:%M') if ci.created_at else ''
-                ])
+                    data_hora_br(ci.created_at)
+                )
             
-            return output.getvalue()
+            # Dados (NC ativo do lote inteiro em uma consulta; os totais são
+            # colunas do próprio colaborador). writerows consome o lote no
+            # laço em C do módulo csv
+            for lote in lotes:
+                self._carregar_nc_ativo([ci for ci, _ in lote])
+                writer.writerows(starmap(linha, lote))
+                
+                yield descarregar()
+            
+            restante = descarregar()
+            if restante:
+                yield restante
             
+        except SistemaCIError:
+            raise
         except Exception as e:
-            raise ValidacaoError(f"Erro ao exportar todos os colaboradores: {str(e)}")
+            logger.exception("Erro ao exportar todos os colaboradores")
+            raise ValidacaoError(f"Erro ao exportar todos os colaboradores: {str(e)}") from e
     
     # ============================================================================
     # MÉTODOS AUXILIARES
     # ============================================================================
     
-    def _limpar_cache(self) -> None:
-        """Limpa o cache interno do serviço."""
-        self._cache.clear()
+    def _registrar_historico(self, **campos) -> None:
+        """
+        Registra um HistoricoCI na transação atual.
+        
+        Com ``AUDITORIA_ASSINCRONA``, o registro só é enfileirado quando a
+        transação é confirmada e gravado em lote por uma thread; a
+        serialização de ``dados_alterados`` também fica para ela.
+        
+        Args:
+            **campos: Campos do HistoricoCI
+        """
+        if current_app.config.get('AUDITORIA_ASSINCRONA', False):
+            agora = datetime.utcnow()
+            campos.setdefault('created_at', agora)
+            campos.setdefault('updated_at', agora)
+            db.session.info.setdefault('_auditoria_pendente', []).append(
+                (current_app._get_current_object(), campos)
+            )
+            return
+        
+        db.session.add(HistoricoCI(**campos))
+    
+    def _carregados_na_requisicao(self) -> Dict[int, ColaboradorInterno]:
+        """
+        Colaboradores já carregados por completo na requisição atual.
+        
+        Fica em ``flask.g`` (não na instância, que é compartilhada entre
+        requisições), então some junto com a sessão do banco.
+        """
+        return g.setdefault('_ci_carregados', {})
+    
+    def _esquecer_colaborador(self, ci_id: int) -> None:
+        """Descarta o colaborador da memória da requisição após uma escrita."""
+        self._carregados_na_requisicao().pop(ci_id, None)
     
     def _formatar_cpf(self, cpf: str) -> str:
         """Formata CPF para exibição."""
         if not cpf or len(cpf) != 11:
             return cpf
         return f'{cpf[:3]}.{cpf[3:6]}.{cpf[6:9]}-{cpf[9:]}'
-    
-    def _calcular_idade(self, data_nascimento: date) -> Optional[int]:
-        """Calcula idade a partir da data de nascimento."""
-        if not data_nascimento:
-            return None
-        
-        hoje = date.today()
-        idade = hoje.year - data_nascimento.year
-        
-        # Ajustar se ainda não fez aniversário este ano
-        if (hoje.month, hoje.day) < (data_nascimento.month, data_nascimento.day):
-            idade -= 1
-        
-        return idade
-    
-    def _calcular_tempo_empresa(self, data_admissao: date) -> Optional[int]:
-        """Calcula tempo na empresa em meses."""
-        if not data_admissao:
-            return None
-        
-        hoje = date.today()
-        return (hoje.year - data_admissao.year) * 12 + (hoje.month - data_admissao.month)
 
 # ============================================================================
 # INSTÂNCIA SINGLETON
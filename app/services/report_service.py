@@ -5,70 +5,177 @@ Serviço para geração de relatórios.
 import io
 import csv
 from datetime import datetime, date
-from typing import Dict, List, Any
-from sqlalchemy import func, desc, asc
+from itertools import starmap
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from sqlalchemy import Integer, String, case, cast, func, desc, asc, exists, select, text
+from sqlalchemy.orm import joinedload
 
 from app import db
 from app.models import (
     ColaboradorInterno, NumeroCadastro, Dependente,
     PlanoSaude, PlanoOdontologico, Alerta
 )
+from app.decorators import memoize
+from app.utils.validators import format_date_brasil
+
+
+# Tamanho do lote lido do banco (e de cada bloco de CSV emitido) nas exportações
+_EXPORTACAO_LOTE = 1000
+
+# Validade, em segundos, dos dados do dashboard em cache
+_DASHBOARD_TTL = 30
+
+
+def _expr_idade(dialeto: str):
+    """
+    Expressão SQL com a idade (em anos completos) do colaborador.
+    
+    Args:
+        dialeto: Nome do dialeto do banco (postgresql, mysql, sqlite)
+    
+    Returns:
+        Expressão SQLAlchemy (NULL sem data de nascimento)
+    """
+    nascimento = ColaboradorInterno.data_nascimento
+    if dialeto == 'postgresql':
+        idade = func.extract('year', func.age(nascimento))
+    elif dialeto == 'mysql':
+        idade = func.timestampdiff(text('YEAR'), nascimento, func.curdate())
+    else:
+        # Diferença dos anos, menos 1 se ainda não fez aniversário este ano
+        idade = (
+            cast(func.strftime('%Y', 'now', 'localtime'), Integer)
+            - cast(func.strftime('%Y', nascimento), Integer)
+            - case(
+                (func.strftime('%m-%d', 'now', 'localtime') < func.strftime('%m-%d', nascimento), 1),
+                else_=0
+            )
+        )
+    return cast(idade, Integer)
+
+
+def _expr_data_brasil(coluna, dialeto: str):
+    """
+    Expressão SQL com a data no padrão brasileiro (DD/MM/YYYY), como
+    ``format_date_brasil``.
+    
+    Args:
+        coluna: Coluna de data
+        dialeto: Nome do dialeto do banco (postgresql, mysql, sqlite)
+    
+    Returns:
+        Expressão SQLAlchemy (texto vazio sem data)
+    """
+    if dialeto == 'postgresql':
+        data = func.to_char(coluna, 'DD/MM/YYYY')
+    elif dialeto == 'mysql':
+        data = func.date_format(coluna, '%d/%m/%Y')
+    else:
+        data = func.strftime('%d/%m/%Y', coluna)
+    return func.coalesce(data, '')
 
 
 class ReportService:
     """Serviço para geração de relatórios."""
     
-    def exportar_colaboradores_csv(self) -> str:
-        """Exporta colaboradores para CSV."""
+    def _gerar_csv(
+        self,
+        cabecalho: List[str],
+        stmt,
+        linha: Optional[Callable[..., list]] = None
+    ) -> Iterator[str]:
+        """
+        Gera um CSV em blocos a partir de uma consulta.
+        
+        A consulta é lida com cursor no servidor em lotes de
+        ``_EXPORTACAO_LOTE`` e cada lote vira um bloco de texto emitido assim
+        que escrito, então a memória não cresce com o tamanho da tabela.
+        
+        Args:
+            cabecalho: Colunas do cabeçalho
+            stmt: Consulta (select) a exportar
+            linha: Converte as colunas de um resultado na lista de valores da
+                linha (sem ela, cada resultado é escrito como veio do banco)
+        
+        Yields:
+            Trechos do conteúdo CSV (o primeiro contém o cabeçalho)
+        """
         output = io.StringIO()
         writer = csv.writer(output, delimiter=';', quoting=csv.QUOTE_ALL)
         
-        # Cabeçalho
-        writer.writerow([
-            'ID', 'Nome', 'CPF', 'Email', 'Telefone',
-            'Data Admissão', 'Data Nascimento', 'Idade',
-            'NC Atual', 'Empresa', 'Status', 'Total Dependentes'
-        ])
-        
-        # Dados
-        colaboradores = ColaboradorInterno.query.filter_by(is_deleted=False)\
-            .order_by(ColaboradorInterno.nome).all()
-        
-        for ci in colaboradores:
-            nc = ci.nc_ativo
-            writer.writerow([
-                ci.id,
-                ci.nome,
-                ci.cpf,
-                ci.email or '',
-                ci.telefone or '',
-                ci.data_admissao.strftime('%d/%m/%Y') if ci.data_admissao else '',
-                ci.data_nascimento.strftime('%d/%m/%Y') if ci.data_nascimento else '',
-                ci.idade or '',
-                nc.nc if nc else '',
-                nc.cod_empresa if nc else '',
-                'ATIVO' if ci.esta_ativo else 'INATIVO',
-                ci.total_dependentes
-            ])
-        
-        return output.getvalue()
+        def descarregar() -> str:
+            bloco = output.getvalue()
+            output.seek(0)
+            output.truncate(0)
+            return bloco
+        
+        writer.writerow(cabecalho)
+        
+        lotes = db.session.execute(
+            stmt, execution_options={'yield_per': _EXPORTACAO_LOTE}
+        ).partitions()
+        
+        for lote in lotes:
+            writer.writerows(starmap(linha, lote) if linha else lote)
+            
+            yield descarregar()
+        
+        restante = descarregar()
+        if restante:
+            yield restante
     
-    def exportar_planos_saude_csv(self) -> str:
-        """Exporta planos de saúde para CSV."""
-        output = io.StringIO()
-        writer = csv.writer(output, delimiter=';', quoting=csv.QUOTE_ALL)
+    def gerar_colaboradores_csv(self) -> Iterator[str]:
+        """
+        Gera o CSV de colaboradores em blocos.
         
-        writer.writerow([
-            'ID', 'Colaborador', 'CPF', 'Operadora', 'Plano',
-            'Tipo', 'Contrato', 'Valor', 'Data Início', 'Data Fim',
-            'Status', 'Empresa'
-        ])
+        As colunas já vêm formatadas pelo banco (datas, idade, status e
+        vazios), então cada linha do resultado é escrita sem passar por
+        objetos do ORM nem por formatação em Python.
+        """
+        dialeto = db.engine.dialect.name
         
-        planos = PlanoSaude.query.filter_by(ativo=True)\
-            .order_by(PlanoSaude.operadora, PlanoSaude.plano).all()
+        # Um NC ativo por colaborador, resolvido no próprio SELECT da exportação
+        ncs_ativos = (
+            select(
+                NumeroCadastro.colaborador_id,
+                func.min(NumeroCadastro.id).label('nc_id')
+            )
+            .where(NumeroCadastro.ativo == True)
+            .group_by(NumeroCadastro.colaborador_id)
+            .subquery()
+        )
         
-        for plano in planos:
-            writer.writerow([
+        return self._gerar_csv(
+            [
+                'ID', 'Nome', 'CPF', 'Email', 'Telefone',
+                'Data Admissão', 'Data Nascimento', 'Idade',
+                'NC Atual', 'Empresa', 'Status', 'Total Dependentes'
+            ],
+            select(
+                ColaboradorInterno.id,
+                ColaboradorInterno.nome,
+                ColaboradorInterno.cpf,
+                func.coalesce(ColaboradorInterno.email, ''),
+                func.coalesce(ColaboradorInterno.telefone, ''),
+                _expr_data_brasil(ColaboradorInterno.data_admissao, dialeto),
+                _expr_data_brasil(ColaboradorInterno.data_nascimento, dialeto),
+                # Idade 0 sai vazia, como nas demais exportações
+                func.coalesce(cast(func.nullif(_expr_idade(dialeto), 0), String), ''),
+                func.coalesce(NumeroCadastro.nc, ''),
+                func.coalesce(NumeroCadastro.cod_empresa, ''),
+                case((NumeroCadastro.id.isnot(None), 'ATIVO'), else_='INATIVO'),
+                ColaboradorInterno.qtd_dependentes
+            )
+            .outerjoin(ncs_ativos, ncs_ativos.c.colaborador_id == ColaboradorInterno.id)
+            .outerjoin(NumeroCadastro, NumeroCadastro.id == ncs_ativos.c.nc_id)
+            .where(ColaboradorInterno.is_deleted == False)
+            .order_by(ColaboradorInterno.nome)
+        )
+    
+    def gerar_planos_saude_csv(self) -> Iterator[str]:
+        """Gera o CSV de planos de saúde em blocos."""
+        def linha(plano: PlanoSaude) -> list:
+            return [
                 plano.id,
                 plano.colaborador.nome if plano.colaborador else '',
                 plano.colaborador.cpf if plano.colaborador else '',
@@ -77,87 +184,135 @@ class ReportService:
                 plano.tipo,
                 plano.contrato or '',
                 f'{float(plano.valor):.2f}' if plano.valor else '',
-                plano.data_inicio.strftime('%d/%m/%Y'),
-                plano.data_fim.strftime('%d/%m/%Y') if plano.data_fim else '',
+                format_date_brasil(plano.data_inicio),
+                format_date_brasil(plano.data_fim),
                 'ATIVO' if plano.ativo else 'INATIVO',
                 plano.empresa_cod
-            ])
+            ]
         
-        return output.getvalue()
+        return self._gerar_csv(
+            [
+                'ID', 'Colaborador', 'CPF', 'Operadora', 'Plano',
+                'Tipo', 'Contrato', 'Valor', 'Data Início', 'Data Fim',
+                'Status', 'Empresa'
+            ],
+            select(PlanoSaude)
+            .options(joinedload(PlanoSaude.colaborador).load_only(
+                ColaboradorInterno.nome, ColaboradorInterno.cpf
+            ))
+            .where(PlanoSaude.ativo == True)
+            .order_by(PlanoSaude.operadora, PlanoSaude.plano),
+            linha
+        )
     
-    def exportar_planos_odonto_csv(self) -> str:
-        """Exporta planos odontológicos para CSV."""
-        output = io.StringIO()
-        writer = csv.writer(output, delimiter=';', quoting=csv.QUOTE_ALL)
-        
-        writer.writerow([
-            'ID', 'Colaborador', 'CPF', 'Operadora', 'Plano',
-            'Valor', 'Data Início', 'Data Fim', 'Status',
-            'Empresa', 'Unidade'
-        ])
-        
-        planos = PlanoOdontologico.query.filter_by(ativo=True)\
-            .order_by(PlanoOdontologico.operadora, PlanoOdontologico.plano).all()
-        
-        for plano in planos:
-            writer.writerow([
+    def gerar_planos_odonto_csv(self) -> Iterator[str]:
+        """Gera o CSV de planos odontológicos em blocos."""
+        def linha(plano: PlanoOdontologico) -> list:
+            return [
                 plano.id,
                 plano.colaborador.nome if plano.colaborador else '',
                 plano.colaborador.cpf if plano.colaborador else '',
                 plano.operadora,
                 plano.plano,
                 f'{float(plano.valor):.2f}' if plano.valor else '',
-                plano.data_inicio.strftime('%d/%m/%Y'),
-                plano.data_fim.strftime('%d/%m/%Y') if plano.data_fim else '',
+                format_date_brasil(plano.data_inicio),
+                format_date_brasil(plano.data_fim),
                 'ATIVO' if plano.ativo else 'INATIVO',
                 plano.empresa_cod,
                 plano.unidade or ''
-            ])
+            ]
         
-        return output.getvalue()
+        return self._gerar_csv(
+            [
+                'ID', 'Colaborador', 'CPF', 'Operadora', 'Plano',
+                'Valor', 'Data Início', 'Data Fim', 'Status',
+                'Empresa', 'Unidade'
+            ],
+            select(PlanoOdontologico)
+            .options(joinedload(PlanoOdontologico.colaborador).load_only(
+                ColaboradorInterno.nome, ColaboradorInterno.cpf
+            ))
+            .where(PlanoOdontologico.ativo == True)
+            .order_by(PlanoOdontologico.operadora, PlanoOdontologico.plano),
+            linha
+        )
     
-    def exportar_dependentes_csv(self) -> str:
-        """Exporta dependentes para CSV."""
-        output = io.StringIO()
-        writer = csv.writer(output, delimiter=';', quoting=csv.QUOTE_ALL)
-        
-        writer.writerow([
-            'ID', 'Nome', 'CPF', 'Data Nascimento', 'Idade',
-            'Parentesco', 'NC Vínculo', 'Titular', 'CPF Titular'
-        ])
-        
-        dependentes = Dependente.query.order_by(Dependente.nome).all()
-        
-        for dep in dependentes:
-            writer.writerow([
+    def gerar_dependentes_csv(self) -> Iterator[str]:
+        """Gera o CSV de dependentes em blocos."""
+        def linha(dep: Dependente) -> list:
+            return [
                 dep.id,
                 dep.nome,
                 dep.cpf or '',
-                dep.data_nascimento.strftime('%d/%m/%Y') if dep.data_nascimento else '',
+                format_date_brasil(dep.data_nascimento),
                 dep.idade or '',
                 dep.parentesco or '',
                 dep.nc_vinculo,
                 dep.titular.nome if dep.titular else '',
                 dep.titular.cpf if dep.titular else ''
-            ])
+            ]
         
-        return output.getvalue()
+        return self._gerar_csv(
+            [
+                'ID', 'Nome', 'CPF', 'Data Nascimento', 'Idade',
+                'Parentesco', 'NC Vínculo', 'Titular', 'CPF Titular'
+            ],
+            select(Dependente)
+            .options(joinedload(Dependente.titular).load_only(
+                ColaboradorInterno.nome, ColaboradorInterno.cpf
+            ))
+            .where(Dependente.is_deleted == False)
+            .order_by(Dependente.nome),
+            linha
+        )
     
+    def exportar_colaboradores_csv(self) -> str:
+        """Exporta colaboradores para CSV."""
+        return ''.join(self.gerar_colaboradores_csv())
+    
+    def exportar_planos_saude_csv(self) -> str:
+        """Exporta planos de saúde para CSV."""
+        return ''.join(self.gerar_planos_saude_csv())
+    
+    def exportar_planos_odonto_csv(self) -> str:
+        """Exporta planos odontológicos para CSV."""
+        return ''.join(self.gerar_planos_odonto_csv())
+    
+    def exportar_dependentes_csv(self) -> str:
+        """Exporta dependentes para CSV."""
+        return ''.join(self.gerar_dependentes_csv())
+    
+    @memoize(ttl=_DASHBOARD_TTL)
     def obter_dados_dashboard(self) -> Dict[str, Any]:
-        """Obtém dados para dashboard."""
-        dados = {}
-        
-        # Totais
-        dados['total_colaboradores'] = ColaboradorInterno.query.filter_by(is_deleted=False).count()
-        dados['total_ativos'] = ColaboradorInterno.query.filter_by(is_deleted=False)\
-            .filter(ColaboradorInterno.id.in_(
-                db.session.query(NumeroCadastro.colaborador_id).filter_by(ativo=True)
-            )).count()
-        
-        dados['total_dependentes'] = Dependente.query.count()
-        dados['total_planos_saude'] = PlanoSaude.query.filter_by(ativo=True).count()
-        dados['total_planos_odonto'] = PlanoOdontologico.query.filter_by(ativo=True).count()
-        dados['total_alertas_abertos'] = Alerta.query.filter_by(resolvido=False).count()
+        """
+        Obtém dados para dashboard.
+        
+        O resultado fica em cache por _DASHBOARD_TTL segundos e é descartado
+        nas escritas de colaboradores e de alertas.
+        """
+        def contagem(modelo, *criterios):
+            return select(func.count()).select_from(modelo).where(*criterios).scalar_subquery()
+        
+        # Totais (um único SELECT de subconsultas escalares)
+        totais = db.session.execute(select(
+            contagem(
+                ColaboradorInterno, ColaboradorInterno.is_deleted == False
+            ).label('total_colaboradores'),
+            contagem(
+                ColaboradorInterno,
+                ColaboradorInterno.is_deleted == False,
+                exists().where(
+                    NumeroCadastro.colaborador_id == ColaboradorInterno.id,
+                    NumeroCadastro.ativo == True
+                )
+            ).label('total_ativos'),
+            contagem(Dependente, Dependente.is_deleted == False).label('total_dependentes'),
+            contagem(PlanoSaude, PlanoSaude.ativo == True).label('total_planos_saude'),
+            contagem(PlanoOdontologico, PlanoOdontologico.ativo == True).label('total_planos_odonto'),
+            contagem(Alerta, Alerta.resolvido == False).label('total_alertas_abertos')
+        )).one()
+        
+        dados = totais._asdict()
         
         # Distribuição por empresa
         dist_empresa = db.session.query(
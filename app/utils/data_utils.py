@@ -40,6 +40,24 @@ def from_json(value):
     except (json.JSONDecodeError, TypeError):
         return value
 
+def _json_default(obj):
+    """Converte o que o módulo json não serializa sozinho (datas e objetos)."""
+    if isinstance(obj, (date, datetime)):
+        return obj.isoformat()
+    if hasattr(obj, '__dict__'):
+        return obj.__dict__
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+
+def dumps_json(data):
+    """
+    Serializa para texto JSON em uma única passada, aceitando datas e objetos.
+    
+    É o serializador das colunas JSON do banco (``json_serializer`` do engine).
+    """
+    return json.dumps(data, default=_json_default)
+
+
 def serialize_for_json(data):
     """Serializa objetos Python para JSON."""
     if isinstance(data, dict):
@@ -50,4 +68,18 @@ def serialize_for_json(data):
         return data.isoformat()
     if hasattr(data, '__dict__'):
         return serialize_for_json(data.__dict__)
-    return data
\ No newline at end of file
+    return data
+
+
+def calcular_alteracoes(antigos, novos):
+    """
+    Diferença entre dois retratos dos mesmos campos, no formato de
+    ``HistoricoCI.dados_alterados`` ({campo: {'antigo', 'novo'}}).
+    
+    Só os campos alterados são serializados; sem alterações, retorna {}.
+    """
+    return {
+        campo: {'antigo': serialize_for_json(antigo), 'novo': serialize_for_json(novos[campo])}
+        for campo, antigo in antigos.items()
+        if antigo != novos[campo]
+    }
\ No newline at end of file
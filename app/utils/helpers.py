@@ -1,16 +1,15 @@
 # app/utils/helpers.py
 import json
-import pytz
 from datetime import datetime, date, timedelta
 import pandas as pd
 from app import db
 from app.models import ColaboradorInterno, NumeroCadastro, HistoricoCI
+from app.utils.data_utils import to_brasilia
+from app.utils.validators import _NAO_ALFANUMERICO, _somente_digitos
 import hashlib
 import os
 
 # ─── TIMEZONE HELPERS ────────────────────────────────────────────────────────
-_TZ = pytz.timezone('America/Sao_Paulo')
-
 def get_utc_now():
     return datetime.utcnow()
 
@@ -18,9 +17,7 @@ def _to_brasilia(dt):
     """Converte datetime para fuso horário de Brasília."""
     if dt is None:
         return ''
-    if dt.tzinfo is None:
-        dt = pytz.utc.localize(dt)
-    return dt.astimezone(_TZ).strftime('%d/%m/%Y %H:%M')
+    return to_brasilia(dt).strftime('%d/%m/%Y %H:%M')
 
 # ─── UTILITY FUNCTIONS ───────────────────────────────────────────────────────
 _DATE_FORMATS = ['%d/%m/%Y', '%d/%m/%y', '%d-%m-%Y', '%d-%m-%y', '%Y-%m-%d', '%Y/%m/%d']
@@ -77,7 +74,7 @@ def clean_cpf(cpf):
     """Limpa e valida CPF."""
     if not cpf:
         return None
-    digits = ''.join(filter(str.isdigit, str(cpf)))
+    digits = _somente_digitos(str(cpf))
     return digits if len(digits) == 11 else None
 
 def clean_nc(nc):
@@ -90,7 +87,7 @@ def clean_empresa(raw):
     """Limpa código de empresa: retém apenas dígitos e remove zeros à esquerda."""
     if not raw:
         return None
-    digits = ''.join(filter(str.isdigit, str(raw).strip()))
+    digits = _somente_digitos(str(raw).strip())
     return digits.lstrip('0') or None
 
 def parse_valor(raw):
@@ -164,7 +161,7 @@ def extract_nc_from_matricula(matricula):
         return None
     
     # Extrair apenas dígitos
-    digits = ''.join(filter(str.isdigit, str(matricula)))
+    digits = _somente_digitos(str(matricula))
     
     # Se tiver 10+ dígitos, pegar os últimos 6
     if len(digits) >= 6:
@@ -200,7 +197,7 @@ def _add_historico(ci_id, tipo_evento, descricao, nc=None, empresa=None, dados=N
         colaborador_id=ci_id, tipo_evento=tipo_evento,
         descricao=descricao, data_evento=date.today(),
         nc=nc, cod_empresa=empresa,
-        dados_alterados=serialize_for_json(dados) if dados else None,
+        dados_alterados=dados or None,
     ))
 
 def _sync_nc(ci, nc, empresa, origem):
@@ -301,6 +298,6 @@ def extrair_codigo_beneficiario(beneficiario_field):
     parts = str(beneficiario_field).split('-', 1)
     if len(parts) > 0:
         # Remover qualquer ponto, espaço ou hífen do código
-        codigo = ''.join(filter(lambda c: c.isalnum(), parts[0]))
+        codigo = _NAO_ALFANUMERICO.sub('', parts[0])
         return codigo
     return None
\ No newline at end of file
@@ -3,17 +3,28 @@
 
 import csv
 import logging
+from collections import defaultdict
 from datetime import datetime
-from typing import Dict, Any, Optional
+from functools import lru_cache
+from typing import Dict, Any, List, Optional
 
 from app import db
 from app.models import ColaboradorInterno, NumeroCadastro, ImportacaoLog
+from app.utils.validators import _somente_digitos
 
 logger = logging.getLogger(__name__)
 
+# Datas distintas memorizadas na leitura dos arquivos (as mesmas datas de
+# admissao/nascimento se repetem ao longo da planilha)
+_DATAS_CACHE_MAX = 4096
 
+# Linhas gravadas por vez na importacao de ativos (uma consulta IN por lote)
+_IMPORTACAO_LOTE = 1000
+
+
+@lru_cache(maxsize=_DATAS_CACHE_MAX)
 def _parse_date(date_str: str) -> Optional[datetime]:
-    """Converte string de data para datetime."""
+    """Converte string de data para datetime (resultado memorizado por texto)."""
     if not date_str or date_str == '00/00/0000':
         return None
     for fmt in ('%d/%m/%Y', '%Y-%m-%d', '%d-%m-%Y'):
@@ -28,17 +39,140 @@ def _clean_cpf(cpf: str) -> str:
     """Remove formatacao do CPF, mantendo apenas digitos."""
     if not cpf:
         return ''
-    return ''.join(filter(str.isdigit, str(cpf))).zfill(11)
+    return _somente_digitos(str(cpf)).zfill(11)
 
 
 def _clean_nc(nc: str) -> str:
     """Limpa NC removendo zeros a esquerda."""
     if not nc:
         return ''
-    digits = ''.join(filter(str.isdigit, str(nc)))
+    digits = _somente_digitos(str(nc))
     return digits.lstrip('0') or '0'
 
 
+def _gravar_lote_ativos(lote: List[Dict[str, Any]], resultado: Dict[str, Any]) -> None:
+    """
+    Grava um lote de linhas validas da importacao de ativos.
+
+    Colaboradores e NCs do lote sao carregados com uma consulta IN cada; as
+    regras de NC (desativar os anteriores, reativar um inativo ou criar um
+    novo) sao aplicadas em memoria, na ordem das linhas, e enviadas ao banco
+    no flush seguinte.
+
+    Args:
+        lote: Linhas ja validadas (dados do colaborador e do NC)
+        resultado: Resultado da importacao (contadores e erros)
+    """
+    if not lote:
+        return
+
+    colaboradores = {
+        ci.cpf: ci for ci in ColaboradorInterno.query.filter(
+            ColaboradorInterno.cpf.in_({linha['cpf'] for linha in lote})
+        )
+    }
+
+    # Buscar ou criar colaborador
+    for linha in lote:
+        try:
+            colaborador = colaboradores.get(linha['cpf'])
+
+            if colaborador:
+                # Atualizar dados existentes
+                colaborador.nome = linha['nome']
+                colaborador.email = linha['email'] or colaborador.email
+                colaborador.telefone = linha['telefone'] or colaborador.telefone
+                colaborador.data_admissao = linha['data_admissao'] or colaborador.data_admissao
+                colaborador.data_nascimento = linha['data_nascimento'] or colaborador.data_nascimento
+                colaborador.dados_adicionais = linha['dados_adicionais']
+                colaborador.is_deleted = False
+                colaborador.deleted_at = None
+                resultado['atualizados'] += 1
+            else:
+                # Criar novo colaborador
+                colaborador = ColaboradorInterno(
+                    nome=linha['nome'],
+                    cpf=linha['cpf'],
+                    email=linha['email'],
+                    telefone=linha['telefone'],
+                    data_admissao=linha['data_admissao'],
+                    data_nascimento=linha['data_nascimento'],
+                    dados_adicionais=linha['dados_adicionais']
+                )
+                db.session.add(colaborador)
+                colaboradores[linha['cpf']] = colaborador
+                resultado['importados'] += 1
+
+            linha['colaborador'] = colaborador
+
+        except Exception as e:
+            resultado['erros'].append(f"Linha {linha['linha']}: {str(e)}")
+            logger.error(f"Erro ao processar linha {linha['linha']}: {e}")
+
+    db.session.flush()  # Para obter o ID dos colaboradores novos
+
+    ncs_por_colaborador = defaultdict(list)
+    for registro in NumeroCadastro.query.filter(
+        NumeroCadastro.colaborador_id.in_({ci.id for ci in colaboradores.values()})
+    ):
+        ncs_por_colaborador[registro.colaborador_id].append(registro)
+
+    hoje = datetime.now().date()
+
+    for linha in lote:
+        colaborador = linha.get('colaborador')
+        if colaborador is None:
+            continue
+
+        try:
+            nc = linha['nc']
+            ncs = ncs_por_colaborador[colaborador.id]
+
+            # NC ja ativo: nada a fazer
+            if any(r.ativo and r.nc == nc for r in ncs):
+                continue
+
+            # Desativar NCs anteriores do colaborador
+            for nc_ativo in [r for r in ncs if r.ativo]:
+                if any(not r.ativo and r.nc == nc_ativo.nc for r in ncs):
+                    # Ja existe inativo, apenas deletar o ativo
+                    db.session.delete(nc_ativo)
+                    ncs.remove(nc_ativo)
+                    # O flush agrupa UPDATEs antes dos DELETEs: remover ja,
+                    # antes que o mesmo NC seja reativado no lote
+                    db.session.flush()
+                else:
+                    nc_ativo.ativo = False
+                    nc_ativo.data_fim = hoje
+
+            # Verificar se o novo NC ja existe como inativo
+            nc_novo_inativo = next((r for r in ncs if not r.ativo and r.nc == nc), None)
+
+            if nc_novo_inativo:
+                # Reativar o NC existente
+                nc_novo_inativo.ativo = True
+                nc_novo_inativo.data_fim = None
+                nc_novo_inativo.data_inicio = linha['data_admissao'] or nc_novo_inativo.data_inicio
+                nc_novo_inativo.cod_empresa = linha['cod_empresa']
+            else:
+                # Criar novo NC
+                novo_nc = NumeroCadastro(
+                    nc=nc,
+                    cod_empresa=linha['cod_empresa'],
+                    data_inicio=linha['data_admissao'] or hoje,
+                    colaborador_id=colaborador.id,
+                    ativo=True
+                )
+                db.session.add(novo_nc)
+                ncs.append(novo_nc)
+
+        except Exception as e:
+            resultado['erros'].append(f"Linha {linha['linha']}: {str(e)}")
+            logger.error(f"Erro ao processar linha {linha['linha']}: {e}")
+
+    db.session.flush()
+
+
 def importar_ativos(filepath: str, usuario_id: int = None) -> Dict[str, Any]:
     """
     Importa colaboradores ativos a partir de arquivo CSV.
@@ -104,6 +238,9 @@ def importar_ativos(filepath: str, usuario_id: int = None) -> Dict[str, Any]:
                     return row_data[idx]
                 return default
 
+            # Linhas validas aguardando gravacao (em lotes de _IMPORTACAO_LOTE)
+            lote = []
+
             for row_num, row_data in enumerate(reader, start=2):
                 resultado['total'] += 1
 
@@ -159,94 +296,30 @@ def importar_ativos(filepath: str, usuario_id: int = None) -> Dict[str, Any]:
                         }
                     }
 
-                    # Buscar ou criar colaborador
-                    colaborador = ColaboradorInterno.query.filter_by(cpf=cpf).first()
-
-                    if colaborador:
-                        # Atualizar dados existentes
-                        colaborador.nome = nome
-                        colaborador.email = email or colaborador.email
-                        colaborador.telefone = telefone or colaborador.telefone
-                        colaborador.data_admissao = data_admissao or colaborador.data_admissao
-                        colaborador.data_nascimento = data_nascimento or colaborador.data_nascimento
-                        colaborador.dados_adicionais = dados_adicionais
-                        colaborador.is_deleted = False
-                        colaborador.deleted_at = None
-                        resultado['atualizados'] += 1
-                    else:
-                        # Criar novo colaborador
-                        colaborador = ColaboradorInterno(
-                            nome=nome,
-                            cpf=cpf,
-                            email=email,
-                            telefone=telefone,
-                            data_admissao=data_admissao,
-                            data_nascimento=data_nascimento,
-                            dados_adicionais=dados_adicionais
-                        )
-                        db.session.add(colaborador)
-                        resultado['importados'] += 1
-
-                    db.session.flush()  # Para obter o ID do colaborador
-
-                    # Verificar e criar NC se necessario
-                    nc_existente = NumeroCadastro.query.filter_by(
-                        nc=nc,
-                        colaborador_id=colaborador.id,
-                        ativo=True
-                    ).first()
-
-                    if not nc_existente:
-                        # Desativar NCs anteriores do colaborador (um por um para evitar conflitos)
-                        ncs_ativos = NumeroCadastro.query.filter_by(
-                            colaborador_id=colaborador.id,
-                            ativo=True
-                        ).all()
-
-                        for nc_ativo in ncs_ativos:
-                            # Verificar se ja existe um NC inativo com mesmo valor
-                            nc_inativo_existente = NumeroCadastro.query.filter_by(
-                                nc=nc_ativo.nc,
-                                colaborador_id=colaborador.id,
-                                ativo=False
-                            ).first()
-
-                            if nc_inativo_existente:
-                                # Ja existe inativo, apenas deletar o ativo
-                                db.session.delete(nc_ativo)
-                            else:
-                                nc_ativo.ativo = False
-                                nc_ativo.data_fim = datetime.now().date()
-
-                        # Verificar se o novo NC ja existe como inativo
-                        nc_novo_inativo = NumeroCadastro.query.filter_by(
-                            nc=nc,
-                            colaborador_id=colaborador.id,
-                            ativo=False
-                        ).first()
-
-                        if nc_novo_inativo:
-                            # Reativar o NC existente
-                            nc_novo_inativo.ativo = True
-                            nc_novo_inativo.data_fim = None
-                            nc_novo_inativo.data_inicio = data_admissao or nc_novo_inativo.data_inicio
-                            nc_novo_inativo.cod_empresa = cod_empresa
-                        else:
-                            # Criar novo NC
-                            novo_nc = NumeroCadastro(
-                                nc=nc,
-                                cod_empresa=cod_empresa,
-                                data_inicio=data_admissao or datetime.now().date(),
-                                colaborador_id=colaborador.id,
-                                ativo=True
-                            )
-                            db.session.add(novo_nc)
+                    lote.append({
+                        'linha': row_num,
+                        'cpf': cpf,
+                        'nome': nome,
+                        'nc': nc,
+                        'cod_empresa': cod_empresa,
+                        'email': email,
+                        'telefone': telefone,
+                        'data_admissao': data_admissao,
+                        'data_nascimento': data_nascimento,
+                        'dados_adicionais': dados_adicionais,
+                    })
 
                 except Exception as e:
                     resultado['erros'].append(f"Linha {row_num}: {str(e)}")
                     logger.error(f"Erro ao processar linha {row_num}: {e}")
                     continue
 
+                if len(lote) >= _IMPORTACAO_LOTE:
+                    _gravar_lote_ativos(lote, resultado)
+                    lote = []
+
+            _gravar_lote_ativos(lote, resultado)
+
             # Commit das alteracoes
             db.session.commit()
 
@@ -39,6 +39,19 @@ TELEFONE_REGEX = r'^(\+\d{1,3})?[\s-]?\(?\d{2,3}\)?[\s-]?\d{4,5}[\s-]?\d{4}$'
 NUMERO_REGEX = r'^[0-9]+$'
 NC_REGEX = r'^[0-9]{1,20}$'  # NC pode ter até 20 dígitos
 
+# Tudo o que não é dígito (compilado uma vez; usado pelos limpadores)
+_NAO_DIGITO = re.compile(r'\D')
+
+# Tudo o que não é letra ou dígito (códigos de beneficiário)
+_NAO_ALFANUMERICO = re.compile(r'[\W_]')
+
+
+def _somente_digitos(valor: str) -> str:
+    """Remove os caracteres não numéricos (sem regex se já só houver dígitos)."""
+    if valor.isdecimal():
+        return valor
+    return _NAO_DIGITO.sub('', valor)
+
 
 # ============================================================================
 # VALIDAÇÃO DE TIPOS BÁSICOS
@@ -64,7 +77,7 @@ def is_valid_cpf(cpf: str) -> bool:
         return False
     
     # Remover caracteres não numéricos
-    cpf = ''.join(filter(str.isdigit, str(cpf)))
+    cpf = _somente_digitos(str(cpf))
     
     # CPF deve ter 11 dígitos
     if len(cpf) != 11:
@@ -125,7 +138,7 @@ def is_valid_telefone(telefone: str) -> bool:
     telefone = str(telefone).strip()
     
     # Remover caracteres não numéricos
-    numeros = ''.join(filter(str.isdigit, telefone))
+    numeros = _somente_digitos(telefone)
     
     # Telefone deve ter 10 ou 11 dígitos (com DDD)
     if len(numeros) not in (10, 11):
@@ -154,8 +167,8 @@ def is_valid_nc(nc: str) -> bool:
     
     nc = str(nc).strip()
     
-    # Verificar se contém apenas dígitos
-    if not re.match(NUMERO_REGEX, nc):
+    # Verificar se contém apenas dígitos (equivale a NUMERO_REGEX)
+    if not (nc.isascii() and nc.isdigit()):
         return False
     
     # NC deve ter entre 1 e 20 dígitos
@@ -215,7 +228,7 @@ def clean_cpf(cpf: str) -> Optional[str]:
     cpf_str = str(cpf).strip()
     
     # Remover caracteres não numéricos
-    cpf_limpo = ''.join(filter(str.isdigit, cpf_str))
+    cpf_limpo = _somente_digitos(cpf_str)
     
     # Verificar se tem 11 dígitos
     if len(cpf_limpo) != 11:
@@ -245,7 +258,7 @@ def clean_nc(nc: str) -> Optional[str]:
     nc_str = str(nc).strip()
     
     # Remover caracteres não numéricos
-    nc_limpo = ''.join(filter(str.isdigit, nc_str))
+    nc_limpo = _somente_digitos(nc_str)
     
     # Verificar se é válido
     if not nc_limpo or not is_valid_nc(nc_limpo):
@@ -272,7 +285,7 @@ def clean_empresa(codigo: str) -> Optional[str]:
     codigo_str = str(codigo).strip()
     
     # Remover caracteres não numéricos
-    codigo_limpo = ''.join(filter(str.isdigit, codigo_str))
+    codigo_limpo = _somente_digitos(codigo_str)
     
     # Verificar se é válido
     if not codigo_limpo or not is_valid_empresa(codigo_limpo):
@@ -363,7 +376,7 @@ def clean_telefone(telefone: str) -> Optional[str]:
     telefone_str = str(telefone).strip()
     
     # Remover caracteres não numéricos
-    numeros = ''.join(filter(str.isdigit, telefone_str))
+    numeros = _somente_digitos(telefone_str)
     
     # Validar telefone
     if not is_valid_telefone(numeros):
@@ -594,7 +607,9 @@ def format_date_brasil(data: Optional[date]) -> str:
     if not data:
         return ''
     
-    return data.strftime('%d/%m/%Y')
+    # Montagem direta: cerca de 2x mais rápida que strftime (usada por linha
+    # nas exportações CSV)
+    return f'{data.day:02d}/{data.month:02d}/{data.year:04d}'
 
 
 def format_datetime_brasil(dt: Optional[datetime]) -> str:
@@ -610,7 +625,7 @@ def format_datetime_brasil(dt: Optional[datetime]) -> str:
     if not dt:
         return ''
     
-    return dt.strftime('%d/%m/%Y %H:%M')
+    return f'{dt.day:02d}/{dt.month:02d}/{dt.year:04d} {dt.hour:02d}:{dt.minute:02d}'
 
 
 # ============================================================================
@@ -797,7 +812,7 @@ def extract_nc_from_matricula(matricula: str) -> Optional[str]:
         return None
     
     # Extrair apenas dígitos
-    digits = ''.join(filter(str.isdigit, str(matricula)))
+    digits = _somente_digitos(str(matricula))
     
     # Se tiver 10+ dígitos, pegar os últimos 6
     if len(digits) >= 6:
@@ -824,7 +839,7 @@ def extrair_codigo_beneficiario(beneficiario_field: str) -> Optional[str]:
     parts = str(beneficiario_field).split('-', 1)
     if len(parts) > 0:
         # Remover qualquer ponto, espaço ou hífen do código
-        codigo = ''.join(filter(lambda c: c.isalnum(), parts[0]))
+        codigo = _NAO_ALFANUMERICO.sub('', parts[0])
         return codigo if codigo else None
     
     return None
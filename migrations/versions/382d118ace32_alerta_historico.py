@@ -0,0 +1,42 @@
+"""alerta_historico
+
+Tabela com as observações de resolução e reabertura de alertas.
+
+Revision ID: 382d118ace32
+Revises: c2a1d45d97b7
+Create Date: 2026-10-16 22:16:41.443752
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '382d118ace32'
+down_revision = 'c2a1d45d97b7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'alerta_historico',
+        sa.Column('tipo_evento', sa.String(length=20), nullable=False),
+        sa.Column('texto', sa.Text(), nullable=False),
+        sa.Column('usuario', sa.String(length=100), nullable=True),
+        sa.Column('data_evento', sa.DateTime(), nullable=False),
+        sa.Column('alerta_id', sa.Integer(), nullable=False),
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['alerta_id'], ['alertas.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        op.f('ix_alerta_historico_alerta_id'), 'alerta_historico', ['alerta_id']
+    )
+
+
+def downgrade():
+    op.drop_index(op.f('ix_alerta_historico_alerta_id'), table_name='alerta_historico')
+    op.drop_table('alerta_historico')
@@ -0,0 +1,41 @@
+"""dependentes cpf_vazio
+
+Coluna gerada que marca dependentes sem CPF (NULL ou vazio) e o índice
+parcial usado pelo scan de DEPENDENTE_SEM_CPF.
+
+Revision ID: 5cd193f9567a
+Revises: 
+Create Date: 2026-10-16 22:14:41.597008
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5cd193f9567a'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # SQLite não aceita ADD COLUMN de coluna gerada STORED: o batch recria a tabela
+    with op.batch_alter_table('dependentes', recreate='auto') as batch_op:
+        batch_op.add_column(sa.Column(
+            'cpf_vazio',
+            sa.Boolean(),
+            sa.Computed("cpf IS NULL OR cpf = ''", persisted=True)
+        ))
+    
+    op.create_index(
+        'idx_dependente_cpf_vazio', 'dependentes', ['id'],
+        postgresql_where=sa.text('cpf_vazio'),
+        sqlite_where=sa.text('cpf_vazio')
+    )
+
+
+def downgrade():
+    op.drop_index('idx_dependente_cpf_vazio', table_name='dependentes')
+    with op.batch_alter_table('dependentes') as batch_op:
+        batch_op.drop_column('cpf_vazio')
@@ -0,0 +1,38 @@
+"""colaborador contadores
+
+Contadores denormalizados de dependentes e planos ativos em
+colaboradores_internos, preenchidos a partir das tabelas filhas.
+
+Revision ID: 8dfe799482f3
+Revises: c2f8c370fc49
+Create Date: 2026-10-16 22:17:32.362047
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.models import recalcular_contadores
+
+
+# revision identifiers, used by Alembic.
+revision = '8dfe799482f3'
+down_revision = 'c2f8c370fc49'
+branch_labels = None
+depends_on = None
+
+CONTADORES = ('qtd_dependentes', 'qtd_planos_saude', 'qtd_planos_odonto')
+
+
+def upgrade():
+    for coluna in CONTADORES:
+        op.add_column('colaboradores_internos', sa.Column(
+            coluna, sa.Integer(), server_default='0', nullable=False
+        ))
+    
+    recalcular_contadores(op.get_bind())
+
+
+def downgrade():
+    with op.batch_alter_table('colaboradores_internos') as batch_op:
+        for coluna in reversed(CONTADORES):
+            batch_op.drop_column(coluna)
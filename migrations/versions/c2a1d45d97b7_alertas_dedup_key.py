@@ -0,0 +1,65 @@
+"""alertas dedup_key
+
+Chave de duplicidade diária dos alertas e o índice parcial usado na
+verificação de duplicados de criar_alerta. Os alertas abertos existentes
+recebem a chave do dia em que foram criados.
+
+Revision ID: c2a1d45d97b7
+Revises: 5cd193f9567a
+Create Date: 2026-10-16 22:15:39.073281
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.models import Alerta
+
+
+# revision identifiers, used by Alembic.
+revision = 'c2a1d45d97b7'
+down_revision = '5cd193f9567a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('alertas', sa.Column('dedup_key', sa.String(length=40), nullable=True))
+    op.create_index(
+        'idx_alerta_aberto_dedup', 'alertas', ['tipo', 'dedup_key'],
+        postgresql_where=sa.text('resolvido = false'),
+        sqlite_where=sa.text('resolvido = 0')
+    )
+    
+    alertas = sa.table(
+        'alertas',
+        sa.column('id', sa.Integer),
+        sa.column('tipo', sa.String),
+        sa.column('descricao', sa.Text),
+        sa.column('data_alerta', sa.DateTime),
+        sa.column('resolvido', sa.Boolean),
+        sa.column('dedup_key', sa.String)
+    )
+    bind = op.get_bind()
+    abertos = bind.execute(
+        sa.select(alertas.c.id, alertas.c.tipo, alertas.c.descricao, alertas.c.data_alerta)
+        .where(alertas.c.resolvido == sa.false())
+    ).all()
+    if abertos:
+        bind.execute(
+            alertas.update()
+            .where(alertas.c.id == sa.bindparam('alerta_id'))
+            .values(dedup_key=sa.bindparam('chave')),
+            [
+                {
+                    'alerta_id': id_,
+                    'chave': Alerta.gerar_dedup_key(tipo, descricao, data_alerta.date())
+                }
+                for id_, tipo, descricao, data_alerta in abertos
+            ]
+        )
+
+
+def downgrade():
+    op.drop_index('idx_alerta_aberto_dedup', table_name='alertas')
+    with op.batch_alter_table('alertas') as batch_op:
+        batch_op.drop_column('dedup_key')
@@ -0,0 +1,36 @@
+"""dependentes soft delete
+
+Colunas de exclusão lógica dos dependentes.
+
+Revision ID: c2f8c370fc49
+Revises: 382d118ace32
+Create Date: 2026-10-16 22:16:59.224440
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c2f8c370fc49'
+down_revision = '382d118ace32'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Sem batch: no SQLite a recriação da tabela tentaria copiar a coluna
+    # gerada cpf_vazio
+    op.add_column('dependentes', sa.Column(
+        'is_deleted', sa.Boolean(), server_default=sa.false(), nullable=True
+    ))
+    op.add_column('dependentes', sa.Column('deleted_at', sa.DateTime(), nullable=True))
+    op.add_column('dependentes', sa.Column('deleted_by', sa.Integer(), nullable=True))
+    op.create_index(op.f('ix_dependentes_is_deleted'), 'dependentes', ['is_deleted'])
+
+
+def downgrade():
+    op.drop_index(op.f('ix_dependentes_is_deleted'), table_name='dependentes')
+    op.drop_column('dependentes', 'deleted_by')
+    op.drop_column('dependentes', 'deleted_at')
+    op.drop_column('dependentes', 'is_deleted')